@@ -1,9 +1,11 @@
 import streamlit as st
 import random
+from utils.session_store import sync_session, persist_session, rerun
 
 st.set_page_config(page_title="Study Consent", page_icon="🔗", layout="centered")
 
 st.title("Take Part in Our Study")
+sync_session()
 
 st.markdown("""
 ### About This Study
@@ -37,24 +39,28 @@ By clicking "I Consent and Wish to Continue", you confirm that you have read and
 If you do not wish to participate, you may close this page at any time.
 """)
 
+# Legacy separately hosted apps, only used when this script runs on its own.
+CONDITION_URLS = {
+    "elli": "https://ellichat.streamlit.app",
+    "static": "https://staticversion.streamlit.app"
+}
+
 if "consented" not in st.session_state:
     st.session_state.consented = False
 
-if "assigned_url" not in st.session_state:
-    st.session_state.assigned_url = None
+if "condition" not in st.session_state:
+    st.session_state.condition = None
 
 if not st.session_state.consented:
     if st.button("I Consent and Wish to Continue"):
         st.session_state.consented = True
 
-        st.session_state.assigned_url = random.choice([
-            "https://ellichat.streamlit.app",
-            "https://staticversion.streamlit.app"
-        ])
-        st.rerun()
+        # Under streamlit_app.py the rerun switches straight to the assigned page.
+        st.session_state.condition = random.choice(list(CONDITION_URLS))
+        rerun()
 
 else:
-    assigned_url = st.session_state.assigned_url
+    assigned_url = CONDITION_URLS[st.session_state.condition]
     st.write("Thank you for consenting! You will now be redirected to the study.")
     st.markdown(f"[Click here if you are not redirected automatically.]({assigned_url})")
     st.markdown(
@@ -65,3 +71,5 @@ else:
         """,
         unsafe_allow_html=True,
     )
+
+persist_session()
@@ -1,42 +1,34 @@
 import streamlit as st
+import os
 import time
-from google.oauth2.service_account import Credentials
-import gspread
 import datetime
 from utils.chatbot import summarize_results, safety_check, respond_to_feelings, extract_age, extract_gender
-
-@st.cache_resource
-def get_gsheet_client():
-    scope = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive.file",
-        "https://www.googleapis.com/auth/drive"
-    ]
-    creds = Credentials.from_service_account_info(st.secrets["google_sheets"], scopes=scope)
-    client = gspread.authorize(creds)
-    return client
+from utils.clients import get_study_sheet, prewarm
+from utils.rate_limit import admitted, CRITICAL
+from utils import message_log
+from utils.session_store import sync_session, persist_session, rerun, stop, transient_keys, event_session_id
+from utils.telemetry import mark_ready, record_answer, llm_wait, sheets_wait, timings_json
+from utils.instruments import item_texts, interpret, parse_responses, RESPONSE_SCALE
+from utils.profiling import begin_phase, phase
+from utils.study_monitor import record_start, record_completion
 
 def log_message_to_sheet(role, content):
-    try:
-        client = get_gsheet_client()
-        sheet = client.open_by_key(st.secrets["google_sheets"]["sheet_id"]).sheet1
-        row = [
-            "",  
-            st.session_state.get("gender", ""),
-            st.session_state.get("age", ""),
-            role,
-            content,
-            str(datetime.datetime.now())
-        ]
-        sheet.append_row(row, value_input_option="USER_ENTERED")
-    except Exception as e:
-        print("❌ Google Sheets message log failed:", e)
+    # Queued for the background writer (utils/message_log.py); the rerun
+    # does not wait for Sheets.
+    # Column A ties every message to its session (see session_funnel.py).
+    row = [
+        event_session_id(),
+        st.session_state.get("gender", ""),
+        st.session_state.get("age", ""),
+        role,
+        content,
+        str(datetime.datetime.now())
+    ]
+    message_log.enqueue(row)
 
 def append_to_google_sheet(data):
     try:
-        client = get_gsheet_client()
-        sheet = client.open_by_key(st.secrets["google_sheets"]["sheet_id"]).sheet1
+        sheet = get_study_sheet()
         row = [
             "", 
             data.get("gender", ""),
@@ -59,73 +51,85 @@ def append_to_google_sheet(data):
         raise e
 
 def log_row_elli_final():
+    # Returns whether the row reached the sheet.
+    # Finding a free row costs extra reads the first time.
+    cost = 1 if "row_index" in st.session_state else 3
     try:
-        client = get_gsheet_client()
-        sheet = client.open_by_key(st.secrets["google_sheets"]["sheet_id"]).sheet1
-
-        if "row_index" not in st.session_state:
-            existing_rows = sheet.get_all_values()
-            row_index = 2
-            while row_index <= len(existing_rows):
-                if all(cell.strip() == "" for cell in existing_rows[row_index - 1][:26]):
-                    break
-                row_index += 1
-            if row_index > len(existing_rows):
-                sheet.append_row([""] * 26)
-            st.session_state["row_index"] = row_index
-        else:
-            row_index = st.session_state["row_index"]
+        with sheets_wait(), admitted("sheets", CRITICAL, cost=cost):
+            sheet = get_study_sheet()
+
+            if "row_index" not in st.session_state:
+                existing_rows = sheet.get_all_values()
+                row_index = 2
+                while row_index <= len(existing_rows):
+                    if all(cell.strip() == "" for cell in existing_rows[row_index - 1][:26]):
+                        break
+                    row_index += 1
+                if row_index > len(existing_rows):
+                    sheet.append_row([""] * 26)
+                st.session_state["row_index"] = row_index
+            else:
+                row_index = st.session_state["row_index"]
 
-        row_data = [""] * 26  # A-Z
+            row_data = [""] * 27  # A-AA
 
-        row_data[0] = "Elli"
+            row_data[0] = "Elli"
 
-        row_data[1] = str(st.session_state.get("age", ""))
+            row_data[1] = str(st.session_state.get("age", ""))
 
-        row_data[2] = str(st.session_state.get("gender", ""))
+            row_data[2] = str(st.session_state.get("gender", ""))
 
-        user_mood = st.session_state.get("initial_mood", "")
-        elli_mood_response = ""
-        for i, msg in enumerate(st.session_state.messages):
-            if msg["role"] == "user" and msg["content"] == user_mood:
-                for j in range(i + 1, len(st.session_state.messages)):
-                    next_msg = st.session_state.messages[j]
-                    if next_msg["role"] == "bot":
-                        elli_mood_response = next_msg["content"]
-                        break
-                break
-        if user_mood or elli_mood_response:
-            row_data[3] = f"User: {user_mood}\nElli: {elli_mood_response}"
+            user_mood = st.session_state.get("initial_mood", "")
+            elli_mood_response = ""
+            for i, msg in enumerate(st.session_state.messages):
+                if msg["role"] == "user" and msg["content"] == user_mood:
+                    for j in range(i + 1, len(st.session_state.messages)):
+                        next_msg = st.session_state.messages[j]
+                        if next_msg["role"] == "bot":
+                            elli_mood_response = next_msg["content"]
+                            break
+                    break
+            if user_mood or elli_mood_response:
+                row_data[3] = f"User: {user_mood}\nElli: {elli_mood_response}"
 
-        phq_answers = st.session_state.get("phq_answers", [])
-        for i in range(9):
-            row_data[4 + i] = str(phq_answers[i]) if i < len(phq_answers) else ""
+            phq_answers = st.session_state.get("phq_answers", [])
+            for i in range(9):
+                row_data[4 + i] = str(phq_answers[i]) if i < len(phq_answers) else ""
 
-        gad_answers = st.session_state.get("gad_answers", [])
-        for i in range(7):
-            row_data[13 + i] = str(gad_answers[i]) if i < len(gad_answers) else ""
+            gad_answers = st.session_state.get("gad_answers", [])
+            for i in range(7):
+                row_data[13 + i] = str(gad_answers[i]) if i < len(gad_answers) else ""
 
-        row_data[20] = str(sum(phq_answers)) if phq_answers else ""
+            row_data[20] = str(sum(phq_answers)) if phq_answers else ""
 
-        row_data[21] = str(sum(gad_answers)) if gad_answers else ""
+            row_data[21] = str(sum(gad_answers)) if gad_answers else ""
 
-        row_data[22] = str(st.session_state.get("trust", ""))
+            row_data[22] = str(st.session_state.get("trust", ""))
 
-        row_data[23] = str(st.session_state.get("comfort", ""))
+            row_data[23] = str(st.session_state.get("comfort", ""))
 
-        row_data[24] = str(st.session_state.get("empathy", ""))
+            row_data[24] = str(st.session_state.get("empathy", ""))
 
-        row_data[25] = str(st.session_state.get("feedback", ""))
+            row_data[25] = str(st.session_state.get("feedback", ""))
 
-        sheet.update(f"A{row_index}:Z{row_index}", [row_data])
-        print(f"✅ Wrote Elli data to row {row_index}")
+            row_data[26] = timings_json()
+
+            sheet.update(f"A{row_index}:AA{row_index}", [row_data])
+            print(f"✅ Wrote Elli data to row {row_index}")
+        return True
     except Exception as e:
         st.error(f"❌ Final data write failed: {e}")
+        return False
 
 st.set_page_config(page_title="Elli - Mental Health Assistant", page_icon="🌱")
 st.title("🌱 Elli – Your Mental Health Companion")
+prewarm()
+transient_keys("quick_reply_")
+sync_session()
+record_start("Elli")
 
 # --- Init session state ---
+begin_phase("init_state")
 if "messages" not in st.session_state:
     st.session_state.messages = [{
         "role": "bot",
@@ -156,49 +160,41 @@ if "feedback_empathy_asked" not in st.session_state:
 if "empathy" not in st.session_state:
     st.session_state.empathy = 0
 
-PHQ_9_QUESTIONS = [
-    "Little interest or pleasure in doing things?",
-    "Feeling down, depressed, or hopeless?",
-    "Trouble falling or staying asleep, or sleeping too much?",
-    "Feeling tired or having little energy?",
-    "Poor appetite or overeating?",
-    "Feeling bad about yourself — or that you are a failure or have let yourself or your family down?",
-    "Trouble concentrating on things, such as reading or watching TV?",
-    "Moving or speaking so slowly that other people could have noticed? Or the opposite — being so fidgety or restless that you’ve been moving around a lot more than usual?",
-    "Thoughts that you would be better off dead, or thoughts of hurting yourself in some way?"
-]
-
-GAD_7_QUESTIONS = [
-    "Feeling nervous, anxious, or on edge?",
-    "Not being able to stop or control worrying?",
-    "Worrying too much about different things?",
-    "Trouble relaxing?",
-    "Being so restless that it is hard to sit still?",
-    "Becoming easily annoyed or irritable?",
-    "Feeling afraid as if something awful might happen?"
-]
-
-def interpret(score, scale):
-    if scale == "phq":
-        if score <= 4:
-            return "Minimal depression"
-        elif score <= 9:
-            return "Mild depression"
-        elif score <= 14:
-            return "Moderate depression"
-        elif score <= 19:
-            return "Moderately severe depression"
-        else:
-            return "Severe depression"
-    elif scale == "gad":
-        if score <= 4:
-            return "Minimal anxiety"
-        elif score <= 9:
-            return "Mild anxiety"
-        elif score <= 14:
-            return "Moderate anxiety"
-        else:
-            return "Severe anxiety"
+PHQ_9_QUESTIONS = item_texts("phq")
+GAD_7_QUESTIONS = item_texts("gad")
+
+# PHQ/GAD answers are typed digits in the original protocol. Quick replies add
+# one button per response option; multi-answer lets a participant answer
+# several items of the current questionnaire in one message ("1 0 2 3").
+QUICK_REPLIES = os.environ.get("ELLI_QUICK_REPLIES", "1") == "1"
+MULTI_ANSWERS = os.environ.get("ELLI_MULTI_ANSWERS", "0") == "1"
+QUICK_REPLY_KEY = "quick_reply"
+SCALE_ERROR_MSG = "Please respond with a number: 0 (Not at all), 1 (Several days), 2 (More than half the days), or 3 (Nearly every day)."
+if MULTI_ANSWERS:
+    SCALE_ERROR_MSG += " You can also answer the next few questions at once, e.g. \"1 0 2\"."
+
+def choose_quick_reply(value):
+    st.session_state[QUICK_REPLY_KEY] = str(value)
+
+def current_item_label():
+    step = st.session_state.step
+    if step == "intro":
+        return "name"
+    if step == "demographics":
+        return "age" if st.session_state.demographic_stage == "ask_age" else "gender"
+    if step == "phq":
+        return f"phq{st.session_state.phq_index + 1}"
+    if step == "gad":
+        return f"gad{st.session_state.gad_index + 1}"
+    if step == "feedback":
+        if st.session_state.feedback_trust_asked and st.session_state.trust == 0:
+            return "trust"
+        if st.session_state.feedback_comfort_asked and st.session_state.comfort == 0:
+            return "comfort"
+        if st.session_state.feedback_empathy_asked and st.session_state.empathy == 0:
+            return "empathy"
+        return "feedback"
+    return step
 
 def render_chat_message(msg):
     if msg["role"] == "bot":
@@ -210,6 +206,7 @@ def render_chat_message(msg):
             st.markdown(msg["content"], unsafe_allow_html=True)
 
 # --- Render message history ---
+begin_phase("render_history")
 for msg in st.session_state.messages:
     render_chat_message(msg)
 
@@ -218,16 +215,24 @@ if st.session_state.get("step") != "done":
     user_input = st.chat_input("Your message...")
 else:
     user_input = None
+# A quick-reply click takes the same path as a typed answer.
+quick_reply = st.session_state.pop(QUICK_REPLY_KEY, None)
+if quick_reply is not None and st.session_state.get("step") in ["phq", "gad"]:
+    user_input = quick_reply
 
+begin_phase("handle_input")
 if user_input:
     user_input = user_input.strip()
+    record_answer(current_item_label())
     user_msg = {"role": "user", "content": user_input}
     st.session_state.messages.append(user_msg)
     render_chat_message(user_msg)
     log_message_to_sheet("user", user_input)
 
     if st.session_state.step not in ["phq", "gad"]:
-        if safety_check(user_input):
+        with phase("safety_check"), llm_wait():
+            in_crisis = safety_check(user_input)
+        if in_crisis:
             bot_reply = (
                 "⚠️ It sounds like you're going through something really difficult. You're not alone.\n\n"
                 "Elli isn't a crisis service, but there are people who care and can help. Please consider reaching out to a professional or one of these mental health support lines:\n\n"
@@ -242,13 +247,15 @@ if user_input:
             log_message_to_sheet("bot", bot_reply)
             with st.chat_message("assistant", avatar="assets/elli_avatar.png"):
                 st.markdown(bot_reply)
-            st.stop()
+            stop()
 
     step = st.session_state.step
+    begin_phase(f"step:{step}")
 
     if step == "intro":
         from utils.chatbot import extract_name_from_input
-        name = extract_name_from_input(user_input)
+        with llm_wait():
+            name = extract_name_from_input(user_input)
         if name:
             st.session_state.name = name
             elli_intro = f"Hi {name}, I’m Elli. 🌱 I’m here to gently check in with you. How are you feeling today? (2-3 sentences)"
@@ -257,11 +264,12 @@ if user_input:
             elli_intro = "Thanks for sharing. Could you please give me just your name or nickname so I can know how to address you? (Your name will not be stored or used for any other purpose.)"
         st.session_state.messages.append({"role": "bot", "content": elli_intro})
         log_message_to_sheet("bot", elli_intro)
-        st.rerun()
+        rerun()
 
     elif step == "mood":
         with st.spinner("Elli is thinking..."):
-            response = respond_to_feelings(user_input, st.session_state.name)
+            with llm_wait():
+                response = respond_to_feelings(user_input, st.session_state.name)
             st.session_state.initial_mood = user_input
             time.sleep(1.5)
         st.session_state.messages.append({"role": "bot", "content": response})
@@ -271,12 +279,13 @@ if user_input:
         first_demo_q = "Before we continue, could you share your age?"
         st.session_state.messages.append({"role": "bot", "content": first_demo_q})
         log_message_to_sheet("bot", first_demo_q)
-        st.rerun()
+        rerun()
 
     elif step == "demographics":
         stage = st.session_state.demographic_stage
         if stage == "ask_age":
-            extracted_age = extract_age(user_input)
+            with llm_wait():
+                extracted_age = extract_age(user_input)
             if isinstance(extracted_age, int) and extracted_age > 0:
                 st.session_state.age = extracted_age
                 st.session_state.demographic_stage = "ask_gender"
@@ -287,10 +296,11 @@ if user_input:
                 error_msg = "I couldn't understand your age. Could you please clarify?"
                 st.session_state.messages.append({"role": "bot", "content": error_msg})
                 log_message_to_sheet("bot", error_msg)
-            st.rerun()
+            rerun()
         elif stage == "ask_gender":
             try:
-                extracted_gender = extract_gender(user_input)
+                with llm_wait():
+                    extracted_gender = extract_gender(user_input)
                 if extracted_gender:
                     st.session_state.gender = extracted_gender
                     st.session_state.step = "phq"
@@ -311,22 +321,23 @@ if user_input:
                 st.session_state.messages.append({"role": "bot", "content": error_msg})
                 log_message_to_sheet("bot", error_msg)
                 st.error(f"Error: {e}")
-            st.rerun()
+            rerun()
 
     elif step == "phq":
-        try:
-            score = int(user_input)
-            if score not in [0, 1, 2, 3]:
-                raise ValueError
-        except ValueError:
-            error_msg = "Please respond with a number: 0 (Not at all), 1 (Several days), 2 (More than half the days), or 3 (Nearly every day)."
+        remaining = len(PHQ_9_QUESTIONS) - st.session_state.phq_index
+        scores = parse_responses(user_input, remaining if MULTI_ANSWERS else 1)
+        if scores is None:
+            error_msg = SCALE_ERROR_MSG
             st.session_state.messages.append({"role": "bot", "content": error_msg})
             log_message_to_sheet("bot", error_msg)
             with st.chat_message("assistant", avatar="assets/elli_avatar.png"):
                 st.markdown(error_msg)
         else:
-            st.session_state.phq_answers.append(score)
-            st.session_state.phq_index += 1
+            for i, score in enumerate(scores):
+                if i:
+                    record_answer(current_item_label())
+                st.session_state.phq_answers.append(score)
+                st.session_state.phq_index += 1
             if st.session_state.phq_index < len(PHQ_9_QUESTIONS):
                 next_q = f"{st.session_state.phq_index + 1}. {PHQ_9_QUESTIONS[st.session_state.phq_index]}"
                 if not any(msg["content"] == next_q for msg in st.session_state.messages):
@@ -345,19 +356,20 @@ if user_input:
                     st.markdown(gad_intro)
 
     elif step == "gad":
-        try:
-            score = int(user_input)
-            if score not in [0, 1, 2, 3]:
-                raise ValueError
-        except ValueError:
-            error_msg = "Please respond with a number: 0 (Not at all), 1 (Several days), 2 (More than half the days), or 3 (Nearly every day)."
+        remaining = len(GAD_7_QUESTIONS) - st.session_state.gad_index
+        scores = parse_responses(user_input, remaining if MULTI_ANSWERS else 1)
+        if scores is None:
+            error_msg = SCALE_ERROR_MSG
             st.session_state.messages.append({"role": "bot", "content": error_msg})
             log_message_to_sheet("bot", error_msg)
             with st.chat_message("assistant", avatar="assets/elli_avatar.png"):
                 st.markdown(error_msg)
         else:
-            st.session_state.gad_answers.append(score)
-            st.session_state.gad_index += 1
+            for i, score in enumerate(scores):
+                if i:
+                    record_answer(current_item_label())
+                st.session_state.gad_answers.append(score)
+                st.session_state.gad_index += 1
             if st.session_state.gad_index < len(GAD_7_QUESTIONS):
                 next_q = f"{st.session_state.gad_index + 1}. {GAD_7_QUESTIONS[st.session_state.gad_index]}"
                 if not any(msg["content"] == next_q for msg in st.session_state.messages):
@@ -371,13 +383,14 @@ if user_input:
                 phq_interp = interpret(phq_total, "phq")
                 gad_interp = interpret(gad_total, "gad")
                 user_name = st.session_state.get("name", "there")
-                summary = summarize_results(
-                    phq_total,
-                    phq_interp,
-                    gad_total,
-                    gad_interp,
-                    mood_text=st.session_state.initial_mood
-                )
+                with llm_wait():
+                    summary = summarize_results(
+                        phq_total,
+                        phq_interp,
+                        gad_total,
+                        gad_interp,
+                        mood_text=st.session_state.initial_mood
+                    )
                 st.session_state.step = "feedback"
                 summary_msgs = [
                     f"Here’s a gentle summary of what you’ve shared, {user_name}:",
@@ -393,7 +406,7 @@ if user_input:
                 st.session_state.feedback_trust_asked = True
                 st.session_state.feedback_comfort_asked = False
                 st.session_state.feedback_final_asked = False
-                st.stop()
+                stop()
 
     elif step == "feedback":
         if st.session_state.feedback_trust_asked and st.session_state.trust == 0:
@@ -408,12 +421,12 @@ if user_input:
                 bot_msg = "Thank you. How comfortable did you feel interacting with Elli? (1–5)"
                 st.session_state.messages.append({"role": "bot", "content": bot_msg})
                 log_message_to_sheet("bot", bot_msg)
-                st.rerun()
+                rerun()
             except ValueError:
                 bot_msg = "Please enter a number from 1 to 5."
                 st.session_state.messages.append({"role": "bot", "content": bot_msg})
                 log_message_to_sheet("bot", bot_msg)
-                st.rerun()
+                rerun()
         elif st.session_state.feedback_comfort_asked and st.session_state.comfort == 0:
             try:
                 comfort_score = int(user_input)
@@ -426,12 +439,12 @@ if user_input:
                 bot_msg = "And how empathic did you find Elli? (1–5)"
                 st.session_state.messages.append({"role": "bot", "content": bot_msg})
                 log_message_to_sheet("bot", bot_msg)
-                st.rerun()
+                rerun()
             except ValueError:
                 bot_msg = "Please enter a number from 1 to 5."
                 st.session_state.messages.append({"role": "bot", "content": bot_msg})
                 log_message_to_sheet("bot", bot_msg)
-                st.rerun()
+                rerun()
         elif st.session_state.feedback_empathy_asked and st.session_state.empathy == 0:
             try:
                 empathy_score = int(user_input)
@@ -444,22 +457,38 @@ if user_input:
                 bot_msg = "Thanks. Finally, do you have any thoughts or feedback about this experience?"
                 st.session_state.messages.append({"role": "bot", "content": bot_msg})
                 log_message_to_sheet("bot", bot_msg)
-                st.rerun()
+                rerun()
             except ValueError:
                 bot_msg = "Please enter a number from 1 to 5."
                 st.session_state.messages.append({"role": "bot", "content": bot_msg})
                 log_message_to_sheet("bot", bot_msg)
-                st.rerun()
-        elif st.session_state.feedback_final_asked and st.session_state.feedback == "":
-            st.session_state.feedback = user_input
+                rerun()
+        elif st.session_state.feedback_final_asked and (st.session_state.feedback == "" or st.session_state.get("final_write_failed")):
+            # After a failed write the feedback is kept and any message retries it.
+            if not st.session_state.get("final_write_failed"):
+                st.session_state.feedback = user_input
             try:
-                log_row_elli_final()
+                if not log_row_elli_final():
+                    # The participant stays on this step until the row is in the sheet.
+                    st.session_state.final_write_failed = True
+                    bot_msg = "Sorry, I couldn't save your answers just now. Please wait a moment, then send any message to try again."
+                    st.session_state.messages.append({"role": "bot", "content": bot_msg})
+                    log_message_to_sheet("bot", bot_msg)
+                    rerun()
+                st.session_state.final_write_failed = False
+                # The monitor only counts completions whose row is in the sheet.
+                record_completion("Elli", {
+                    "Trust": st.session_state.trust, "Comfort": st.session_state.comfort,
+                    "Empathy": st.session_state.empathy,
+                    "Total_PHQ": sum(st.session_state.get("phq_answers", [])) if st.session_state.get("phq_answers") else None,
+                    "Total_GAD": sum(st.session_state.get("gad_answers", [])) if st.session_state.get("gad_answers") else None,
+                })
                 closing = f"Thanks so much for checking in today, {st.session_state.name}. Wishing you care and calm. 🌻"
                 st.session_state.messages.append({"role": "bot", "content": closing})
                 log_message_to_sheet("bot", closing)
                 st.session_state.feedback_final_asked = False
                 st.session_state.step = "done"
-                st.rerun()
+                rerun()
             except Exception as e:
                 bot_msg = "An error occurred while processing your feedback. Please try again later."
                 st.session_state.messages.append({"role": "bot", "content": bot_msg})
@@ -487,4 +516,17 @@ if user_input:
 
             st.session_state.messages.append({"role": "bot", "content": bot_msg})
             log_message_to_sheet("bot", bot_msg)
-            st.rerun()
\ No newline at end of file
+            rerun()
+
+# --- Quick replies ---
+if QUICK_REPLIES and st.session_state.get("step") in ["phq", "gad"]:
+    columns = st.columns(len(RESPONSE_SCALE))
+    for column, (value, label) in zip(columns, RESPONSE_SCALE):
+        column.button(f"{value} · {label}", key=f"quick_reply_{value}", on_click=choose_quick_reply, args=(value,), use_container_width=True)
+
+# The current question is on screen once the run gets here.
+if st.session_state.get("step") != "done":
+    mark_ready(current_item_label())
+
+begin_phase("persist")
+persist_session()
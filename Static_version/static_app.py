@@ -1,12 +1,23 @@
 import streamlit as st
 from datetime import datetime
-from google.oauth2.service_account import Credentials
-import gspread
+import os
 import uuid
+from utils.clients import get_study_sheet, prewarm
+from utils.rate_limit import admitted, CRITICAL
+from utils.session_store import sync_session, persist_session, rerun, transient_keys
+from utils.telemetry import mark_ready, record_answer, record_block, sheets_wait, timings_json
+from utils.instruments import item_texts, response_labels, interpret
+from utils.profiling import begin_phase
+from utils.item_timer import item_timer
+from utils.study_monitor import record_start, record_completion
 
 st.set_page_config(page_title="Mental Health Screening (Static Form)", page_icon="📝", layout="centered")
 
 st.title("📝 Mental Health Screening (Neutral Interface)")
+prewarm()
+transient_keys("next_", "feedback_next_", "item_timer_")
+sync_session()
+record_start("static")
 st.markdown("""
 Welcome to this mental health screening form. Please answer the following questions as honestly as possible.
 
@@ -15,53 +26,11 @@ Welcome to this mental health screening form. Please answer the following questi
 - This tool cannot provide crisis support. If you are in emotional distress or thinking about hurting yourself, please contact a local mental health service or suicide hotline in your area.
 """)
 
-# --- Scale & Interpretation ---
-scale = ["Not at all (0)", "Several days (1)", "More than half the days (2)", "Nearly every day (3)"]
-
-def interpret_phq(score):
-    if score <= 4:
-        return "Minimal depression"
-    elif score <= 9:
-        return "Mild depression"
-    elif score <= 14:
-        return "Moderate depression"
-    elif score <= 19:
-        return "Moderately severe depression"
-    else:
-        return "Severe depression"
-
-def interpret_gad(score):
-    if score <= 4:
-        return "Minimal anxiety"
-    elif score <= 9:
-        return "Mild anxiety"
-    elif score <= 14:
-        return "Moderate anxiety"
-    else:
-        return "Severe anxiety"
-
-# --- Content ---
-phq9_items = [
-    "Little interest or pleasure in doing things",
-    "Feeling down, depressed, or hopeless",
-    "Trouble falling or staying asleep, or sleeping too much",
-    "Feeling tired or having little energy",
-    "Poor appetite or overeating",
-    "Feeling bad about yourself — or that you are a failure",
-    "Trouble concentrating on things",
-    "Moving or speaking slowly or being fidgety/restless",
-    "Thoughts that you would be better off dead or hurting yourself"
-]
+# --- Scale & Content ---
+scale = response_labels()
 
-gad7_items = [
-    "Feeling nervous, anxious or on edge",
-    "Not being able to stop or control worrying",
-    "Worrying too much about different things",
-    "Trouble relaxing",
-    "Being so restless that it's hard to sit still",
-    "Becoming easily annoyed or irritable",
-    "Feeling afraid as if something awful might happen"
-]
+phq9_items = item_texts("phq", short=True)
+gad7_items = item_texts("gad", short=True)
 
 demographic_questions = [
     {"label": "Your age:", "type": "number", "min_value": 18, "max_value": 100, "value": 25, "step": 1, "key": "age"},
@@ -75,12 +44,75 @@ feedback_questions = [
     {"label": "Do you have any feedback about your experience?", "type": "text", "key": "feedback"}
 ]
 
+# --- Paging ---
+# "item" is the study's original protocol: one question per page, each
+# answer written to Sheets on "Next". "block" shows each questionnaire as one
+# form page, submitted in a single rerun with one coalesced write; per-item
+# timing then comes from the browser.
+PAGING = os.environ.get("ELLI_STATIC_PAGING", "item")
+
+def block_entries(name):
+    if name == "phq":
+        return [{"item": f"phq{i+1}", "key": f"phq9_{i}", "question": q, "type": "phq9", "column": chr(69 + i), "spec": None}
+                for i, q in enumerate(phq9_items)]
+    if name == "gad":
+        return [{"item": f"gad{i+1}", "key": f"gad7_{i}", "question": q, "type": "gad7", "column": chr(78 + i), "spec": None}
+                for i, q in enumerate(gad7_items)]
+    if name == "demographic":
+        columns = {"age": "B", "gender": "C"}
+        return [{"item": dq["key"], "key": dq["key"], "question": dq["label"], "type": "demographic", "column": columns[dq["key"]], "spec": dq}
+                for dq in demographic_questions]
+    columns = {"trust": "W", "comfort": "X", "empathy": "Y", "feedback": "Z"}
+    return [{"item": fq["key"], "key": fq["key"], "question": fq["label"], "type": "feedback", "column": columns[fq["key"]], "spec": fq}
+            for fq in feedback_questions]
+
+def block_input(entry):
+    spec = entry["spec"]
+    if spec is None:
+        return st.radio("", scale, key=entry["key"])
+    if spec["type"] == "number":
+        return st.number_input("", min_value=spec["min_value"], max_value=spec["max_value"], value=spec["value"], step=spec["step"], key=entry["key"])
+    if spec["type"] == "select":
+        return st.selectbox("", spec["options"], key=entry["key"])
+    if spec["type"] == "radio":
+        return st.radio("", spec["options"], key=entry["key"])
+    return st.text_area("", key=entry["key"])
+
+def run_block(name, total_column=None):
+    entries = block_entries(name)
+    with st.form(f"block_{name}"):
+        answers = {}
+        for entry in entries:
+            st.markdown(f"<span style='font-size:1.2em'><b>{entry['question']}</b></span>", unsafe_allow_html=True)
+            answers[entry["key"]] = block_input(entry)
+        client_timings = item_timer([entry["key"] for entry in entries], key=f"item_timer_{name}")
+        submitted = st.form_submit_button("Next")
+    mark_ready(f"block_{name}")
+    if not submitted:
+        return
+
+    elapsed = record_block(
+        [entry["item"] for entry in entries],
+        {entry["item"]: client_timings.get(entry["key"], {}).get("last_ms") for entry in entries}
+    )
+    row = {"A": "static"}
+    for entry in entries:
+        answer = answers[entry["key"]]
+        st.session_state.answers.append({"type": entry["type"], "question": entry["question"], "answer": answer, "elapsed": elapsed[entry["item"]]})
+        row[entry["column"]] = str(scale.index(answer)) if entry["spec"] is None else str(answer)
+    if total_column:
+        row[total_column] = str(sum(scale.index(answers[entry["key"]]) for entry in entries))
+    log_row(row)
+
+    st.session_state.step += len(entries)
+    rerun()
+
 # --- State ---
+begin_phase("init_state")
 for key, default in {
     "session_id": str(uuid.uuid4()),
     "step": 0,
     "answers": [],
-    "start_time": datetime.now().timestamp(),
     "main_done": False,
     "feedback_done": False,
 }.items():
@@ -107,38 +139,39 @@ def build_row_with_progress(step_label, phq9_score=None, phq9_interp=None, gad7_
     return row
 
 def log_row(row_data_dict):
+    # Every progress write is study data; finding a free row costs extra reads the first time.
+    cost = 2 if "row_index" in st.session_state else 4
     try:
-        scope = ["https://www.googleapis.com/auth/spreadsheets"]
-        creds = Credentials.from_service_account_info(st.secrets["google_sheets"], scopes=scope)
-        client = gspread.authorize(creds)
-        sheet = client.open_by_key(st.secrets["google_sheets"]["sheet_id"]).sheet1
-
-        if "row_index" not in st.session_state:
-            existing_rows = sheet.get_all_values()
-            row_index = 2
-            while row_index <= len(existing_rows):
-                row = existing_rows[row_index - 1]
-                if all(cell.strip() == "" for cell in row[:26]):
-                    break
-                row_index += 1
-            if row_index > len(existing_rows):
-                sheet.append_row([""] * 26)
-            st.session_state["row_index"] = row_index
-        else:
-            row_index = st.session_state["row_index"]
+        with sheets_wait(), admitted("sheets", CRITICAL, cost=cost):
+            sheet = get_study_sheet()
+
+            if "row_index" not in st.session_state:
+                existing_rows = sheet.get_all_values()
+                row_index = 2
+                while row_index <= len(existing_rows):
+                    row = existing_rows[row_index - 1]
+                    if all(cell.strip() == "" for cell in row[:26]):
+                        break
+                    row_index += 1
+                if row_index > len(existing_rows):
+                    sheet.append_row([""] * 26)
+                st.session_state["row_index"] = row_index
+            else:
+                row_index = st.session_state["row_index"]
 
-        existing_row = sheet.row_values(row_index)
-        existing_row += [""] * (26 - len(existing_row))
-        col_map = {chr(65 + i): i for i in range(26)}
-        new_row = existing_row.copy()
+            existing_row = sheet.row_values(row_index)
+            existing_row += [""] * (27 - len(existing_row))
+            col_map = {chr(65 + i): i for i in range(26)}
+            new_row = existing_row.copy()
 
-        for col_letter, value in row_data_dict.items():
-            col_index = col_map[col_letter]
-            if new_row[col_index].strip() == "":
-                new_row[col_index] = str(value)
+            for col_letter, value in row_data_dict.items():
+                col_index = col_map[col_letter]
+                if new_row[col_index].strip() == "":
+                    new_row[col_index] = str(value)
+            new_row[26] = timings_json()
 
-        sheet.update(f"A{row_index}:Z{row_index}", [new_row])
-        print(f"✅ Logged progress at row {row_index}")
+            sheet.update(f"A{row_index}:AA{row_index}", [new_row])
+            print(f"✅ Logged progress at row {row_index}")
     except Exception as e:
         st.error(f"❌ Intermediate data write failed: {e}")
 
@@ -146,10 +179,7 @@ def log_row(row_data_dict):
 
 def log_row_static_final():
     try:
-        scope = ["https://www.googleapis.com/auth/spreadsheets"]
-        creds = Credentials.from_service_account_info(st.secrets["google_sheets"], scopes=scope)
-        client = gspread.authorize(creds)
-        sheet = client.open_by_key(st.secrets["google_sheets"]["sheet_id"]).sheet1
+        sheet = get_study_sheet()
 
         if "row_index" not in st.session_state:
             existing_rows = sheet.get_all_values()
@@ -195,14 +225,29 @@ def log_row_static_final():
 
 
 # --- Form Logic ---
-if not st.session_state.main_done:
+begin_phase("form")
+if PAGING == "block" and not st.session_state.main_done:
+    current = st.session_state.step
+    if current < len(phq9_items):
+        run_block("phq", total_column="U")
+    elif current < len(phq9_items) + len(gad7_items):
+        run_block("gad", total_column="V")
+    elif current < len(phq9_items) + len(gad7_items) + len(demographic_questions):
+        run_block("demographic")
+    else:
+        st.session_state.main_done = True
+        st.session_state.step += 1
+        rerun()
+
+elif not st.session_state.main_done:
     current = st.session_state.step
     if current < len(phq9_items):
         q = phq9_items[current]
         st.markdown(f"<span style='font-size:1.5em'><b>{q}</b></span>", unsafe_allow_html=True)
         answer = st.radio("", scale, key=f"phq9_{current}")
+        mark_ready(f"phq{current+1}")
         if st.button("Next", key=f"next_{current}"):
-            elapsed = datetime.now().timestamp() - st.session_state.start_time
+            elapsed = record_answer(f"phq{current+1}")
             st.session_state.answers.append({"type": "phq9", "question": q, "answer": answer, "elapsed": elapsed})
             row = {
                 "A": "static",
@@ -217,16 +262,16 @@ if not st.session_state.main_done:
 
             row = build_row_with_progress(f"phq9_{current+1}")
             st.session_state.step += 1
-            st.session_state.start_time = datetime.now().timestamp()
-            st.rerun()
+            rerun()
 
     elif current < len(phq9_items) + len(gad7_items):
         idx = current - len(phq9_items)
         q = gad7_items[idx]
         st.markdown(f"<span style='font-size:1.5em'><b>{q}</b></span>", unsafe_allow_html=True)
         answer = st.radio("", scale, key=f"gad7_{idx}")
+        mark_ready(f"gad{idx+1}")
         if st.button("Next", key=f"next_{current}"):
-            elapsed = datetime.now().timestamp() - st.session_state.start_time
+            elapsed = record_answer(f"gad{idx+1}")
             st.session_state.answers.append({"type": "gad7", "question": q, "answer": answer, "elapsed": elapsed})
             row = {
                 "A": "static",
@@ -241,8 +286,7 @@ if not st.session_state.main_done:
 
             row = build_row_with_progress(f"gad7_{idx+1}")
             st.session_state.step += 1
-            st.session_state.start_time = datetime.now().timestamp()
-            st.rerun()
+            rerun()
 
     elif current < len(phq9_items) + len(gad7_items) + len(demographic_questions):
         idx = current - len(phq9_items) - len(gad7_items)
@@ -252,8 +296,9 @@ if not st.session_state.main_done:
             answer = st.number_input("", min_value=dq["min_value"], max_value=dq["max_value"], value=dq["value"], step=dq["step"], key=dq["key"])
         else:
             answer = st.selectbox("", dq["options"], key=dq["key"])
+        mark_ready(dq["key"])
         if st.button("Next", key=f"next_{current}"):
-            elapsed = datetime.now().timestamp() - st.session_state.start_time
+            elapsed = record_answer(dq["key"])
             st.session_state.answers.append({"type": "demographic", "question": dq["label"], "answer": answer, "elapsed": elapsed})
             if dq["key"] == "age":
                 row = {
@@ -268,24 +313,23 @@ if not st.session_state.main_done:
             log_row(row)
 
             row = build_row_with_progress(f"demographic_{idx+1}")
-            st.session_state.start_time = datetime.now().timestamp()
             st.session_state.step += 1
-            st.rerun()
+            rerun()
     else:
         st.session_state.main_done = True
-        st.session_state.start_time = datetime.now().timestamp()
         st.session_state.step += 1
-        st.rerun()
+        rerun()
 
 # --- Results + Feedback ---
+begin_phase("results_feedback")
 if st.session_state.main_done and not st.session_state.feedback_done:
     st.success("✅ You have completed the questionnaire.")
     phq9_scores = [scale.index(ans["answer"]) for ans in st.session_state.answers if ans["type"] == "phq9"]
     gad7_scores = [scale.index(ans["answer"]) for ans in st.session_state.answers if ans["type"] == "gad7"]
     total_phq9 = sum(phq9_scores)
     total_gad7 = sum(gad7_scores)
-    phq_interp = interpret_phq(total_phq9)
-    gad_interp = interpret_gad(total_gad7)
+    phq_interp = interpret(total_phq9, "phq")
+    gad_interp = interpret(total_gad7, "gad")
 
     st.markdown(
         f"**PHQ-9 Total Score:** {total_phq9}  \n"
@@ -300,15 +344,18 @@ if st.session_state.main_done and not st.session_state.feedback_done:
     feedback_answers = [a for a in st.session_state.answers if a["type"] == "feedback"]
     feedback_step = len(feedback_answers)
 
-    if feedback_step < len(feedback_questions):
+    if PAGING == "block" and feedback_step < len(feedback_questions):
+        run_block("feedback")
+    elif feedback_step < len(feedback_questions):
         fq = feedback_questions[feedback_step]
         st.markdown(f"<span style='font-size:1.3em'><b>{fq['label']}</b></span>", unsafe_allow_html=True)
         if fq["type"] == "radio":
             answer = st.radio("", fq["options"], key=fq["key"])
         else:
             answer = st.text_area("", key=fq["key"])
+        mark_ready(fq["key"])
         if st.button("Next", key=f"feedback_next_{feedback_step}"):
-            elapsed = datetime.now().timestamp() - st.session_state.start_time
+            elapsed = record_answer(fq["key"])
             st.session_state.answers.append({"type": "feedback", "question": fq["label"], "answer": answer, "elapsed": elapsed})
             column_map = {
                 "trust": "W",
@@ -323,13 +370,17 @@ if st.session_state.main_done and not st.session_state.feedback_done:
             log_row(row)
 
             row = build_row_with_progress(f"feedback_{feedback_step+1}")
-            st.session_state.start_time = datetime.now().timestamp()
             st.session_state.step += 1
-            st.rerun()
+            rerun()
     else:
         st.success("✅ Your responses and feedback have been logged. Thank you for participating!")
+        record_completion("static", {"Trust": st.session_state.get("trust"), "Comfort": st.session_state.get("comfort"),
+                                     "Empathy": st.session_state.get("empathy"), "Total_PHQ": total_phq9, "Total_GAD": total_gad7})
         st.session_state.feedback_done = True
 
 
 if st.session_state.feedback_done:
-    st.info("You have already submitted your feedback. Thank you!")
\ No newline at end of file
+    st.info("You have already submitted your feedback. Thank you!")
+
+begin_phase("persist")
+persist_session()
@@ -0,0 +1,63 @@
+import hmac
+import math
+import pandas as pd
+import streamlit as st
+from utils.study_monitor import (get_monitor, describe, welch_test, completion_table, completion_chi2,
+                                 CONDITIONS, MEASURES, MONITOR_DB_ENV)
+
+# Recruitment dashboard: streamlit run admin_app.py
+# Reads the running aggregates in ELLI_MONITOR_DB (see utils/study_monitor.py),
+# a few rows whatever the number of participants, and refreshes itself.
+# Set [admin] password in the Streamlit secrets to require it.
+REFRESH_S = 10
+
+st.set_page_config(page_title="Study monitor", page_icon="📊", layout="wide")
+st.title("📊 Study monitor")
+
+
+def _password():
+    try:
+        return st.secrets["admin"]["password"]
+    except (KeyError, FileNotFoundError):
+        return None
+
+password = _password()
+if password and not hmac.compare_digest(st.text_input("Password", type="password"), password):
+    st.stop()
+
+monitor = get_monitor()
+if monitor is None:
+    st.info(f"Set {MONITOR_DB_ENV} (e.g. sqlite:///var/lib/elli/monitor.db) for the study app and this page.")
+    st.stop()
+
+
+def _fmt(value, digits=3):
+    return "–" if value is None or (isinstance(value, float) and math.isnan(value)) else f"{value:.{digits}f}"
+
+@st.fragment(run_every=REFRESH_S)
+def dashboard():
+    counts, moments = monitor.snapshot()
+
+    columns = st.columns(len(CONDITIONS) + 1)
+    for column, condition in zip(columns, CONDITIONS):
+        column.metric(f"{condition}: completed / started",
+                      f"{counts[condition]['completed']} / {counts[condition]['started']}")
+    columns[-1].metric("Total completed", sum(c["completed"] for c in counts.values()))
+
+    st.subheader("Completion by condition")
+    table = pd.DataFrame(completion_table(counts), index=["Completed", "Not completed"]).T
+    chi2, dof, p = completion_chi2(counts)
+    st.dataframe(table)
+    st.caption(f"χ² = {_fmt(chi2, 2)}, df = {dof}, p = {_fmt(p)} (not completed includes sessions still in progress)")
+
+    st.subheader("Outcomes by condition")
+    summary = pd.DataFrame(describe(moments)).pivot(index="Measure", columns="Condition", values=["n", "Mean", "SD"])
+    tests = pd.DataFrame(
+        [welch_test(moments[CONDITIONS[0], measure], moments[CONDITIONS[1], measure]) for measure in MEASURES],
+        index=MEASURES, columns=["Welch t", "df", "p"],
+    )
+    summary.columns = [f"{stat} ({condition})" for stat, condition in summary.columns]
+    st.dataframe(summary.loc[MEASURES].join(tests).round(3))
+    st.caption(f"Refreshes every {REFRESH_S}s. Running means and variances (Welford), updated as participants finish.")
+
+dashboard()
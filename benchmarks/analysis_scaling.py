@@ -0,0 +1,184 @@
+import argparse
+import csv
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "data analysis"))
+from study_data import PROJECT_ROOT, CACHE_DIR
+from run_pipeline import STEPS
+from synthetic_data import write_synthetic
+
+# Usage (from the project root):
+#   python -m benchmarks.analysis_scaling                          # 1e3, 1e4, 1e5 rows, every step
+#   python -m benchmarks.analysis_scaling --sizes 1e5 1e6 1e7 --steps outcomes feedback --timeout 3600
+#
+# Runs every pipeline step (plus loading the CSV into the typed cache) on
+# synthetic exports of increasing size, one subprocess per step with
+# STUDY_DATA_PATH/STUDY_RESULTS_DIR pointing at the synthetic file and a
+# scratch directory, and records wall time and peak RSS of each. Results are
+# appended to benchmarks/results/analysis_scaling.csv with the commit they
+# ran on. The report flags steps whose time grows faster than the data
+# (log-log slope between the two largest sizes) and steps that got slower
+# than the last recorded run at the same size.
+RESULTS_PATH = os.path.join(PROJECT_ROOT, "benchmarks", "results", "analysis_scaling.csv")
+SYNTHETIC_DIR = os.path.join(CACHE_DIR, "synthetic")
+ANALYSIS_DIR = os.path.join(PROJECT_ROOT, "data", "data analysis")
+FIELDS = ["recorded_at", "commit", "rows", "step", "status", "seconds", "peak_mb"]
+# Slope above which a step counts as super-linear, and the slow-down that counts as a regression;
+# both ignore steps under MIN_SECONDS, where start-up dominates.
+SUPERLINEAR_SLOPE = 1.3
+REGRESSION_RATIO = 1.5
+MIN_SECONDS = 1.0
+# ru_maxrss is in kilobytes on Linux and bytes on macOS.
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def synthetic_export(rows, seed):
+    path = os.path.join(SYNTHETIC_DIR, f"study-{rows}-s{seed}.csv")
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        write_synthetic(path + ".tmp", rows, seed=seed)
+        os.replace(path + ".tmp", path)
+        print(f"generated {rows:,} rows in {time.perf_counter() - start:.1f}s -> {os.path.relpath(path, PROJECT_ROOT)}")
+    return path
+
+def _limit_memory(max_bytes):
+    import resource
+    resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+
+def measure(command, env, timeout, max_bytes=None, cwd=PROJECT_ROOT):
+    # (status, seconds, peak MB) of one child process, from its own rusage.
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull:
+        process = subprocess.Popen(command, cwd=cwd, env=env, stdout=devnull, stderr=subprocess.PIPE,
+                                   preexec_fn=(lambda: _limit_memory(max_bytes)) if max_bytes else None)
+        status = None
+        while True:
+            pid, code, usage = os.wait4(process.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.perf_counter() - start > timeout:
+                process.kill()
+                _, code, usage = os.wait4(process.pid, 0)
+                status = "timeout"
+                break
+            time.sleep(0.05)
+        process.returncode = os.waitstatus_to_exitcode(code)
+        error = process.stderr.read().decode("utf-8", "replace").strip().splitlines()
+    seconds = time.perf_counter() - start
+    if status is None:
+        if process.returncode == 0:
+            status = "ok"
+        else:
+            status = "failed: " + (error[-1][:80] if error else f"exit {process.returncode}")
+    return status, seconds, usage.ru_maxrss * RSS_UNIT / 1e6
+
+def run_size(rows, steps, seed, timeout, max_bytes):
+    data_path = synthetic_export(rows, seed)
+    commands = [("load", [sys.executable, "-c", "import study_data; study_data.load_typed()"], ANALYSIS_DIR)]
+    commands += [(name, [sys.executable, STEPS[name].script], PROJECT_ROOT) for name in steps]
+    records = []
+    with tempfile.TemporaryDirectory(prefix=f"scaling-{rows}-") as scratch:
+        env = dict(os.environ, STUDY_DATA_PATH=data_path, STUDY_RESULTS_DIR=scratch, MPLBACKEND="Agg",
+                   PYTHONIOENCODING="utf-8")
+        for name, command, cwd in commands:
+            status, seconds, peak_mb = measure(command, env, timeout, max_bytes, cwd)
+            print(f"{rows:>10,} {name:<20} {status:<10.40} {seconds:>9.2f}s {peak_mb:>9.1f} MB")
+            records.append({"rows": rows, "step": name, "status": status, "seconds": round(seconds, 3),
+                            "peak_mb": round(peak_mb, 1)})
+    return records
+
+
+# --- Records ---
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def read_records(path=RESULTS_PATH):
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            return list(csv.DictReader(f))
+    except OSError:
+        return []
+
+def append_records(records, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    new_file = not os.path.exists(path)
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerows(records)
+
+
+# --- Report ---
+def flags(records, previous):
+    out = []
+    by_step = {}
+    for record in records:
+        if record["status"] == "ok":
+            by_step.setdefault(record["step"], []).append(record)
+    for step, runs in by_step.items():
+        runs.sort(key=lambda record: record["rows"])
+        if len(runs) >= 2:
+            small, large = runs[-2], runs[-1]
+            if large["seconds"] >= MIN_SECONDS and small["seconds"] > 0:
+                slope = math.log(large["seconds"] / small["seconds"]) / math.log(large["rows"] / small["rows"])
+                if slope > SUPERLINEAR_SLOPE:
+                    out.append(f"super-linear: {step} time grows as rows^{slope:.2f} "
+                               f"({small['rows']:,} -> {large['rows']:,} rows)")
+    last = {}
+    for record in previous:
+        if record["status"] == "ok":
+            last[record["step"], int(record["rows"])] = record
+    for record in records:
+        before = last.get((record["step"], record["rows"]))
+        if before and record["status"] == "ok" and record["seconds"] >= MIN_SECONDS \
+                and record["seconds"] > REGRESSION_RATIO * float(before["seconds"]):
+            out.append(f"regression: {record['step']} at {record['rows']:,} rows took {record['seconds']:.2f}s, "
+                       f"{float(before['seconds']):.2f}s at {before['commit']}")
+        elif before and record["status"] != "ok":
+            out.append(f"regression: {record['step']} at {record['rows']:,} rows {record['status']}, ok at {before['commit']}")
+    return out
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time and memory-profile every analysis step on synthetic data of increasing size.")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1e3, 1e4, 1e5], help="Row counts (e.g. 1e3 1e5 1e7)")
+    parser.add_argument("--steps", nargs="+", default=list(STEPS), help=f"Pipeline steps (default: all). One of: {', '.join(STEPS)}")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=1800, help="Seconds before a step is stopped")
+    parser.add_argument("--max-memory-gb", type=float, default=None, help="Address-space limit per step")
+    parser.add_argument("--no-record", action="store_true", help=f"Do not append to {os.path.relpath(RESULTS_PATH, PROJECT_ROOT)}")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.steps if name not in STEPS]
+    if unknown:
+        parser.error(f"unknown step(s): {', '.join(unknown)}")
+    max_bytes = int(args.max_memory_gb * 1e9) if args.max_memory_gb else None
+
+    previous = read_records()
+    recorded_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    commit = current_commit()
+    print(f"{'rows':>10} {'step':<20} {'status':<10} {'wall':>10} {'peak RSS':>12}")
+    records = []
+    for rows in sorted(int(size) for size in args.sizes):
+        records += run_size(rows, args.steps, args.seed, args.timeout, max_bytes)
+    for record in records:
+        record.update(recorded_at=recorded_at, commit=commit)
+    if not args.no_record:
+        append_records(records)
+
+    print()
+    for line in flags(records, previous) or ["no super-linear steps or regressions"]:
+        print(line)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
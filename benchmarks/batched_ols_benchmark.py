@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import numpy as np
+import statsmodels.api as sm
+import statsmodels.formula.api as smf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "data analysis"))
+from study_data import load_study_data, binary_gender
+from batched_ols import fit_outcomes
+
+# Usage (from the project root): python -m benchmarks.batched_ols_benchmark [n_boot]
+#
+# Interaction models for every outcome x moderator: one smf.ols + anova_lm
+# per cell against fit_outcomes (one design and QR per moderator), then
+# residual-bootstrap coefficients for each cell, refit with smf.ols on a
+# small number of replicates and with the shared factorisation on all of them.
+# Checks coefficient and Type II ANOVA tables against statsmodels first.
+N_BOOT = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10_000
+N_BOOT_STATSMODELS = 200
+OUTCOMES = ["Trust", "Comfort", "Empathy", "Total_PHQ", "Total_GAD"]
+
+df = binary_gender(load_study_data())
+df["Age_Group"] = np.where(df["Age"] < df["Age"].median(), "younger", "older")
+MODERATORS = ["Gender", "Age_Group"]
+
+def statsmodels_tables():
+    tables = {}
+    for moderator in MODERATORS:
+        for outcome in OUTCOMES:
+            model = smf.ols(f"{outcome} ~ Version * {moderator}", data=df).fit()
+            tables[moderator, outcome] = model.summary2().tables[1], sm.stats.anova_lm(model, typ=2)
+    return tables
+
+def batched_tables():
+    tables = {}
+    for moderator in MODERATORS:
+        models = fit_outcomes(df, f"Version * {moderator}", OUTCOMES)
+        for outcome in OUTCOMES:
+            tables[moderator, outcome] = models.coef_table(outcome), models.anova_table(outcome)
+    return tables, models
+
+start = time.perf_counter()
+reference = statsmodels_tables()
+statsmodels_s = time.perf_counter() - start
+start = time.perf_counter()
+batched, _ = batched_tables()
+batched_s = time.perf_counter() - start
+for key, (coef, anova) in reference.items():
+    assert np.allclose(coef.to_numpy(), batched[key][0].to_numpy(), rtol=1e-8, atol=1e-10), key
+    assert np.allclose(anova.to_numpy(), batched[key][1].to_numpy(), rtol=1e-8, atol=1e-10, equal_nan=True), key
+
+# Residual bootstrap, one cell: statsmodels refits the formula per replicate.
+model = smf.ols("Trust ~ Version * Gender", data=df).fit()
+rng = np.random.default_rng(0)
+data = df.loc[model.model.data.row_labels].copy()
+start = time.perf_counter()
+for _ in range(N_BOOT_STATSMODELS):
+    data["Trust"] = model.fittedvalues + rng.choice(model.resid.to_numpy(), size=len(data))
+    smf.ols("Trust ~ Version * Gender", data=data).fit()
+per_refit = (time.perf_counter() - start) / N_BOOT_STATSMODELS
+
+start = time.perf_counter()
+for moderator in MODERATORS:
+    models = fit_outcomes(df, f"Version * {moderator}", OUTCOMES)
+    for outcome in OUTCOMES:
+        models[outcome].residual_bootstrap(outcome, N_BOOT)
+bootstrap_s = time.perf_counter() - start
+
+cells = len(MODERATORS) * len(OUTCOMES)
+print(f"{cells} outcome x moderator models, coefficient + Type II ANOVA tables:")
+print(f"  smf.ols + anova_lm {statsmodels_s:.3f}s, fit_outcomes {batched_s:.3f}s ({statsmodels_s / batched_s:.1f}x)")
+print(f"{N_BOOT:,} residual-bootstrap replicates per model:")
+print(f"  smf.ols refits ~{per_refit * N_BOOT * cells:.1f}s (extrapolated from {N_BOOT_STATSMODELS}), "
+      f"shared factorisation {bootstrap_s:.2f}s")
@@ -0,0 +1,67 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+from streamlit.testing.v1 import AppTest
+
+# Usage (from the project root): python benchmarks/consent_startup_benchmark.py [trials]
+#
+# Measures time from the consent click to the first study question.
+#   before: router_app.py redirects to a separately hosted app, which pays a cold
+#           start (fresh interpreter, imports, first script run) on another host.
+#   after:  streamlit_app.py assigns the condition in-process and switches page.
+# Browser navigation and the websocket handshake to a second host are not
+# simulated, so the "before" numbers are a lower bound.
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(project_root)
+
+TRIALS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+CONDITION_SCRIPTS = {
+    "elli": "Elli_version/eli_app.py",
+    "static": "Static_version/static_app.py",
+}
+
+COLD_START = """
+import sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+at.secrets["openai"] = {"api_key": "sk-benchmark"}
+at.secrets["google_sheets"] = {"sheet_id": "benchmark"}
+at.run()
+sys.exit(1 if at.exception else 0)
+"""
+
+def new_app(script):
+    at = AppTest.from_file(os.path.join(project_root, script), default_timeout=60)
+    at.secrets["openai"] = {"api_key": "sk-benchmark"}
+    at.secrets["google_sheets"] = {"sheet_id": "benchmark"}
+    return at.run()
+
+def before():
+    at = new_app("Consent_script/router_app.py")
+    start = time.perf_counter()
+    at.button[0].click().run()
+    condition = at.session_state["condition"]
+    proc = subprocess.run([sys.executable, "-c", COLD_START, CONDITION_SCRIPTS[condition]], cwd=project_root, capture_output=True)
+    return condition, time.perf_counter() - start, proc.returncode == 0
+
+def after():
+    at = new_app("streamlit_app.py")
+    start = time.perf_counter()
+    at.button[0].click().run()
+    return at.session_state["condition"], time.perf_counter() - start, not at.exception
+
+results = []
+for mode, trial in [("before", before), ("after", after)]:
+    for _ in range(TRIALS):
+        condition, seconds, ok = trial()
+        results.append((mode, condition, seconds, ok))
+
+print(f"{'Mode':<8} {'Condition':<10} {'n':>3} {'median (s)':>11} {'max (s)':>9} {'failed':>7}")
+for mode in ["before", "after"]:
+    for condition in CONDITION_SCRIPTS:
+        times = [s for m, c, s, ok in results if m == mode and c == condition]
+        failed = sum(1 for m, c, s, ok in results if m == mode and c == condition and not ok)
+        if times:
+            print(f"{mode:<8} {condition:<10} {len(times):>3} {statistics.median(times):>11.3f} {max(times):>9.3f} {failed:>7}")
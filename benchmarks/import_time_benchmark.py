@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+# Usage (from the project root): python benchmarks/import_time_benchmark.py [repeats]
+#
+# Runs `python -X importtime` over what each page imports before it can paint,
+# reports the slowest modules, and checks that no external SDK (OpenAI, Google)
+# is imported on the way to the first screen.
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+REPEATS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+FIRST_PAINT_IMPORTS = {
+    "streamlit (baseline)": ["streamlit"],
+    "eli_app": ["streamlit", "utils.chatbot", "utils.clients", "utils.telemetry"],
+    "static_app": ["streamlit", "utils.clients", "utils.telemetry"],
+    "streamlit_app": ["streamlit", "utils.clients"],
+}
+LAZY_ONLY = ["openai", "gspread", "google.oauth2", "google.auth", "httpx"]
+REFERENCE_IMPORTS = {
+    "openai": ["openai"],
+    "gspread + google-auth": ["gspread", "google.oauth2.service_account"],
+}
+
+def importtime(modules):
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=project_root, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented under their importer; only top-level
+        # entries are summed so nothing is counted twice.
+        timings[name.strip()] = (int(self_us), int(cumulative_us), not name[1:].startswith(" "))
+    return timings
+
+def total_ms(timings):
+    return sum(cumulative_us for _, cumulative_us, top_level in timings.values() if top_level) / 1000
+
+def measure(label, modules):
+    runs = [importtime(modules) for _ in range(REPEATS)]
+    best = min(runs, key=total_ms)
+    return label, total_ms(best), best
+
+print(f"{'Entry':<24} {'import ms (best of ' + str(REPEATS) + ')':>24}  external SDKs imported")
+reports = []
+for label, modules in {**FIRST_PAINT_IMPORTS, **REFERENCE_IMPORTS}.items():
+    label, ms, timings = measure(label, modules)
+    eager = [m for m in LAZY_ONLY if m in timings] if label in FIRST_PAINT_IMPORTS else []
+    print(f"{label:<24} {ms:>24.1f}  {', '.join(eager) if eager else '-'}")
+    reports.append((label, timings))
+
+print("\nSlowest modules on the way to Elli's greeting (by self time, ms):")
+eli_timings = dict(reports)["eli_app"]
+for name, (self_us, cumulative_us, _) in sorted(eli_timings.items(), key=lambda kv: -kv[1][0])[:15]:
+    print(f"  {name:<50} self {self_us / 1000:>7.1f}  cumulative {cumulative_us / 1000:>7.1f}")
+
+if any(m in eli_timings for m in LAZY_ONLY):
+    sys.exit("❌ An external SDK is imported before the first paint.")
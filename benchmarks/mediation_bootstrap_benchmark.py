@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+import numpy as np
+import pingouin as pg
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "data analysis"))
+from study_data import load_study_data, binary_gender
+from bootstrap_mediation import mediation_bootstrap
+
+# Usage (from the project root): python -m benchmarks.mediation_bootstrap_benchmark [n_boot]
+#
+# Times the Version -> Empathy -> Trust mediation as mediation_analysis.py
+# used to run it (pingouin, 5000 resamples) against the batched engine, and
+# checks that the engine reproduces pingouin's point estimates.
+N_BOOT = int(float(sys.argv[1])) if len(sys.argv) > 1 else 50_000
+
+df = binary_gender(load_study_data())
+df["Version_bin"] = df["Version"].map({"Elli": 0, "Static": 1}).astype(float)
+df = df.dropna(subset=["Empathy", "Trust", "Version_bin"])
+args = dict(data=df, x="Version_bin", m="Empathy", y="Trust", alpha=0.05, seed=42)
+
+start = time.perf_counter()
+reference = pg.mediation_analysis(n_boot=5000, **args)
+pingouin_s = time.perf_counter() - start
+
+engine = mediation_bootstrap(n_boot=5000, workers=1, **args)
+for column in ["coef", "se", "pval", "CI2.5", "CI97.5"]:
+    # Bootstrap-based values of the indirect effect differ by resampling noise only.
+    rows = slice(None, -1) if column != "coef" else slice(None)
+    assert np.allclose(engine[column].to_numpy()[rows], reference[column].to_numpy()[rows]), column
+
+print(f"{'method':<34} {'n_boot':>8} {'seconds':>9} {'resamples/s':>13}")
+print(f"{'pingouin.mediation_analysis':<34} {5000:>8,} {pingouin_s:>9.3f} {5000 / pingouin_s:>13,.0f}")
+for n_boot in [5000, N_BOOT]:
+    for workers in sorted({1, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        result = mediation_bootstrap(n_boot=n_boot, workers=workers, **args)
+        elapsed = time.perf_counter() - start
+        label = f"batched engine ({workers} process{'es' if workers > 1 else ''})"
+        print(f"{label:<34} {n_boot:>8,} {elapsed:>9.3f} {n_boot / elapsed:>13,.0f}")
+
+indirect = result.iloc[-1]
+print(f"\nIndirect effect {indirect['coef']:.4f} (pingouin {reference.iloc[-1]['coef']:.4f}); "
+      f"bias-corrected [{indirect['CI2.5']:.3f}, {indirect['CI97.5']:.3f}], "
+      f"percentile [{indirect['Percentile CI2.5']:.3f}, {indirect['Percentile CI97.5']:.3f}], "
+      f"BCa [{indirect['BCa CI2.5']:.3f}, {indirect['BCa CI97.5']:.3f}]")
@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+import numpy as np
+from scipy import stats
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "data analysis"))
+from study_data import load_study_data
+from permutation_tests import permutation_tests
+
+# Usage (from the project root): python -m benchmarks.permutation_benchmark [n_perm]
+#
+# Permutation p-values for the five outcome measures: one SciPy
+# permutation_test per measure (Welch |t|) against the batched engine, which
+# also permutes U, the max-T family and bootstraps Cohen's d in the same pass.
+# Checks the engine's observed statistics against SciPy first.
+N_PERM = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100_000
+MEASURES = ["Trust", "Comfort", "Empathy", "Total_PHQ", "Total_GAD"]
+
+df = load_study_data()
+groups = {measure: (df.loc[df["Version"] == "Elli", measure].dropna().to_numpy(),
+                    df.loc[df["Version"] == "Static", measure].dropna().to_numpy()) for measure in MEASURES}
+
+engine = permutation_tests(df, "Version", "Elli", MEASURES, n_perm=1000, n_boot=100).set_index("Measure")
+for measure, (x, y) in groups.items():
+    assert np.isclose(engine.loc[measure, "t"], stats.ttest_ind(x, y, equal_var=False).statistic)
+    assert np.isclose(engine.loc[measure, "U"], stats.mannwhitneyu(x, y, alternative="two-sided").statistic)
+
+def abs_welch_t(a, b, axis):
+    return np.abs(stats.ttest_ind(a, b, equal_var=False, axis=axis).statistic)
+
+start = time.perf_counter()
+scipy_p = {measure: stats.permutation_test((x, y), abs_welch_t, n_resamples=N_PERM, vectorized=True,
+                                           alternative="greater", random_state=0).pvalue
+           for measure, (x, y) in groups.items()}
+scipy_s = time.perf_counter() - start
+
+start = time.perf_counter()
+engine = permutation_tests(df, "Version", "Elli", MEASURES, n_perm=N_PERM, n_boot=10_000).set_index("Measure")
+engine_s = time.perf_counter() - start
+
+print(f"{'measure':<10} {'scipy p':>9} {'engine p':>9} {'max-T p':>9}")
+for measure in MEASURES:
+    print(f"{measure:<10} {scipy_p[measure]:>9.4f} {engine.loc[measure, 'perm p (t)']:>9.4f} "
+          f"{engine.loc[measure, 'perm p (t, max-T)']:>9.4f}")
+print(f"\n{N_PERM:,} permutations x {len(MEASURES)} measures: "
+      f"scipy.stats.permutation_test {scipy_s:.2f}s (t only), batched engine {engine_s:.2f}s (t, U, max-T, d bootstrap)")
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import statsmodels.formula.api as smf
+from scipy import stats
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "data analysis"))
+from study_data import load_study_data, binary_gender
+from power_simulation import StudyParameters, CELLS, simulate, welch_p, interaction_p, mediation_p, power_curves
+
+# Usage (from the project root): python -m benchmarks.power_simulation_benchmark [n_sims]
+#
+# Power at one sample size: fitting every simulated dataset with SciPy and
+# statsmodels (Welch t, Version x Gender OLS, the two mediation regressions)
+# against the batched engine. Checks the engine's p-values against those
+# fits on the first datasets.
+N_SIMS = int(float(sys.argv[1])) if len(sys.argv) > 1 else 20_000
+N = 149
+N_LOOP = 200
+
+params = StudyParameters(binary_gender(load_study_data()))
+rng = np.random.default_rng(0)
+cell, empathy, trust, n_elli = simulate(rng, N_LOOP, N, params.cumulative(), params.elli_share, params.male_share)
+p_joint, _ = mediation_p(empathy, trust, n_elli)
+engine = np.column_stack([welch_p(trust, n_elli), interaction_p(trust, cell), p_joint])
+
+def loop_pvalues(i):
+    df = pd.DataFrame({"Version": np.where(cell[i] >= 2, "Static", "Elli"),
+                       "Gender": np.array([gender for _, gender in CELLS])[cell[i]],
+                       "Empathy": empathy[i], "Trust": trust[i]})
+    welch = stats.ttest_ind(trust[i, n_elli:], trust[i, :n_elli], equal_var=False).pvalue
+    interaction = smf.ols("Trust ~ Version * Gender", data=df).fit().pvalues["Version[T.Static]:Gender[T.male]"]
+    a = smf.ols("Empathy ~ Version", data=df).fit().pvalues["Version[T.Static]"]
+    b = smf.ols("Trust ~ Version + Empathy", data=df).fit().pvalues["Empathy"]
+    return welch, interaction, max(a, b)
+
+start = time.perf_counter()
+loop = np.array([loop_pvalues(i) for i in range(N_LOOP)])
+per_dataset = (time.perf_counter() - start) / N_LOOP
+assert np.allclose(loop, engine, rtol=1e-8, atol=1e-12)
+
+start = time.perf_counter()
+power_curves(params, [N], n_sims=N_SIMS)
+engine_s = time.perf_counter() - start
+
+print(f"{N_SIMS:,} datasets of N={N}, Welch t + interaction + mediation (engine also: Empathy tests, Sobel):")
+print(f"  scipy/statsmodels per dataset ~{per_dataset * N_SIMS:.1f}s (extrapolated from {N_LOOP}), batched engine {engine_s:.2f}s")
@@ -0,0 +1,72 @@
+import statistics
+import sys
+from utils.message_log import BATCH_SIZE
+from utils.rate_limit import AdmissionController, SimulatedClock, CRITICAL, LOW, PRIORITY_NAMES, GRANTED, EXPIRED, PENDING, DEFAULT_TIMEOUTS
+
+# Usage (from the project root): python -m benchmarks.rate_limit_simulation [participants] [arrival_window_s]
+#
+# Replays a recruitment burst against the Google Sheets limiter on a simulated
+# clock: every Elli session writes ~40 per-message logs over six minutes and
+# one final data row (critical, 3 API calls) at the end. Message logs go
+# through the background writer (utils/message_log.py): one low-priority
+# ticket at a time, each carrying every row queued by the time it is granted.
+PARTICIPANTS = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+ARRIVAL_WINDOW = float(sys.argv[2]) if len(sys.argv) > 2 else 600.0
+SESSION_LENGTH = 360.0
+LOGS_PER_SESSION = 40
+RATE_PER_MINUTE = 60
+TICK = 0.1
+
+requests = []
+for i in range(PARTICIPANTS):
+    start = i * ARRIVAL_WINDOW / PARTICIPANTS
+    for k in range(LOGS_PER_SESSION):
+        requests.append((start + k * SESSION_LENGTH / LOGS_PER_SESSION, LOW, 1))
+    requests.append((start + SESSION_LENGTH, CRITICAL, 3))
+requests.sort(key=lambda r: r[0])
+
+clock = SimulatedClock()
+limiter = AdmissionController("sheets", RATE_PER_MINUTE, clock=clock)
+tickets = []
+queued = []        # enqueue times of message rows not yet written
+row_delays = []    # enqueue to write, per message row
+writer = None
+horizon = requests[-1][0] + max(DEFAULT_TIMEOUTS.values()) + TICK
+next_request = 0
+while clock() <= horizon or queued:
+    while next_request < len(requests) and requests[next_request][0] <= clock():
+        at, priority, cost = requests[next_request]
+        if priority == LOW:
+            queued.append(at)
+        else:
+            tickets.append(limiter.submit(priority, cost))
+        next_request += 1
+    if writer is None and queued:
+        writer = limiter.submit(LOW, 1, timeout=float("inf"))
+        tickets.append(writer)
+    limiter.dispatch()
+    if writer is not None and writer.state != PENDING:
+        batch, queued = queued[:BATCH_SIZE], queued[BATCH_SIZE:]
+        row_delays += [clock() - at for at in batch]
+        writer = None
+    clock.advance(TICK)
+
+demand_per_minute = sum(cost for _, _, cost in requests) / (horizon / 60)
+print(f"Simulated {PARTICIPANTS} participants over {clock():.0f}s: demand {demand_per_minute:.0f} calls/min "
+      f"if every message were its own call, vs quota {RATE_PER_MINUTE}/min\n")
+print(f"{'Priority':<10} {'requests':>9} {'granted':>8} {'expired':>8} {'p50 wait (s)':>13} {'p95 wait (s)':>13}")
+for priority, name in PRIORITY_NAMES.items():
+    mine = [t for t in tickets if t.priority == priority]
+    if not mine:
+        continue
+    waits = sorted(t.waited for t in mine if t.state == GRANTED)
+    p50 = statistics.median(waits) if waits else float("nan")
+    p95 = waits[int(0.95 * (len(waits) - 1))] if waits else float("nan")
+    expired = sum(1 for t in mine if t.state == EXPIRED)
+    print(f"{name:<10} {len(mine):>9} {len(waits):>8} {expired:>8} {p50:>13.2f} {p95:>13.2f}")
+
+row_delays.sort()
+print(f"\nMessage rows: {len(row_delays)} of {PARTICIPANTS * LOGS_PER_SESSION} written in "
+      f"{sum(1 for t in tickets if t.priority == LOW)} batches; delay p50 {statistics.median(row_delays):.2f}s, "
+      f"p95 {row_delays[int(0.95 * (len(row_delays) - 1))]:.2f}s (participants never wait for them)")
+print("\nLimiter snapshot:", limiter.snapshot())
@@ -0,0 +1,46 @@
+import sys
+import time
+import numpy as np
+from utils.instruments import INSTRUMENTS, ITEM_COLUMNS, score_matrix, interpret
+
+# Usage (from the project root): python -m benchmarks.scoring_benchmark [total_rows] [chunk_rows]
+#
+# Re-scores synthetic PHQ-9/GAD-7 response matrices with the vectorised
+# scorer, checks a sample against the per-participant interpret() path, and
+# reports rows per second.
+TOTAL_ROWS = int(float(sys.argv[1])) if len(sys.argv) > 1 else 5_000_000
+CHUNK_ROWS = int(float(sys.argv[2])) if len(sys.argv) > 2 else 1_000_000
+
+rng = np.random.default_rng(42)
+
+def synthetic_responses(n):
+    x = rng.integers(0, 4, size=(n, len(ITEM_COLUMNS))).astype(np.float64)
+    x[rng.random(x.shape) < 0.001] = np.nan
+    return x
+
+# Correctness spot check against the scalar path the apps use.
+sample = synthetic_responses(10_000)
+scored = score_matrix(sample)
+phq_bands = [label for _, label in INSTRUMENTS["phq"]["bands"]]
+for row, total, band in zip(sample, scored["phq_total"], scored["phq_band"]):
+    if not np.isnan(total):
+        assert phq_bands[band] == interpret(int(total), "phq")
+        assert total == row[:9].sum()
+
+print(f"{'rows':>12} {'seconds':>9} {'rows/s':>14}")
+for n in [10_000, 100_000, 1_000_000]:
+    x = synthetic_responses(n)
+    start = time.perf_counter()
+    score_matrix(x)
+    elapsed = time.perf_counter() - start
+    print(f"{n:>12,} {elapsed:>9.3f} {n / elapsed:>14,.0f}")
+
+elapsed = 0.0
+flagged = 0
+for offset in range(0, TOTAL_ROWS, CHUNK_ROWS):
+    x = synthetic_responses(min(CHUNK_ROWS, TOTAL_ROWS - offset))
+    start = time.perf_counter()
+    scored = score_matrix(x)
+    elapsed += time.perf_counter() - start
+    flagged += int(scored["self_harm"].sum())
+print(f"{TOTAL_ROWS:>12,} {elapsed:>9.3f} {TOTAL_ROWS / elapsed:>14,.0f}  (chunks of {CHUNK_ROWS:,}; {flagged:,} PHQ-9 item 9 flags)")
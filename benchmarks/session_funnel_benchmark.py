@@ -0,0 +1,108 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "data analysis"))
+from session_funnel import STEPS, read_message_log, sessionize, message_positions, step_survival
+from utils.instruments import item_texts
+
+# Usage (from the project root):
+#   python -m benchmarks.session_funnel_benchmark                  # 1e4, 1e5, 1e6 sessions
+#   python -m benchmarks.session_funnel_benchmark --sessions 1e6 --legacy
+#
+# Writes a synthetic Elli message log in log_message_to_sheet's format: one
+# bot prompt and one answer per step up to a random stopping step, with name
+# retries, scale reminders and the crisis-free chatter in between. It then
+# times reading it, sessionizing it and computing the funnel, and checks the
+# funnel against the stopping steps it generated. --legacy blanks the session
+# ids, so sessions are recovered from the prompt sequence alone (sessions are
+# written one after another, as the heuristic assumes); sessions that stop
+# before their first prompt join a neighbour, so the error is then not zero.
+STEP_PROMPTS = {
+    "start": "Thanks for sharing. Could you please give me just your name or nickname so I can know how to address you? (Your name will not be stored or used for any other purpose.)",
+    "mood": "Hi Sam, I’m Elli. 🌱 I’m here to gently check in with you. How are you feeling today? (2-3 sentences)",
+    "age": "Before we continue, could you share your age?",
+    "gender": "Thank you. What gender do you identify with?",
+    "phq1": "Thanks for sharing. Let’s reflect on some feelings together.\n\nPlease respond with a number: 0 (Not at all), 1 (Several days), 2 (More than half the days), or 3 (Nearly every day).\n\nOver the last 2 weeks: " + item_texts("phq")[0],
+    **{f"phq{i + 1}": f"{i + 1}. {text}" for i, text in enumerate(item_texts("phq")) if i},
+    "gad1": "Thank you. Now let’s look at anxiety. Over the last 2 weeks: " + item_texts("gad")[0],
+    **{f"gad{i + 1}": f"{i + 1}. {text}" for i, text in enumerate(item_texts("gad")) if i},
+    "trust": "How much did you feel you could trust Elli? (1–5)",
+    "comfort": "Thank you. How comfortable did you feel interacting with Elli? (1–5)",
+    "empathy": "And how empathic did you find Elli? (1–5)",
+    "feedback": "Thanks. Finally, do you have any thoughts or feedback about this experience?",
+    "done": "Thanks so much for checking in today, Sam. Wishing you care and calm. 🌻",
+}
+NOISE = "Please respond with a number: 0 (Not at all), 1 (Several days), 2 (More than half the days), or 3 (Nearly every day)."
+ANSWERS = np.array(["Sam", "I'm fine", "27", "female", "1", "2", "0", "3", "ok"], dtype=object)
+
+
+def synthetic_log(path, sessions, seed=42, legacy=False):
+    # Returns the stopping position of every session.
+    rng = np.random.default_rng(seed)
+    steps = STEPS["Elli"]
+    prompts = np.array([STEP_PROMPTS[step] for step in steps], dtype=object)
+    hazard = np.full(len(steps), 0.01)
+    hazard[[1, 2, 20, -1]] = [0.08, 0.04, 0.05, 0]
+    # Stop at the first step whose hazard comes up; those who never stop finish.
+    stops = rng.random((sessions, len(steps))) < hazard
+    stop = np.where(stops.any(axis=1), np.argmax(stops, axis=1), len(steps) - 1)
+    # Each session: "name" (user), then prompt/answer pairs for positions 1..stop, the last prompt unanswered.
+    # A quarter are asked for their name twice; a tenth get one scale reminder.
+    retry = rng.random(sessions) < 0.25
+    reminder = rng.random(sessions) < 0.10
+    lengths = 1 + 2 * retry + 2 * stop
+    session = np.repeat(np.arange(sessions), lengths)
+    offset = np.arange(len(session)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    # Offsets past the retry pair count steps from 1: user at even offsets, prompt at odd ones.
+    shifted = offset - 2 * retry[session]
+    role = np.where(offset % 2 == 0, "user", "bot")
+    step = np.where(shifted >= 1, (shifted + 1) // 2, 0)
+    content = np.where(role == "bot", prompts[step], ANSWERS[rng.integers(len(ANSWERS), size=len(session))])
+    content = np.where((role == "bot") & (offset == 1) & retry[session], prompts[0], content)
+    ids = pd.Series(np.char.mod("%08x", rng.permutation(sessions * 4)[:sessions])[session])
+    # 10 s between messages, a minute between sessions.
+    times = pd.Timestamp("2025-06-23") + pd.to_timedelta(np.arange(len(session)) * 10 + session * 60, unit="s")
+    df = pd.DataFrame({
+        "session": "" if legacy else ids, "gender": "", "age": "", "role": role, "content": content,
+        "timestamp": times.astype(str),
+    })
+    # Scale reminders are extra bot rows that ask no step.
+    extra = df[(role == "bot") & reminder[session] & (step == 8)].assign(content=NOISE)
+    df = pd.concat([df, extra]).sort_index(kind="stable")
+    df.to_csv(path, header=False, index=False)
+    return stop
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the message-log funnel on synthetic logs.")
+    parser.add_argument("--sessions", type=float, nargs="+", default=[1e4, 1e5, 1e6])
+    parser.add_argument("--legacy", action="store_true", help="Blank session ids (prompt-sequence sessionization)")
+    args = parser.parse_args(argv)
+
+    print(f"{'sessions':>10} {'events':>11} {'read (s)':>9} {'sessionize (s)':>15} {'funnel (s)':>11} {'max |share error|':>18}")
+    with tempfile.TemporaryDirectory() as scratch:
+        for sessions in (int(s) for s in args.sessions):
+            path = os.path.join(scratch, f"messages-{sessions}.csv")
+            stop = synthetic_log(path, sessions, legacy=args.legacy)
+            start = time.perf_counter()
+            events = read_message_log(path)
+            read_s = time.perf_counter() - start
+            start = time.perf_counter()
+            events = sessionize(events)
+            sessionize_s = time.perf_counter() - start
+            start = time.perf_counter()
+            survival = step_survival(message_positions(events), {"Elli": "message log"})
+            funnel_s = time.perf_counter() - start
+
+            expected = np.bincount(stop, minlength=len(STEPS["Elli"]))[::-1].cumsum()[::-1] / sessions
+            error = np.abs(survival.loc[survival["Version"] == "Elli", "Share"].to_numpy() - expected).max()
+            print(f"{sessions:>10,} {len(events):>11,} {read_s:>9.2f} {sessionize_s:>15.2f} {funnel_s:>11.2f} {error:>18.2g}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
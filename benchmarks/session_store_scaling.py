@@ -0,0 +1,75 @@
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from utils.session_store import SQLiteSessionStore, FileSessionStore
+
+# Usage (from the project root): python -m benchmarks.session_store_scaling [sqlite|file] [sessions] [turns]
+#
+# Simulates several Streamlit worker processes sharing one session store.
+# Consecutive turns of every session are deliberately routed to different
+# workers (turn r of session s goes to worker (s + r) % W), the way a
+# non-sticky balancer would after reconnects. Each turn loads the session,
+# does a rerun's worth of CPU work on the history, appends a message and saves.
+BACKEND = sys.argv[1] if len(sys.argv) > 1 else "sqlite"
+SESSIONS = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+TURNS = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+WORKER_COUNTS = sorted({1, 2, 4, os.cpu_count() or 1})
+
+def open_backend(location):
+    return SQLiteSessionStore(location) if BACKEND == "sqlite" else FileSessionStore(location)
+
+def simulate_rerun(messages):
+    # Roughly what rendering the chat history and re-running the script costs.
+    rendered = ""
+    for _ in range(300):
+        rendered = "".join(f"**{m['role']}**: {m['content']}\n" for m in messages)
+    return len(rendered)
+
+def worker(location, worker_id, workers, barrier):
+    store = open_backend(location)
+    for turn in range(TURNS):
+        for s in range(SESSIONS):
+            if (s + turn) % workers != worker_id:
+                continue
+            sid = f"session-{s}"
+            version, state = store.load(sid)
+            state = state or {"messages": [], "workers": []}
+            simulate_rerun(state["messages"])
+            state["messages"].append({"role": "user", "content": f"turn {turn} " + "lorem ipsum " * 20})
+            state["workers"].append(worker_id)
+            store.save(sid, version + 1, state)
+        barrier.wait()
+
+def run(workers):
+    with tempfile.TemporaryDirectory() as tmp:
+        location = os.path.join(tmp, "sessions.db") if BACKEND == "sqlite" else os.path.join(tmp, "sessions")
+        open_backend(location)
+        barrier = mp.Barrier(workers)
+        procs = [mp.Process(target=worker, args=(location, w, workers, barrier)) for w in range(workers)]
+        start = time.perf_counter()
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        store = open_backend(location)
+        consistent = True
+        for s in range(SESSIONS):
+            version, state = store.load(f"session-{s}")
+            turns_seen = [int(m["content"].split()[1]) for m in state["messages"]]
+            consistent &= version == TURNS and turns_seen == list(range(TURNS))
+            consistent &= len(set(state["workers"])) == min(workers, TURNS)
+        return elapsed, consistent
+
+print(f"{BACKEND} store, {SESSIONS} sessions x {TURNS} turns, {os.cpu_count()} CPUs")
+print(f"{'workers':>8} {'turns/s':>10} {'speed-up':>9} {'efficiency':>11} {'consistent':>11}")
+baseline = None
+for workers in WORKER_COUNTS:
+    elapsed, consistent = run(workers)
+    throughput = SESSIONS * TURNS / elapsed
+    baseline = baseline or throughput
+    speedup = throughput / baseline
+    print(f"{workers:>8} {throughput:>10.0f} {speedup:>9.2f} {speedup / workers:>11.0%} {str(consistent):>11}")
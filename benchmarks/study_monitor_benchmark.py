@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+import time
+import pandas as pd
+from scipy.stats import chi2_contingency
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "data analysis"))
+from synthetic_data import write_synthetic
+from utils.study_monitor import StudyMonitor, completion_chi2, describe
+
+# Usage (from the project root): python -m benchmarks.study_monitor_benchmark
+#
+# What the dashboard costs as the study grows: appending 100 participants to
+# an export of N rows and bringing the monitor up to date (follow() reads
+# only the new rows), then reading the aggregates, against re-reading the
+# whole export and recomputing the dropout table, chi-square and outcome
+# means as the analysis scripts do.
+SIZES = [1_000, 10_000, 100_000]
+NEW_ROWS = 100
+
+print(f"{'rows':>8} {'follow +100 (ms)':>17} {'snapshot (ms)':>14} {'recompute (ms)':>15}")
+with tempfile.TemporaryDirectory() as scratch:
+    for rows in SIZES:
+        export = os.path.join(scratch, f"export-{rows}.csv")
+        write_synthetic(export, rows + NEW_ROWS, seed=rows)
+        with open(export, encoding="utf-8", newline="") as f:
+            whole = pd.read_csv(f, dtype=str, keep_default_na=False)
+        whole.iloc[:rows].to_csv(export, index=False)
+        monitor = StudyMonitor(os.path.join(scratch, f"monitor-{rows}.db"))
+        monitor.follow(export)
+
+        whole.iloc[rows:].to_csv(export, mode="a", header=False, index=False)
+        start = time.perf_counter()
+        monitor.follow(export)
+        follow_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        counts, moments = monitor.snapshot()
+        completion_chi2(counts)
+        describe(moments)
+        snapshot_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        df = pd.read_csv(export)
+        df["Version"] = df["Version"].str.strip().str.capitalize()
+        chi2_contingency(pd.crosstab(df["Version"], df["Dropout_status"]))
+        analytic = df[(df["Dropout_status"] == 0) & (df["Participant_status"] == 0)]
+        analytic.groupby("Version")[["Trust", "Comfort", "Total_PHQ", "Total_GAD"]].agg(["mean", "std"])
+        recompute_ms = (time.perf_counter() - start) * 1000
+        print(f"{rows:>8,} {follow_ms:>17.1f} {snapshot_ms:>14.2f} {recompute_ms:>15.1f}")
@@ -0,0 +1,36 @@
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "data analysis"))
+from text_analytics import count_terms
+
+# Usage (from the project root): python -m benchmarks.text_analytics_benchmark [messages]
+#
+# Streams synthetic transcript messages through the uni/bigram counter and
+# reports throughput and peak traced memory against corpus size. Messages
+# are generated lazily, so the corpus itself is never held in memory.
+MESSAGES = int(float(sys.argv[1])) if len(sys.argv) > 1 else 300_000
+
+rng = np.random.default_rng(42)
+# Zipf-distributed vocabulary, roughly like conversational English.
+VOCABULARY = np.array([f"word{i}" for i in range(20_000)] + ["the", "and", "i", "feel", "really", "not"])
+
+def synthetic_messages(n):
+    for i in range(n):
+        length = rng.integers(3, 40)
+        words = VOCABULARY[np.minimum(rng.zipf(1.3, size=length), len(VOCABULARY)) - 1]
+        yield " ".join(words) + ".", f"session{i % 500}"
+
+print(f"{'messages':>10} {'seconds':>9} {'msgs/s':>10} {'terms':>10} {'non-zeros':>12} {'peak MB':>9}")
+for n in [1_000, 10_000, 100_000, MESSAGES]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    counts = count_terms(synthetic_messages(n))
+    top = counts.top_terms(n=20)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    print(f"{n:>10,} {elapsed:>9.2f} {n / elapsed:>10,.0f} {counts.matrix.shape[1]:>10,} {counts.matrix.nnz:>12,} {peak:>9.1f}")
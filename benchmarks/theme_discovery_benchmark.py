@@ -0,0 +1,38 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "data analysis"))
+from study_data import load_study_data
+from synthetic_data import FEEDBACK
+from theme_discovery import discover
+
+# Usage (from the project root): python -m benchmarks.theme_discovery_benchmark [texts]
+#
+# Times theme discovery on synthetic feedback of increasing size. Each text
+# joins one to three sentences drawn from the study's real comments and the
+# synthetic generator's, so vocabulary and length look like the real thing.
+TEXTS = int(float(sys.argv[1])) if len(sys.argv) > 1 else 200_000
+
+feedback = load_study_data()["Feedback"].dropna().astype(str)
+SENTENCES = np.array([s.strip() for text in list(feedback) + FEEDBACK for s in text.split(".") if s.strip()], dtype=object)
+rng = np.random.default_rng(42)
+
+def synthetic_feedback(n):
+    counts = rng.integers(1, 4, size=n)
+    picks = SENTENCES[rng.integers(len(SENTENCES), size=counts.sum())]
+    bounds = np.cumsum(counts)
+    return [". ".join(picks[end - count:end]) + "." for end, count in zip(bounds, counts)]
+
+print(f"{'texts':>10} {'seconds':>9} {'texts/s':>10} {'themed':>8}")
+for n in [1_000, 10_000, 100_000, TEXTS]:
+    texts = synthetic_feedback(n)
+    groups = rng.choice(["Elli", "Static"], size=n).tolist()
+    start = time.perf_counter()
+    themes, assigned = discover(texts, groups, k=6)
+    elapsed = time.perf_counter() - start
+    print(f"{n:>10,} {elapsed:>9.2f} {n / elapsed:>10,.0f} {assigned.notna().mean():>8.1%}")
+with pd.option_context("display.max_colwidth", 60, "display.width", 200):
+    print(themes[["Theme", "Sample Words", "Texts"]].to_string(index=False))
@@ -1,11 +1,10 @@
 import pandas as pd
 import os
+from study_data import load_study_data, OUTPUTS_DIR
 
-df = pd.read_csv("data/Chatbot_Study_Data_Cleaned.csv")
+df = load_study_data(analytic=False)
 
-df["Version"] = df["Version"].str.strip().str.capitalize()
-
-os.makedirs("outputs", exist_ok=True)
+os.makedirs(OUTPUTS_DIR, exist_ok=True)
 flow_rows = []
 
 for version in ["Elli", "Static"]:
@@ -31,4 +30,4 @@ for version in ["Elli", "Static"]:
 flow_table = pd.DataFrame(flow_rows)
 
 print(flow_table)
-flow_table.to_csv("outputs/participant_flow_table.csv", index=False)
\ No newline at end of file
+flow_table.to_csv(os.path.join(OUTPUTS_DIR, "participant_flow_table.csv"), index=False)
\ No newline at end of file
@@ -1,60 +1,33 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud, STOPWORDS
-from collections import Counter
-import nltk
 import os
+from study_data import load_raw, load_study_data, OUTPUTS_DIR
+from text_analytics import FEEDBACK_STOPWORDS, clean_text, count_terms
+from render_figures import feedback_figures, render
 
-nltk.download('stopwords')
-from nltk.corpus import stopwords
-
-df = pd.read_csv("data/Chatbot_Study_Data_Cleaned.csv")
-df = df[df["Dropout_status"] == 0].copy()
-df["Version"] = df["Version"].str.strip().str.capitalize()
+df = load_study_data()
 
 df = df[df["Feedback"].notna() & df["Feedback"].str.strip().ne("")].copy()
 
-df["Cleaned_feedback"] = (
-    df["Feedback"]
-    .str.lower()
-    .str.replace(r"[^\w\s]", "", regex=True)
-    .str.strip()
-)
+df["Cleaned_feedback"] = df["Feedback"].map(clean_text)
 
 
-os.makedirs("outputs/qualitative", exist_ok=True)
-df.to_csv("outputs/qualitative/cleaned_feedback.csv", index=False)
+qualitative_dir = os.path.join(OUTPUTS_DIR, "qualitative")
+os.makedirs(qualitative_dir, exist_ok=True)
+# Written from the export's own cells, so ages and scores keep their format.
+cleaned = load_raw().loc[df.index].assign(Version=df["Version"].astype(str), Cleaned_feedback=df["Cleaned_feedback"])
+cleaned.to_csv(os.path.join(qualitative_dir, "cleaned_feedback.csv"), index=False)
 print("✅ Cleaned feedback saved to: outputs/qualitative/cleaned_feedback.csv")
 
-stopwords_custom = set(STOPWORDS).union(stopwords.words("english"))
-stopwords_custom.update(["elli", "chatbot", "static", "feel", "felt"])  
-
-all_text = " ".join(df["Cleaned_feedback"])
-wordcloud = WordCloud(
-    width=1000, height=500,
-    background_color="white",
-    stopwords=stopwords_custom,
-    collocations=True
-).generate(all_text)
-
-os.makedirs("figures", exist_ok=True)
-plt.figure(figsize=(12, 6))
-plt.imshow(wordcloud, interpolation="bilinear")
-plt.axis("off")
-plt.title("Most Common Words in Participant Feedback", fontsize=16)
-plt.tight_layout()
-plt.savefig("figures/wordcloud_feedback.png", dpi=300)
-plt.close()
-print("📊 Word cloud saved to: figures/wordcloud_feedback.png")
-
-def get_top_words(text_series):
-    words = " ".join(text_series).split()
-    words = [w for w in words if w not in stopwords_custom]
-    return Counter(words).most_common(20)
-
-elli_words = get_top_words(df[df["Version"] == "Elli"]["Cleaned_feedback"])
-static_words = get_top_words(df[df["Version"] == "Static"]["Cleaned_feedback"])
-
-pd.DataFrame(elli_words, columns=["Word", "Frequency"]).to_csv("outputs/qualitative/elli_word_freq.csv", index=False)
-pd.DataFrame(static_words, columns=["Word", "Frequency"]).to_csv("outputs/qualitative/static_word_freq.csv", index=False)
+# Uni- and bigram counts per condition, streamed from the feedback column.
+term_counts = count_terms(zip(df["Feedback"], df["Version"].astype(str)), stopwords=FEEDBACK_STOPWORDS)
+
+status, _ = render(feedback_figures(df))["wordcloud_feedback.png"]
+print(f"📊 Word cloud {status}: figures/wordcloud_feedback.png")
+
+elli_words = term_counts.top_terms("Elli", n=20)
+static_words = term_counts.top_terms("Static", n=20)
 
+pd.DataFrame(elli_words, columns=["Word", "Frequency"]).to_csv(os.path.join(qualitative_dir, "elli_word_freq.csv"), index=False)
+pd.DataFrame(static_words, columns=["Word", "Frequency"]).to_csv(os.path.join(qualitative_dir, "static_word_freq.csv"), index=False)
+pd.DataFrame(term_counts.top_terms(n=20, ngram=2), columns=["Bigram", "Frequency"]).to_csv(
+    os.path.join(qualitative_dir, "bigram_freq.csv"), index=False)
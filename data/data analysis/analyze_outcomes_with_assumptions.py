@@ -2,23 +2,29 @@ import pandas as pd
 from scipy.stats import ttest_ind, mannwhitneyu, shapiro, levene
 import numpy as np
 import os
+from study_data import load_study_data, total_mismatches, OUTPUTS_DIR
+from permutation_tests import permutation_tests
 
-df = pd.read_csv("../../data/Chatbot_Study_Data_Cleaned.csv")
+N_PERM = 100000
+N_BOOT = 10000
 
-df = df[df["Dropout_status"] == 0].copy()
+df = load_study_data()
 
-for col in ["Trust", "Comfort", "Empathy", "Total_PHQ", "Total_GAD"]:
-    df[col] = pd.to_numeric(df[col], errors="coerce")
+# Totals are analysed as recorded; the instrument registry flags any that
+# disagree with the item responses.
+mismatches = total_mismatches(df)
+if len(mismatches):
+    print(f"⚠️ {len(mismatches)} participant(s) have recorded PHQ/GAD totals that differ from their item sums:")
+    print(mismatches[["Version", "Total_PHQ", "Total_GAD"]])
 
 variables = ["Trust", "Comfort", "Empathy", "Total_PHQ", "Total_GAD"]
 
-elli = df[df["Version"].str.strip().str.capitalize() == "Elli"]
-static = df[df["Version"].str.strip().str.capitalize() == "Static"]
+elli = df[df["Version"] == "Elli"]
+static = df[df["Version"] == "Static"]
 
-def cohens_d(x, y):
-    nx, ny = len(x), len(y)
-    pooled_std = np.sqrt(((nx - 1)*np.nanstd(x, ddof=1)**2 + (ny - 1)*np.nanstd(y, ddof=1)**2) / (nx + ny - 2))
-    return (np.nanmean(x) - np.nanmean(y)) / pooled_std if pooled_std > 0 else np.nan
+# Permutation p-values (raw and family-wise across the five measures) and
+# bootstrap CIs for Cohen's d, all measures in one pass.
+permuted = permutation_tests(df, "Version", "Elli", variables, n_perm=N_PERM, n_boot=N_BOOT, seed=42).set_index("Measure")
 
 results = []
 
@@ -31,7 +37,7 @@ for var in variables:
 
     t_stat, p_t = ttest_ind(x, y, equal_var=False, nan_policy="omit")
     u_stat, p_u = mannwhitneyu(x, y, alternative="two-sided")
-    d = cohens_d(x, y)
+    perm = permuted.loc[var]
 
     sw_x_stat, sw_x_p = shapiro(x)
     sw_y_stat, sw_y_p = shapiro(y)
@@ -45,12 +51,16 @@ for var in variables:
         "t p-value": round(p_t, 3),
         "U-stat": round(u_stat, 2),
         "U p-value": round(p_u, 3),
-        "Cohen's d": round(d, 2),
+        "Cohen's d": round(perm["d"], 2),
+        "d 95% CI": f"[{perm['d CI low']:.2f}, {perm['d CI high']:.2f}]",
+        "Perm p (t)": round(perm["perm p (t)"], 4),
+        "Perm p (U)": round(perm["perm p (U)"], 4),
+        "Perm p (t, max-T)": round(perm["perm p (t, max-T)"], 4),
         "Shapiro p (Elli)": round(sw_x_p, 3),
         "Shapiro p (Static)": round(sw_y_p, 3),
         "Levene p": round(lev_p, 3)
     })
 
 table2_df = pd.DataFrame(results)
-os.makedirs("../../outputs", exist_ok=True)
-table2_df.to_csv("../../outputs/table2_outcomes.csv", index=False)
\ No newline at end of file
+os.makedirs(OUTPUTS_DIR, exist_ok=True)
+table2_df.to_csv(os.path.join(OUTPUTS_DIR, "table2_outcomes.csv"), index=False)
\ No newline at end of file
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import f as f_dist, t as t_dist
+
+# OLS for many outcomes that share one right-hand side, e.g.
+#   fits = fit_outcomes(df, "Version * Gender", ["Trust", "Comfort", "Empathy"])
+#   fits.coef_table("Trust")    # == smf.ols("Trust ~ Version * Gender", df).fit().summary2().tables[1]
+#   fits.anova_table("Trust")   # == sm.stats.anova_lm(that model, typ=2)
+#
+# The patsy design matrix is built and factorised (QR) once per pattern of
+# missing outcomes, usually once in total. All outcomes are then solved as
+# the columns of one matrix, and Type II hypothesis matrices, which depend
+# on the design only, are shared by every outcome. residual_bootstrap()
+# reuses the same factorisation for any number of bootstrap replicates.
+RANK_TOLERANCE = 1e-10
+
+
+class Design:
+    def __init__(self, data, rhs):
+        import patsy
+        self.matrix = patsy.dmatrix(rhs, data, NA_action="raise", return_type="dataframe")
+        self.info = self.matrix.design_info
+        self.columns = list(self.matrix.columns)
+        X = self.matrix.to_numpy(dtype=float)
+        self.n, self.p = X.shape
+        q, r = np.linalg.qr(X)
+        diagonal = np.abs(np.diag(r))
+        if diagonal.min() > RANK_TOLERANCE * diagonal.max():
+            self.rank = self.p
+            r_inv = np.linalg.inv(r)
+            # beta = solver @ y for every outcome column at once.
+            self.solver = r_inv @ q.T
+            self.normalized_cov = r_inv @ r_inv.T
+        else:
+            # Rank-deficient (e.g. an empty cell in a subgroup): pinv, as statsmodels does.
+            self.rank = np.linalg.matrix_rank(X)
+            self.solver = np.linalg.pinv(X)
+            self.normalized_cov = self.solver @ self.solver.T
+        self.X = X
+        self.df_resid = self.n - self.rank
+        self._type2 = None
+
+    def type2_hypotheses(self):
+        # (term name, restriction matrix, df) for each non-intercept term,
+        # built as in statsmodels' anova_lm(typ=2): the term is tested
+        # jointly with the terms containing it, then projected off them.
+        if self._type2 is None:
+            from scipy import linalg
+            identity = np.eye(self.p)
+            hypotheses = []
+            for term in self.info.terms:
+                if not term.factors:
+                    continue
+                term_set = set(term.factors)
+                columns = list(range(*self.info.slice(term).indices(self.p)))
+                higher = []
+                for other in self.info.terms:
+                    if term_set < set(other.factors):
+                        higher.extend(range(*self.info.slice(other).indices(self.p)))
+                L1 = identity[columns + higher]
+                if higher:
+                    L2 = identity[higher]
+                    orth_compl, _ = linalg.qr(L1 @ self.normalized_cov @ L2.T)
+                    r = L1.shape[0] - L2.shape[0]
+                    L = orth_compl[:, -r:].T @ L1
+                else:
+                    L, r = L1, L1.shape[0]
+                hypotheses.append((term.name(), L, r))
+            self._type2 = hypotheses
+        return self._type2
+
+
+class OutcomeFits:
+    # Fits for the outcomes that share one Design (the same complete rows).
+    def __init__(self, design, Y, outcomes):
+        self.design = design
+        self.outcomes = list(outcomes)
+        self.coef = design.solver @ Y                       # (p x k)
+        residuals = Y - design.X @ self.coef
+        self.ssr = (residuals ** 2).sum(axis=0)
+        self.scale = self.ssr / design.df_resid
+        self.bse = np.sqrt(np.outer(np.diag(design.normalized_cov), self.scale))
+        self.fitted = Y - residuals
+        self.residuals = residuals
+
+    def coef_table(self, outcome, alpha=0.05):
+        j = self.outcomes.index(outcome)
+        df = self.design.df_resid
+        coef, bse = self.coef[:, j], self.bse[:, j]
+        tvalues = coef / bse
+        margin = t_dist.ppf(1 - alpha / 2, df) * bse
+        return pd.DataFrame({
+            "Coef.": coef,
+            "Std.Err.": bse,
+            "t": tvalues,
+            "P>|t|": 2 * t_dist.sf(np.abs(tvalues), df),
+            f"[{alpha / 2:g}": coef - margin,
+            f"{1 - alpha / 2:g}]": coef + margin,
+        }, index=self.design.columns)
+
+    def anova_table(self, outcome):
+        j = self.outcomes.index(outcome)
+        coef, scale, df_resid = self.coef[:, j], self.scale[j], self.design.df_resid
+        rows = {}
+        for name, L, r in self.design.type2_hypotheses():
+            restriction = L @ coef
+            wald = restriction @ np.linalg.pinv(L @ self.design.normalized_cov @ L.T) @ restriction
+            F = wald / r / scale
+            rows[name] = {"sum_sq": F * r * scale, "df": float(r), "F": F, "PR(>F)": f_dist.sf(F, r, df_resid)}
+        rows["Residual"] = {"sum_sq": self.ssr[j], "df": float(df_resid), "F": np.nan, "PR(>F)": np.nan}
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+    def residual_bootstrap(self, outcome, n_boot, seed=42):
+        # (n_boot x p) coefficients from fitted + resampled residuals; X stays
+        # fixed, so every replicate is one column of a single product.
+        j = self.outcomes.index(outcome)
+        rng = np.random.default_rng(seed)
+        idx = rng.integers(0, self.design.n, size=(self.design.n, n_boot))
+        Y = self.fitted[:, [j]] + self.residuals[idx, j]
+        return (self.design.solver @ Y).T
+
+
+class ModelSet:
+    def __init__(self, groups):
+        self._by_outcome = {outcome: fits for fits in groups for outcome in fits.outcomes}
+        self.groups = groups
+
+    def __getitem__(self, outcome):
+        return self._by_outcome[outcome]
+
+    def coef_table(self, outcome, alpha=0.05):
+        return self._by_outcome[outcome].coef_table(outcome, alpha)
+
+    def anova_table(self, outcome):
+        return self._by_outcome[outcome].anova_table(outcome)
+
+
+def fit_outcomes(data, rhs, outcomes):
+    # Rows missing an outcome are dropped for that outcome only, as smf.ols
+    # would; outcomes with the same missing rows share a design.
+    import patsy
+    # Rows patsy keeps for the right-hand side (no missing predictors).
+    complete = data.index.isin(patsy.dmatrix(rhs, data, return_type="dataframe").index)
+    patterns = {}
+    for outcome in outcomes:
+        rows = complete & data[outcome].notna().to_numpy()
+        patterns.setdefault(tuple(rows), (rows, []))[1].append(outcome)
+    groups = []
+    for rows, group_outcomes in patterns.values():
+        subset = data[rows]
+        groups.append(OutcomeFits(Design(subset, rhs), subset[group_outcomes].to_numpy(dtype=float), group_outcomes))
+    return ModelSet(groups)
@@ -0,0 +1,162 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy.stats import norm, t as t_dist
+
+# Bootstrap mediation (X -> M -> Y) laid out like pingouin.mediation_analysis:
+# the paths "M ~ X", "Y ~ M", "Total", "Direct" and "Indirect", with the same
+# point estimates, standard errors and p-values. The indirect-effect
+# interval is pingouin's bias-corrected percentile interval; plain percentile
+# and BCa intervals are reported next to it.
+#
+# Resampling never loops in Python. A chunk of resamples is a (B x n) matrix
+# of row counts W, so every resample's normal equations come out of two
+# matrix products (W @ per-row outer products of the design) and are solved
+# as one batched system. Chunks get their own seeds from one SeedSequence,
+# so results depend on seed and chunk_size only, not on how many processes
+# ran them.
+CHUNK_SIZE = 5000
+
+
+# --- Designs ---
+def _designs(data, x, m, y, covar):
+    ones = np.ones((len(data), 1))
+    covariates = data[covar].to_numpy(dtype=float) if covar else np.empty((len(data), 0))
+    x_val = data[[x]].to_numpy(dtype=float)
+    m_val = data[m].to_numpy(dtype=float)
+    X = np.hstack([ones, x_val, covariates])                # M ~ X + covar
+    XM = np.hstack([ones, x_val, m_val[:, None], covariates])  # Y ~ X + M + covar
+    return X, XM, m_val, data[y].to_numpy(dtype=float)
+
+def _ols(design, target, alpha):
+    # Full-sample fit with t-based inference, as pingouin.linear_regression.
+    n = len(target)
+    xtx_inv = np.linalg.pinv(design.T @ design)
+    coef = xtx_inv @ design.T @ target
+    residuals = target - design @ coef
+    dof = n - np.linalg.matrix_rank(design)
+    se = np.sqrt(residuals @ residuals / dof * np.diag(xtx_inv))
+    tvals = coef / se
+    pvals = 2 * t_dist.sf(np.abs(tvals), dof)
+    margin = t_dist.ppf(1 - alpha / 2, dof) * se
+    return coef, se, pvals, coef - margin, coef + margin
+
+
+# --- Batched least squares ---
+def _outer_rows(design):
+    # (n, p*p): row i holds design[i]' design[i], so W @ outer = X'WX for every row of W.
+    n, p = design.shape
+    return (design[:, :, None] * design[:, None, :]).reshape(n, p * p)
+
+def _batched_coef(weights, outer, cross, p):
+    xtx = (weights @ outer).reshape(-1, p, p)
+    xty = weights @ cross
+    try:
+        return np.linalg.solve(xtx, xty[:, :, None])[:, :, 0]
+    except np.linalg.LinAlgError:
+        # A resample with no variation in X; pinv gives it a finite estimate.
+        return (np.linalg.pinv(xtx) @ xty[:, :, None])[:, :, 0]
+
+def indirect_effects(weights, X, XM, m_val, y_val):
+    # a * b for each row of weights (row counts or any non-negative weights).
+    a = _batched_coef(weights, _outer_rows(X), X * m_val[:, None], X.shape[1])[:, 1]
+    b = _batched_coef(weights, _outer_rows(XM), XM * y_val[:, None], XM.shape[1])[:, 2]
+    return a * b
+
+def jackknife_indirect(X, XM, m_val, y_val, chunk_size=CHUNK_SIZE):
+    # Leave-one-out estimates, as blocks of weight rows with one zero each.
+    n = len(y_val)
+    blocks = []
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        weights = np.ones((size, n))
+        weights[np.arange(size), start + np.arange(size)] = 0.0
+        blocks.append(indirect_effects(weights, X, XM, m_val, y_val))
+    return np.concatenate(blocks)
+
+def _chunk(args):
+    seed, size, X, XM, m_val, y_val = args
+    n = len(y_val)
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, n, size=(size, n))
+    # Resample indices -> per-resample row counts, in one bincount.
+    counts = np.bincount((idx + n * np.arange(size)[:, None]).ravel(), minlength=size * n)
+    return indirect_effects(counts.reshape(size, n).astype(float), X, XM, m_val, y_val)
+
+def bootstrap_indirect(X, XM, m_val, y_val, n_boot, seed=42, chunk_size=CHUNK_SIZE, workers=None):
+    sizes = [min(chunk_size, n_boot - start) for start in range(0, n_boot, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(s, size, X, XM, m_val, y_val) for s, size in zip(seeds, sizes)]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return np.concatenate([_chunk(task) for task in tasks])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return np.concatenate(list(pool.map(_chunk, tasks)))
+
+
+# --- Intervals ---
+def percentile_ci(boot, alpha=0.05):
+    return np.percentile(boot, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+
+def bias_corrected_ci(boot, estimate, alpha=0.05):
+    # pingouin's interval: percentiles shifted by the median bias z0.
+    z0 = norm.ppf(np.mean(boot < estimate))
+    q = norm.cdf(2 * z0 + norm.ppf([alpha / 2, 1 - alpha / 2])) * 100
+    return np.percentile(boot, q)
+
+def bca_ci(boot, estimate, jackknife, alpha=0.05):
+    # Bias-corrected and accelerated; acceleration from the jackknife estimates.
+    z0 = norm.ppf(np.mean(boot < estimate) + np.mean(boot == estimate) / 2)
+    d = jackknife.mean() - jackknife
+    denominator = 6 * (d @ d) ** 1.5
+    a = (d ** 3).sum() / denominator if denominator > 0 else 0.0
+    z = norm.ppf([alpha / 2, 1 - alpha / 2])
+    q = norm.cdf(z0 + (z0 + z) / (1 - a * (z0 + z))) * 100
+    return np.percentile(boot, q)
+
+def bootstrap_pval(boot, estimate):
+    # As pingouin: twice the share of resamples on the far side of zero.
+    if estimate == 0:
+        return 1.0
+    return min(1.0, 2 * min((boot > 0).sum(), (boot < 0).sum()) / len(boot))
+
+
+def mediation_bootstrap(data, x, m, y, covar=None, alpha=0.05, n_boot=50000, seed=42,
+                        chunk_size=CHUNK_SIZE, workers=None, return_dist=False):
+    covar = [covar] if isinstance(covar, str) else list(covar or [])
+    data = data[[x, m, y] + covar].dropna()
+    n = len(data)
+    if n <= 5:
+        raise ValueError("DataFrame must have at least 5 samples (rows).")
+    X, XM, m_val, y_val = _designs(data, x, m, y, covar)
+    ll, ul = f"CI{100 * alpha / 2:.1f}", f"CI{100 * (1 - alpha / 2):.1f}"
+
+    # The coefficient of interest is column 1 of each design (X, or M in Y ~ M).
+    paths = [
+        (f"{m} ~ X", _ols(X, m_val, alpha)),
+        (f"Y ~ {m}", _ols(np.delete(XM, 1, axis=1), y_val, alpha)),
+        ("Total", _ols(X, y_val, alpha)),
+        ("Direct", _ols(XM, y_val, alpha)),
+    ]
+    rows = [{"path": name, "coef": coef[1], "se": se[1], "pval": pval[1], ll: low[1], ul: high[1]}
+            for name, (coef, se, pval, low, high) in paths]
+
+    estimate = indirect_effects(np.ones((1, n)), X, XM, m_val, y_val)[0]
+    boot = bootstrap_indirect(X, XM, m_val, y_val, n_boot, seed=seed, chunk_size=chunk_size, workers=workers)
+    jackknife = jackknife_indirect(X, XM, m_val, y_val, chunk_size)
+    bc = bias_corrected_ci(boot, estimate, alpha)
+    pct = percentile_ci(boot, alpha)
+    bca = bca_ci(boot, estimate, jackknife, alpha)
+    rows.append({
+        "path": "Indirect", "coef": estimate, "se": boot.std(ddof=1), "pval": bootstrap_pval(boot, estimate),
+        ll: bc.min(), ul: bc.max(),
+        f"Percentile {ll}": pct[0], f"Percentile {ul}": pct[1],
+        f"BCa {ll}": bca[0], f"BCa {ul}": bca[1],
+    })
+
+    stats = pd.DataFrame(rows)
+    stats.insert(stats.columns.get_loc(ul) + 1, "sig", np.where(stats["pval"] < alpha, "Yes", "No"))
+    stats["n"] = n
+    stats["n_boot"] = n_boot
+    return (stats, boot) if return_dist else stats
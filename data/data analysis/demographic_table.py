@@ -1,11 +1,10 @@
 import pandas as pd
 from scipy.stats import ttest_ind, chi2_contingency
 import numpy as np
+import os
+from study_data import load_study_data, OUTPUTS_DIR
 
-df = pd.read_csv("../../data/Chatbot_Study_Data_Cleaned.csv")
-analytic_df = df[df["Dropout_status"] == 0].copy()
-
-analytic_df["Age"] = pd.to_numeric(analytic_df["Age"], errors="coerce")
+analytic_df = load_study_data()
 
 def normalize_gender(val):
     if pd.isna(val):
@@ -22,8 +21,7 @@ def normalize_gender(val):
     else:
         return "Prefer not to say"
 
-analytic_df["Gender"] = analytic_df["Gender"].apply(normalize_gender)
-analytic_df["Version"] = analytic_df["Version"].str.strip().str.capitalize()
+analytic_df["Gender"] = analytic_df["Gender"].astype(object).apply(normalize_gender)
 
 elli = analytic_df[analytic_df["Version"] == "Elli"]
 static = analytic_df[analytic_df["Version"] == "Static"]
@@ -84,4 +82,4 @@ for gender in gender_levels:
         f"χ²({chi_dof}) = {chi2:.2f}, p = {chi_p:.3f}" if gender == "Female" else ""
     ])
 
-pd.DataFrame(table1, columns=["Variable", f"Elli (n={n_elli})", f"Static (n={n_static})", f"Total (N={n_total})", "Statistical Test"]).to_csv("../../outputs/demographic_table1.csv", index=False)
\ No newline at end of file
+pd.DataFrame(table1, columns=["Variable", f"Elli (n={n_elli})", f"Static (n={n_static})", f"Total (N={n_total})", "Statistical Test"]).to_csv(os.path.join(OUTPUTS_DIR, "demographic_table1.csv"), index=False)
\ No newline at end of file
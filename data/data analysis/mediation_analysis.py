@@ -1,27 +1,40 @@
 import pandas as pd
-import pingouin as pg
 import os
+from study_data import load_study_data, binary_gender, OUTPUTS_DIR
+from bootstrap_mediation import mediation_bootstrap
 
-df = pd.read_csv("data/Chatbot_Study_Data_Cleaned.csv")
-df = df[df["Dropout_status"] == 0].copy()
+N_BOOT = 50000
 
-df["Version"] = df["Version"].str.strip().str.capitalize()
-df["Gender"] = df["Gender"].str.lower().str.strip()
-df = df[df["Gender"].isin(["male", "female"])].copy()
-df["Version_bin"] = df["Version"].map({"Elli": 0, "Static": 1})
-
-df["Empathy"] = pd.to_numeric(df["Empathy"], errors="coerce")
-df["Trust"] = pd.to_numeric(df["Trust"], errors="coerce")
+df = binary_gender(load_study_data())
+df["Version_bin"] = df["Version"].map({"Elli": 0, "Static": 1}).astype(float)
 
 df = df.dropna(subset=["Empathy", "Trust", "Version_bin"])
 
 print("🔍 Running mediation analysis...")
-results = pg.mediation_analysis(data=df, x="Version_bin", m="Empathy", y="Trust", alpha=0.05, n_boot=5000, seed=42)
+results = mediation_bootstrap(data=df, x="Version_bin", m="Empathy", y="Trust", alpha=0.05, n_boot=N_BOOT, seed=42)
 print(results)
 
-output_dir = "outputs/mediation"
+output_dir = os.path.join(OUTPUTS_DIR, "mediation")
 os.makedirs(output_dir, exist_ok=True)
 
 out_path = f"{output_dir}/version_empathy_trust.csv"
 results.to_csv(out_path, index=False)
 
+# Sensitivity: every mediator/outcome pairing, in the whole sample and per gender.
+print("🔍 Running sensitivity analyses...")
+subgroups = {"All": df, "Female": df[df["Gender"] == "female"], "Male": df[df["Gender"] == "male"]}
+sensitivity = []
+for mediator in ["Empathy", "Comfort"]:
+    for outcome in ["Trust", "Comfort", "Empathy"]:
+        if outcome == mediator:
+            continue
+        for subgroup, sub_df in subgroups.items():
+            table = mediation_bootstrap(data=sub_df, x="Version_bin", m=mediator, y=outcome, alpha=0.05, n_boot=N_BOOT, seed=42)
+            table.insert(0, "Subgroup", subgroup)
+            table.insert(0, "Outcome", outcome)
+            table.insert(0, "Mediator", mediator)
+            sensitivity.append(table)
+
+sensitivity = pd.concat(sensitivity, ignore_index=True)
+print(sensitivity[sensitivity["path"] == "Indirect"])
+sensitivity.to_csv(f"{output_dir}/sensitivity.csv", index=False)
@@ -1,22 +1,18 @@
-import pandas as pd
-import statsmodels.formula.api as smf
 import os
-df = pd.read_csv("../Chatbot_Study_Data_Cleaned.csv")
-df = df[df["Dropout_status"] == 0].copy()
+from study_data import load_study_data, binary_gender, OUTPUTS_DIR
+from batched_ols import fit_outcomes
 
-df["Gender"] = df["Gender"].str.lower().str.strip()
-df = df[df["Gender"].isin(["male", "female"])].copy()
+df = binary_gender(load_study_data())
 
-output_dir = "../../outputs/interaction_models"
+output_dir = os.path.join(OUTPUTS_DIR, "interaction_models")
 os.makedirs(output_dir, exist_ok=True)
 outcomes = ["Trust", "Comfort", "Empathy"]
 
+models = fit_outcomes(df, "Version * Gender", outcomes)
+
 for outcome in outcomes:
-    formula = f"{outcome} ~ Version * Gender"
-    model = smf.ols(formula, data=df).fit()
     print(f"\n📊 Interaction model for {outcome}:\n")
-    print(model.summary())
-
-    summary_df = model.summary2().tables[1]
+    summary_df = models.coef_table(outcome)
+    print(summary_df)
     output_path = os.path.join(output_dir, f"{outcome.lower()}_interaction_model.csv")
     summary_df.to_csv(output_path)
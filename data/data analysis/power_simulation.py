@@ -0,0 +1,188 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy.stats import norm, t as t_dist
+
+# Usage (from any directory):
+#   python "data/data analysis/power_simulation.py"                       # N = 100..600, 5000 datasets each
+#   python "data/data analysis/power_simulation.py" --n 150 300 450 --sims 20000 --effect-scale 0.75
+#
+# Monte Carlo power for a follow-up of the study's designs: Elli vs Static
+# (Welch t), Version x Gender (OLS interaction) and Version -> Empathy ->
+# Trust (mediation, joint significance of the a and b paths, with Sobel
+# alongside). Datasets are generated from the observed male/female sample,
+# the one the interaction and mediation models use: every participant's
+# (Empathy, Trust) pair is drawn from the joint distribution of the 25
+# answer pairs in their Version x Gender cell. effect_scale mixes each cell
+# with the pooled distribution, so every mean difference scales by it
+# (1 = observed effects, 0 = none).
+#
+# A chunk of datasets is a (B x N) array and every test is computed from
+# group moments along axis 1, so no dataset is ever fitted on its own.
+# Chunks are seeded from one SeedSequence and run in a process pool; results
+# depend on seed and chunk_size only.
+CHUNK_SIZE = 1000
+LEVELS = np.arange(1, 6)
+# Cell codes: 2 * Static + male.
+CELLS = [("Elli", "female"), ("Elli", "male"), ("Static", "female"), ("Static", "male")]
+TESTS = ["t-test Trust", "t-test Empathy", "interaction Trust", "interaction Empathy",
+         "mediation (joint significance)", "mediation (Sobel)"]
+
+
+class StudyParameters:
+    def __init__(self, data):
+        # data: the male/female analytic sample (study_data.binary_gender).
+        data = data.dropna(subset=["Version", "Gender", "Empathy", "Trust"])
+        pairs = (data["Empathy"].astype(int) - 1) * 5 + (data["Trust"].astype(int) - 1)
+        self.cell_probs = np.vstack([
+            np.bincount(pairs[(data["Version"] == version) & (data["Gender"] == gender)], minlength=25)
+            for version, gender in CELLS
+        ]).astype(float)
+        self.cell_sizes = self.cell_probs.sum(axis=1)
+        self.pooled = self.cell_probs.sum(axis=0) / self.cell_sizes.sum()
+        self.cell_probs /= self.cell_sizes[:, None]
+        self.elli_share = float((data["Version"] == "Elli").mean())
+        self.male_share = float((data["Gender"] == "male").mean())
+
+    def cumulative(self, effect_scale=1.0):
+        probs = effect_scale * self.cell_probs + (1 - effect_scale) * self.pooled
+        return np.cumsum(probs, axis=1)
+
+
+# --- Generation ---
+def simulate(rng, size, n, cumulative, elli_share, male_share):
+    # Version is allocated in fixed proportions (Elli first); gender is drawn per participant.
+    n_elli = int(round(n * elli_share))
+    static = np.arange(n) >= n_elli
+    cell = 2 * static + (rng.random((size, n)) < male_share)
+    u = rng.random((size, n))
+    pair = np.empty((size, n), dtype=np.intp)
+    for code in range(len(CELLS)):
+        mask = cell == code
+        pair[mask] = np.searchsorted(cumulative[code], u[mask], side="right")
+    pair = np.minimum(pair, 24)
+    return cell, LEVELS[pair // 5].astype(float), LEVELS[pair % 5].astype(float), n_elli
+
+
+# --- Tests, one p-value per dataset ---
+def welch_p(y, n_elli):
+    first, second = y[:, :n_elli], y[:, n_elli:]
+    n1, n2 = first.shape[1], second.shape[1]
+    v1, v2 = first.var(axis=1, ddof=1) / n1, second.var(axis=1, ddof=1) / n2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (second.mean(axis=1) - first.mean(axis=1)) / np.sqrt(v1 + v2)
+        df = (v1 + v2) ** 2 / (v1 ** 2 / (n1 - 1) + v2 ** 2 / (n2 - 1))
+    return 2 * t_dist.sf(np.abs(t), df)
+
+def interaction_p(y, cell):
+    # The Version x Gender coefficient of the saturated 2x2 OLS model, from cell means.
+    one_hot = cell[:, :, None] == np.arange(len(CELLS))
+    counts = one_hot.sum(axis=1)
+    sums = np.einsum("bn,bnc->bc", y, one_hot)
+    squares = np.einsum("bn,bnc->bc", y ** 2, one_hot)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = sums / counts
+        df = y.shape[1] - len(CELLS)
+        scale = np.nansum(squares - counts * means ** 2, axis=1) / df
+        contrast = means[:, 3] - means[:, 2] - means[:, 1] + means[:, 0]
+        t = contrast / np.sqrt(scale * (1 / counts).sum(axis=1))
+    return 2 * t_dist.sf(np.abs(t), df)
+
+def mediation_p(m, y, n_elli):
+    # a: M ~ X; b: Y ~ X + M, i.e. Y on M after centring both within each Version group.
+    n = m.shape[1]
+    groups = [slice(0, n_elli), slice(n_elli, n)]
+    m_within = np.hstack([m[:, g] - m[:, g].mean(axis=1, keepdims=True) for g in groups])
+    y_within = np.hstack([y[:, g] - y[:, g].mean(axis=1, keepdims=True) for g in groups])
+    smm = (m_within ** 2).sum(axis=1)
+    smy = (m_within * y_within).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = m[:, n_elli:].mean(axis=1) - m[:, :n_elli].mean(axis=1)
+        se_a = np.sqrt(smm / (n - 2) * (1 / n_elli + 1 / (n - n_elli)))
+        b = smy / smm
+        se_b = np.sqrt(((y_within ** 2).sum(axis=1) - b * smy) / (n - 3) / smm)
+        p_a = 2 * t_dist.sf(np.abs(a / se_a), n - 2)
+        p_b = 2 * t_dist.sf(np.abs(b / se_b), n - 3)
+        p_sobel = 2 * norm.sf(np.abs(a * b / np.sqrt(b ** 2 * se_a ** 2 + a ** 2 * se_b ** 2)))
+    return np.maximum(p_a, p_b), p_sobel
+
+def _chunk(args):
+    # Number of significant datasets per test.
+    seed, size, n, cumulative, elli_share, male_share, alpha = args
+    rng = np.random.default_rng(seed)
+    cell, empathy, trust, n_elli = simulate(rng, size, n, cumulative, elli_share, male_share)
+    p_joint, p_sobel = mediation_p(empathy, trust, n_elli)
+    pvals = [welch_p(trust, n_elli), welch_p(empathy, n_elli), interaction_p(trust, cell),
+             interaction_p(empathy, cell), p_joint, p_sobel]
+    return np.array([(p < alpha).sum() for p in pvals])
+
+
+def power_curves(params, sample_sizes, n_sims=5000, effect_scale=1.0, alpha=0.05, elli_share=None,
+                 seed=42, chunk_size=CHUNK_SIZE, workers=None):
+    cumulative = params.cumulative(effect_scale)
+    elli_share = params.elli_share if elli_share is None else elli_share
+    sizes = [min(chunk_size, n_sims - start) for start in range(0, n_sims, chunk_size)]
+    tasks = []
+    for n, n_seed in zip(sample_sizes, np.random.SeedSequence(seed).spawn(len(sample_sizes))):
+        tasks += [(s, size, n, cumulative, elli_share, params.male_share, alpha)
+                  for s, size in zip(n_seed.spawn(len(sizes)), sizes)]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        hits = [_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            hits = list(pool.map(_chunk, tasks))
+    hits = np.array(hits).reshape(len(sample_sizes), len(sizes), len(TESTS)).sum(axis=1)
+
+    power = hits / n_sims
+    return pd.DataFrame({
+        "N": np.repeat(sample_sizes, len(TESTS)),
+        "test": TESTS * len(sample_sizes),
+        "power": power.ravel(),
+        "mc_se": np.sqrt(power * (1 - power) / n_sims).ravel(),
+        "n_sims": n_sims,
+        "effect_scale": effect_scale,
+    })
+
+def required_n(curves, target=0.8):
+    # Smallest simulated N reaching the target, per test (NaN if none does).
+    reached = curves[curves["power"] >= target]
+    return reached.groupby("test", sort=False)["N"].min().reindex(TESTS)
+
+
+def main(argv=None):
+    from study_data import load_study_data, binary_gender, OUTPUTS_DIR
+    from render_figures import power_figures, render
+    parser = argparse.ArgumentParser(description="Monte Carlo power curves for the study's tests over total sample size.")
+    parser.add_argument("--n", type=int, nargs="+", default=list(range(100, 601, 50)), help="Total sample sizes")
+    parser.add_argument("--sims", type=int, default=5000, help="Simulated datasets per sample size")
+    parser.add_argument("--effect-scale", type=float, default=1.0, help="Multiplier on the observed effects")
+    parser.add_argument("--elli-share", type=float, default=None, help="Share allocated to Elli (default: as observed)")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    params = StudyParameters(binary_gender(load_study_data()))
+    start = time.perf_counter()
+    curves = power_curves(params, args.n, n_sims=args.sims, effect_scale=args.effect_scale, alpha=args.alpha,
+                          elli_share=args.elli_share, seed=args.seed, workers=args.jobs)
+    seconds = time.perf_counter() - start
+
+    output_dir = os.path.join(OUTPUTS_DIR, "power")
+    os.makedirs(output_dir, exist_ok=True)
+    curves.to_csv(os.path.join(output_dir, "power_curves.csv"), index=False)
+    render(power_figures(curves))
+    print(curves.pivot(index="N", columns="test", values="power")[TESTS].round(3).to_string())
+    print("\nN for 80% power:")
+    print(required_n(curves).to_string())
+    print(f"\n{len(args.n) * args.sims:,} datasets in {seconds:.2f}s; curves in outputs/power/power_curves.csv, "
+          f"figure in figures/power_curves.png")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
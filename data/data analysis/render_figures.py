@@ -0,0 +1,226 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+# Figures are only ever written to files; never open a window.
+matplotlib.use("Agg", force=True)
+import pandas as pd
+from study_data import CACHE_DIR, FIGURES_DIR, file_hash
+
+# Usage (from any directory):
+#   python "data/data analysis/render_figures.py"            # stale figures only
+#   python "data/data analysis/render_figures.py" --force    # every figure
+#   python "data/data analysis/render_figures.py" dropout_barplot.png
+#
+# A Figure is a file name, a module-level draw function, the data frame it
+# draws from and its plot settings. Its key hashes the frame's values, the
+# settings and the plotting code; a figure whose key matches the one stored
+# next to the last render (data/.cache/figures/) and whose file still exists
+# is skipped. Stale figures are rendered in a process pool. The analysis
+# scripts pass their own figures to render(); this command builds all of them.
+KEY_DIR = os.path.join(CACHE_DIR, "figures")
+_HERE = os.path.dirname(os.path.abspath(__file__))
+# Code every draw function depends on; editing any of it re-renders.
+PLOT_CODE = [os.path.join(_HERE, name) for name in ("render_figures.py", "text_analytics.py", "stopwords_en.txt")]
+
+
+class Figure:
+    def __init__(self, filename, draw, data, figsize=(8, 5), dpi="figure", bbox_inches=None, **params):
+        self.filename = filename
+        self.path = os.path.join(FIGURES_DIR, filename)
+        self.draw = draw
+        self.data = data
+        self.figsize = figsize
+        self.dpi = dpi
+        self.bbox_inches = bbox_inches
+        self.params = params
+
+    def key(self):
+        digest = hashlib.sha256()
+        digest.update(pd.util.hash_pandas_object(self.data, index=False).to_numpy().tobytes())
+        spec = {
+            "draw": self.draw.__name__, "columns": [str(c) for c in self.data.columns],
+            "dtypes": [str(d) for d in self.data.dtypes], "figsize": self.figsize, "dpi": self.dpi,
+            "bbox_inches": self.bbox_inches, "params": self.params,
+        }
+        digest.update(json.dumps(spec, sort_keys=True, default=str).encode("utf-8"))
+        for path in PLOT_CODE:
+            digest.update(file_hash(path).encode("ascii"))
+        return digest.hexdigest()[:16]
+
+
+# --- Draw functions (module level, so worker processes can unpickle them) ---
+def draw_pointplot(data, x, y, hue, title, xlabel, ylabel):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    # Seeded CI bootstrap, so a skipped figure is exactly what a re-render would give.
+    sns.pointplot(data=data, x=x, y=y, hue=hue, dodge=True, markers="o", capsize=.1, seed=42)
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+
+def draw_dropout_counts(data):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    ax = sns.countplot(data=data, x="Version", hue="Dropped", palette="Set2")
+    for p in ax.patches:
+        height = p.get_height()
+        ax.annotate(f"{height}", (p.get_x() + p.get_width() / 2, height), ha="center", va="bottom", fontsize=11)
+    plt.ylabel("Number of Participants")
+    plt.title("Dropout Rate by Chatbot Condition")
+    plt.legend(title="Status")
+
+def draw_power_curves(data, target):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.lineplot(data=data, x="N", y="power", hue="test", marker="o")
+    plt.axhline(target, color="grey", linestyle="--", linewidth=1)
+    plt.ylim(0, 1)
+    plt.xlabel("Total sample size")
+    plt.ylabel("Power")
+    plt.title(f"Simulated power (effects x {data['effect_scale'].iloc[0]:g})")
+    plt.legend(title=None, fontsize=8)
+
+def draw_step_survival(data):
+    import matplotlib.pyplot as plt
+    # One panel per condition: their steps come in different orders.
+    versions = list(dict.fromkeys(data["Version"]))
+    axes = plt.gcf().subplots(1, len(versions), sharey=True, squeeze=False)[0]
+    for ax, version in zip(axes, versions):
+        for source, curve in data[data["Version"] == version].groupby("Source", sort=False):
+            ax.step(curve["Position"], curve["Share"], where="post", marker="o", markersize=3, label=source)
+        steps = data.loc[data["Version"] == version, ["Position", "Step"]].drop_duplicates()
+        ax.set_xticks(steps["Position"], steps["Step"], rotation=90, fontsize=7)
+        ax.set_ylim(0, 1.05)
+        ax.set_title(version)
+        ax.legend(fontsize=8)
+    axes[0].set_ylabel("Share of sessions reaching the step")
+
+def draw_feedback_cloud(data, title):
+    from text_analytics import FEEDBACK_STOPWORDS, count_terms, cloud_frequencies, draw_word_cloud
+    term_counts = count_terms(zip(data["Feedback"], data["Version"].astype(str)), stopwords=FEEDBACK_STOPWORDS)
+    draw_word_cloud(cloud_frequencies(term_counts.matrix.sum(axis=0).A1, term_counts.vocabulary), title, random_state=42)
+
+
+# --- Figures per script ---
+def age_group_figures(df):
+    # df from study_data.age_groups()
+    data = df[["Age_Group", "Interface_Condition", "Trust", "Empathy"]]
+    return [Figure(f"{outcome}_by_AgeGroup_Interface.png", draw_pointplot, data[["Age_Group", "Interface_Condition", outcome]],
+                   x="Age_Group", y=outcome, hue="Interface_Condition", title=f"{outcome} by Age Group and Interface",
+                   xlabel="Age Group", ylabel=f"{outcome} (0–5)")
+            for outcome in ("Trust", "Empathy")]
+
+def dropout_figures(df):
+    # df: every row, not just the analytic sample.
+    data = pd.DataFrame({"Version": df["Version"], "Dropped": df["Dropout_status"].map({0: "Completed", 1: "Dropped Out"})})
+    return [Figure("dropout_barplot.png", draw_dropout_counts, data, figsize=(7, 5), dpi=300, bbox_inches="tight")]
+
+def feedback_figures(df):
+    data = df.loc[df["Feedback"].notna() & df["Feedback"].str.strip().ne(""), ["Feedback", "Version"]]
+    return [Figure("wordcloud_feedback.png", draw_feedback_cloud, data, figsize=(12, 6), dpi=300,
+                   title="Most Common Words in Participant Feedback")]
+
+def power_figures(curves):
+    # From power_simulation.py, which renders it; not part of all_figures().
+    return [Figure("power_curves.png", draw_power_curves, curves[["N", "test", "power", "effect_scale"]],
+                   figsize=(9, 5.5), dpi=300, target=0.8)]
+
+def funnel_figures(survival):
+    # survival from session_funnel.step_survival()
+    data = survival[["Version", "Source", "Position", "Step", "Share"]]
+    return [Figure("step_survival.png", draw_step_survival, data, figsize=(12, 5), dpi=300)]
+
+def all_figures():
+    from study_data import load_study_data, load_typed, age_groups
+    from session_funnel import funnel
+    return (age_group_figures(age_groups(load_study_data()))
+            + dropout_figures(load_study_data(analytic=False))
+            + funnel_figures(funnel(load_typed()))
+            + feedback_figures(load_study_data()))
+
+
+# --- Rendering ---
+def _key_path(figure):
+    return os.path.join(KEY_DIR, figure.filename + ".key")
+
+def _stored_key(figure):
+    try:
+        with open(_key_path(figure), encoding="ascii") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _render(figure):
+    import matplotlib.pyplot as plt
+    start = time.perf_counter()
+    fig = plt.figure(figsize=figure.figsize)
+    figure.draw(figure.data, **figure.params)
+    plt.tight_layout()
+    fig.savefig(figure.path, dpi=figure.dpi, bbox_inches=figure.bbox_inches)
+    plt.close(fig)
+    return time.perf_counter() - start
+
+def render(figures, force=False, workers=None):
+    # Returns {filename: (status, seconds)}. Each key is written only after
+    # its figure is saved, so an interrupted run re-renders what it missed.
+    os.makedirs(FIGURES_DIR, exist_ok=True)
+    os.makedirs(KEY_DIR, exist_ok=True)
+    results = {}
+    stale = []
+    for figure in figures:
+        key = figure.key()
+        if not force and key == _stored_key(figure) and os.path.exists(figure.path):
+            results[figure.filename] = ("skipped", 0.0)
+        else:
+            stale.append((figure, key))
+
+    def finish(figure, key, seconds):
+        with open(_key_path(figure), "w", encoding="ascii") as f:
+            f.write(key)
+        results[figure.filename] = ("rendered", seconds)
+
+    workers = min(workers or os.cpu_count() or 1, len(stale))
+    # Forked workers only: a spawned worker would re-run the calling script.
+    if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        for figure, key in stale:
+            finish(figure, key, _render(figure))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            futures = {pool.submit(_render, figure): (figure, key) for figure, key in stale}
+            for future in as_completed(futures):
+                finish(*futures[future], future.result())
+    return {figure.filename: results[figure.filename] for figure in figures}
+
+def report(results, total):
+    print(f"{'figure':<40} {'status':<9} {'wall_s':>7}")
+    for filename, (status, seconds) in results.items():
+        print(f"{filename:<40} {status:<9} {seconds:>7.2f}")
+    print(f"\nTotal wall time {total:.2f}s (sum of render times {sum(s for _, s in results.values()):.2f}s)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the figures under figures/, skipping those whose data and plot settings are unchanged.")
+    parser.add_argument("figures", nargs="*", metavar="figure", help="File names to render (default: all)")
+    parser.add_argument("--force", action="store_true", help="Render even if unchanged")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    figures = all_figures()
+    unknown = set(args.figures) - {figure.filename for figure in figures}
+    if unknown:
+        parser.error(f"unknown figure(s): {', '.join(sorted(unknown))}")
+    if args.figures:
+        figures = [figure for figure in figures if figure.filename in args.figures]
+    start = time.perf_counter()
+    results = render(figures, force=args.force, workers=args.jobs)
+    report(results, time.perf_counter() - start)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
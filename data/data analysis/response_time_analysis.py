@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+import pandas as pd
+from study_data import load_typed, DATA_PATH, OUTPUTS_DIR
+
+# Usage: python "data/data analysis/response_time_analysis.py" [sheet_export.csv]
+# The export must contain the "Timings" column (column AA of the study sheet).
+data_path = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+results_dir = os.path.join(OUTPUTS_DIR, "response_times")
+
+df = load_typed(data_path)
+if "Timings" not in df.columns:
+    print(f"⚠️ No 'Timings' column in {data_path}; export the study sheet including column AA.")
+    sys.exit(0)
+
+df = df[df["Timings"].notna() & df["Timings"].astype(str).str.strip().ne("")].copy()
+df["Session"] = range(len(df))
+
+parsed = pd.DataFrame(df["Timings"].map(json.loads).tolist(), index=df.index)
+parsed["Version"] = df["Version"]
+parsed["Session"] = df["Session"]
+
+long = parsed.explode(["items", "think_ms", "llm_ms", "sheets_ms"]).dropna(subset=["items"])
+long = long.rename(columns={"items": "Item"})
+for col in ["think_ms", "llm_ms", "sheets_ms"]:
+    long[col] = pd.to_numeric(long[col], errors="coerce")
+
+# Retries of the same item (e.g. an invalid answer) are summed within a session.
+# Think time stays NaN where it was never measured (block items the browser
+# saw no input on), rather than counting as 0 ms.
+per_item = long.groupby(["Version", "Session", "Item"], as_index=False, observed=True)[["think_ms", "llm_ms", "sheets_ms"]].sum(min_count=1)
+per_item["total_ms"] = per_item[["think_ms", "llm_ms", "sheets_ms"]].sum(axis=1, skipna=False)
+
+def p90(x):
+    return x.quantile(0.9)
+
+def p99(x):
+    return x.quantile(0.99)
+
+distribution = per_item.groupby(["Version", "Item"], observed=True).agg(
+    n=("Session", "nunique"),
+    think_median_ms=("think_ms", "median"),
+    think_p90_ms=("think_ms", p90),
+    llm_median_ms=("llm_ms", "median"),
+    llm_p90_ms=("llm_ms", p90),
+    llm_p99_ms=("llm_ms", p99),
+    sheets_median_ms=("sheets_ms", "median"),
+    sheets_p90_ms=("sheets_ms", p90),
+    sheets_p99_ms=("sheets_ms", p99),
+    total_median_ms=("total_ms", "median"),
+).reset_index()
+
+sessions = per_item.groupby(["Version", "Session"], observed=True)[["think_ms", "llm_ms", "sheets_ms", "total_ms"]].sum()
+session_summary = sessions.groupby("Version", observed=True).describe(percentiles=[0.5, 0.9]).T
+
+# Canned replies shown because the model missed a step's latency budget.
+sessions_per_version = df.groupby("Version", observed=True)["Session"].nunique()
+if "fallbacks" in parsed.columns:
+    fallbacks = parsed[["Version", "Session", "fallbacks"]].explode("fallbacks").dropna(subset=["fallbacks"])
+else:
+    fallbacks = pd.DataFrame(columns=["Version", "Session", "fallbacks"])
+fallback_counts = fallbacks.groupby(["Version", "fallbacks"], observed=True).agg(
+    events=("Session", "size"),
+    sessions=("Session", "nunique"),
+).reset_index().rename(columns={"fallbacks": "Step"})
+# Version is categorical and map() can keep that dtype, which cannot be divided by.
+fallback_counts["share_of_sessions"] = fallback_counts["sessions"] / fallback_counts["Version"].map(sessions_per_version).astype(float)
+
+print("⏱️ Per-item latency distribution:")
+print(distribution)
+print("\n⏱️ Per-session totals:")
+print(session_summary)
+print("\n⏱️ Latency-budget fallbacks:")
+print(fallback_counts if len(fallback_counts) else "None recorded")
+
+os.makedirs(results_dir, exist_ok=True)
+distribution.to_csv(os.path.join(results_dir, "item_latency_distribution.csv"), index=False)
+session_summary.to_csv(os.path.join(results_dir, "session_latency_summary.csv"))
+fallback_counts.to_csv(os.path.join(results_dir, "fallback_counts.csv"), index=False)
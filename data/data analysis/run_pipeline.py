@@ -0,0 +1,222 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from study_data import PROJECT_ROOT, CACHE_DIR, DATA_PATH, OUTPUTS_DIR, FIGURES_DIR, file_hash
+
+# Usage (from any directory):
+#   python "data/data analysis/run_pipeline.py"                 # stale steps only
+#   python "data/data analysis/run_pipeline.py" --force         # everything
+#   python "data/data analysis/run_pipeline.py" mediation anova # these (and what they need)
+#   python "data/data analysis/run_pipeline.py" --dry-run
+#
+# Regenerates the paper's tables and figures. Each step is one script with
+# declared inputs and outputs (paths relative to the project root, with
+# outputs/ and figures/ under STUDY_RESULTS_DIR when it is set). A step is
+# skipped when the hash of its inputs matches the last successful run and all
+# of its outputs still exist. Independent steps run in parallel, one
+# subprocess each; a step whose input is another step's output waits for it.
+ANALYSIS_DIR = os.path.relpath(os.path.dirname(os.path.abspath(__file__)), PROJECT_ROOT)
+STATE_PATH = os.path.join(CACHE_DIR, "pipeline_state.json")
+LOG_DIR = os.path.join(CACHE_DIR, "pipeline_logs")
+
+# Every step loads the study data through study_data.py.
+DATA_INPUTS = [
+    os.path.relpath(DATA_PATH, PROJECT_ROOT),
+    os.path.join(ANALYSIS_DIR, "study_data.py"),
+    os.path.join("utils", "instruments.py"),
+]
+
+
+class Step:
+    def __init__(self, name, script, outputs, inputs=DATA_INPUTS, after=()):
+        self.name = name
+        self.script = os.path.join(ANALYSIS_DIR, script)
+        self.inputs = [self.script] + list(inputs)
+        self.outputs = list(outputs)
+        # Explicit ordering for steps that share outputs without reading them.
+        self.after = list(after)
+
+
+STEPS = {step.name: step for step in [
+    Step("flow_table", "Participant_flow_table.py", ["outputs/participant_flow_table.csv"]),
+    Step("demographics", "demographic_table.py", ["outputs/demographic_table1.csv"]),
+    Step("outcomes", "analyze_outcomes_with_assumptions.py", ["outputs/table2_outcomes.csv"],
+         inputs=DATA_INPUTS + [os.path.join(ANALYSIS_DIR, "permutation_tests.py")]),
+    Step("mediation", "mediation_analysis.py", [
+        "outputs/mediation/version_empathy_trust.csv",
+        "outputs/mediation/sensitivity.csv",
+    ], inputs=DATA_INPUTS + [os.path.join(ANALYSIS_DIR, "bootstrap_mediation.py")]),
+    Step("interaction_models", "interaction_effects.py", [
+        f"outputs/interaction_models/{outcome}_interaction_model.csv" for outcome in ("trust", "comfort", "empathy")
+    ], inputs=DATA_INPUTS + [os.path.join(ANALYSIS_DIR, "batched_ols.py")]),
+    Step("anova", "age_subgroup_analysis.py", [
+        "outputs/anova_trust_agegroup.csv",
+        "outputs/anova_empathy_agegroup.csv",
+        "figures/Trust_by_AgeGroup_Interface.png",
+        "figures/Empathy_by_AgeGroup_Interface.png",
+    ], inputs=DATA_INPUTS + [os.path.join(ANALYSIS_DIR, "batched_ols.py"), os.path.join(ANALYSIS_DIR, "render_figures.py")]),
+    Step("dropout", "dropout_analysis.py", ["figures/dropout_barplot.png"],
+         inputs=DATA_INPUTS + [os.path.join(ANALYSIS_DIR, "render_figures.py")]),
+    Step("funnel", "session_funnel.py", ["outputs/funnel/step_survival.csv", "figures/step_survival.png"],
+         inputs=DATA_INPUTS + [os.path.join(ANALYSIS_DIR, "render_figures.py")]),
+    Step("feedback", "analyze_feedback.py", [
+        "outputs/qualitative/cleaned_feedback.csv",
+        "outputs/qualitative/elli_word_freq.csv",
+        "outputs/qualitative/static_word_freq.csv",
+        "outputs/qualitative/bigram_freq.csv",
+        "figures/wordcloud_feedback.png",
+    ], inputs=DATA_INPUTS + [os.path.join(ANALYSIS_DIR, name) for name in ("text_analytics.py", "stopwords_en.txt", "render_figures.py")]),
+    Step("themes", "theme_discovery.py", [
+        "outputs/qualitative/discovered_themes.csv",
+        "outputs/qualitative/discovered_theme_assignments.csv",
+    ], inputs=["outputs/qualitative/cleaned_feedback.csv"]
+       + [os.path.join(ANALYSIS_DIR, name) for name in ("text_analytics.py", "stopwords_en.txt")]),
+    Step("thematic_table", "save_thematic_table.py", ["outputs/qualitative/thematic_summary.csv"], inputs=[]),
+    # Refits the interaction models into the same files; never run both at once.
+    Step("plots", "plotting_visuals.py", [
+        f"outputs/interaction_models/{outcome}_interaction_model.csv" for outcome in ("trust", "comfort", "empathy")
+    ], inputs=DATA_INPUTS + [os.path.join(ANALYSIS_DIR, "batched_ols.py")], after=["interaction_models"]),
+]}
+
+
+# --- Dependencies ---
+def dependencies(step):
+    producers = {output: other.name for other in STEPS.values() if other is not step for output in other.outputs}
+    deps = {producers[path] for path in step.inputs if path in producers}
+    return deps | set(step.after)
+
+def with_dependencies(names):
+    selected = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name not in selected:
+            selected.add(name)
+            stack.extend(dependencies(STEPS[name]))
+    return selected
+
+def resolve(path):
+    # Where the scripts write it: study_data moves outputs/ and figures/.
+    top, _, rest = path.partition("/")
+    if top == "outputs":
+        return os.path.join(OUTPUTS_DIR, rest)
+    if top == "figures":
+        return os.path.join(FIGURES_DIR, rest)
+    return os.path.join(PROJECT_ROOT, path)
+
+def input_hash(step):
+    digest = hashlib.sha256()
+    for path in step.inputs:
+        full = resolve(path)
+        digest.update(path.encode("utf-8"))
+        digest.update(file_hash(full).encode("ascii") if os.path.exists(full) else b"missing")
+    return digest.hexdigest()[:16]
+
+def is_fresh(step, state):
+    if state.get(step.name) != input_hash(step):
+        return False
+    return all(os.path.exists(resolve(path)) for path in step.outputs)
+
+
+# --- State ---
+def load_state():
+    try:
+        with open(STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(STATE_PATH, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+# --- Execution ---
+def run_step(step):
+    # Hashed before the run, so an input edited mid-run makes the step stale again.
+    digest = input_hash(step)
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{step.name}.log")
+    env = dict(os.environ, MPLBACKEND="Agg", PYTHONIOENCODING="utf-8")
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        returncode = subprocess.run([sys.executable, step.script], cwd=PROJECT_ROOT, env=env,
+                                    stdout=log, stderr=subprocess.STDOUT).returncode
+    return returncode, time.perf_counter() - start, digest, log_path
+
+def run(names, force=False, jobs=None, dry_run=False):
+    state = load_state()
+    pending = {name: dependencies(STEPS[name]) & names for name in names}
+    results = {}
+
+    def finish(name, status, seconds=0.0, detail=""):
+        results[name] = {"status": status, "seconds": seconds, "detail": detail}
+        for deps in pending.values():
+            deps.discard(name)
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        running = {}
+        start = time.perf_counter()
+        while pending or running:
+            for name in [name for name, deps in pending.items() if not deps]:
+                del pending[name]
+                step = STEPS[name]
+                if any(results.get(dep, {}).get("status") in ("failed", "blocked") for dep in dependencies(step) & names):
+                    finish(name, "blocked", detail="an upstream step failed")
+                elif not force and is_fresh(step, state):
+                    finish(name, "skipped", detail="inputs unchanged")
+                elif dry_run:
+                    finish(name, "would run")
+                else:
+                    running[pool.submit(run_step, step)] = name
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                returncode, seconds, digest, log_path = future.result()
+                if returncode == 0:
+                    state[name] = digest
+                    finish(name, "ran", seconds)
+                else:
+                    state.pop(name, None)
+                    finish(name, "failed", seconds, f"exit {returncode}, see {os.path.relpath(log_path, PROJECT_ROOT)}")
+                if not dry_run:
+                    save_state(state)
+        total = time.perf_counter() - start
+    return results, total
+
+def report(results, total):
+    print(f"{'step':<20} {'status':<10} {'wall_s':>7}  detail")
+    for name in STEPS:
+        if name in results:
+            row = results[name]
+            print(f"{name:<20} {row['status']:<10} {row['seconds']:>7.2f}  {row['detail']}")
+    serial = sum(row["seconds"] for row in results.values())
+    print(f"\nTotal wall time {total:.2f}s (sum of step times {serial:.2f}s)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate the analysis outputs, skipping steps whose inputs are unchanged.")
+    parser.add_argument("steps", nargs="*", metavar="step", help=f"Steps to bring up to date (default: all). One of: {', '.join(STEPS)}")
+    parser.add_argument("--force", action="store_true", help="Run steps even if their inputs are unchanged")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Parallel steps (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would run without running it")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.steps if name not in STEPS]
+    if unknown:
+        parser.error(f"unknown step(s): {', '.join(unknown)}")
+
+    names = with_dependencies(args.steps or STEPS)
+    results, total = run(names, force=args.force, jobs=args.jobs, dry_run=args.dry_run)
+    report(results, total)
+    failed = [name for name, row in results.items() if row["status"] in ("failed", "blocked")]
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,7 @@
 import pandas as pd
 import os
+from study_data import OUTPUTS_DIR
+
 data = {
     "Theme": [
         "Perceived lack of humanity",
@@ -37,7 +39,7 @@ data = {
 
 df = pd.DataFrame(data)
 
-output_path = "outputs/qualitative"
+output_path = os.path.join(OUTPUTS_DIR, "qualitative")
 os.makedirs(output_path, exist_ok=True)
 file_path = os.path.join(output_path, "thematic_summary.csv")
 df.to_csv(file_path, index=False)
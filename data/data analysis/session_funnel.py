@@ -0,0 +1,180 @@
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+from study_data import load_typed, DATA_PATH, OUTPUTS_DIR
+from utils.instruments import item_texts
+
+# Usage (from any directory):
+#   python "data/data analysis/session_funnel.py"                          # both conditions from the export
+#   python "data/data analysis/session_funnel.py" --messages messages.csv  # Elli from its message log
+#
+# Where participants stop, step by step, for both conditions. A session's
+# position is the furthest step it was asked; the table gives, per step, how
+# many sessions reached it, their share of all sessions, how many stopped
+# there and the hazard (stopped / reached).
+#
+# From the export, a row's position is one past its furthest answered column
+# (the step it was then asked), or "done" when it did not drop out. Elli
+# only writes its row at the end, so its dropouts in the export are what the
+# cleaning recovered; the message log (log_message_to_sheet rows: session
+# id, gender, age, role, content, timestamp; either its own sheet export or
+# mixed into the study export) has every prompt. Each bot prompt is mapped to
+# the step it asks and a session's position is its furthest prompt. Rows
+# logged before messages carried a session id are split into sessions where
+# the prompts go back towards the start or after SESSION_GAP without
+# messages. That is only right when participants did not overlap, and a
+# session that stopped before its first prompt joins a neighbour.
+#
+# Everything is column-wise: prompts are mapped once per distinct text
+# (factorize), sessions by groupby, and counts per step by bincount.
+SESSION_GAP = pd.Timedelta(minutes=30)
+PHQ_STEPS = [f"phq{i + 1}" for i in range(9)]
+GAD_STEPS = [f"gad{i + 1}" for i in range(7)]
+RATING_STEPS = ["trust", "comfort", "empathy", "feedback"]
+STEPS = {
+    "Elli": ["start", "mood", "age", "gender"] + PHQ_STEPS + GAD_STEPS + RATING_STEPS + ["done"],
+    "Static": ["start"] + PHQ_STEPS + GAD_STEPS + ["age", "gender"] + RATING_STEPS + ["done"],
+}
+# Export column answering each step.
+STEP_COLUMNS = {
+    "mood": "Mood", "age": "Age", "gender": "Gender",
+    **{step: step.upper() for step in PHQ_STEPS + GAD_STEPS},
+    **{step: step.capitalize() for step in RATING_STEPS},
+}
+# Elli's prompts (Elli_version/eli_app.py), by the step they ask. Retries ask
+# the same step again; the crisis message, summaries and scale reminders ask none.
+PROMPTS = [
+    ("start", r"give me just your name"),
+    ("mood", r"How are you feeling today\?"),
+    ("age", r"could you share your age|couldn't understand your age"),
+    ("gender", r"What gender do you identify with|couldn't understand your gender"),
+    ("trust", r"feel you could trust Elli"),
+    ("comfort", r"How comfortable did you feel interacting"),
+    ("empathy", r"how empathic did you find Elli"),
+    ("feedback", r"thoughts or feedback about this experience"),
+    ("done", r"Thanks so much for checking in today"),
+]
+# PHQ/GAD prompts are "<n>. <item>" or end in "Over the last 2 weeks: <item>".
+ITEM_PREFIX = r"(?s)^(?:\d+\. |.*Over the last 2 weeks: )"
+ITEM_PROMPTS = {text: step for texts, steps in ((item_texts("phq"), PHQ_STEPS), (item_texts("gad"), GAD_STEPS))
+                for text, step in zip(texts, steps)}
+MESSAGE_COLUMNS = {0: "Session", 3: "Role", 4: "Content", 5: "Timestamp"}
+
+
+# --- Export ---
+def export_positions(df):
+    # (Version, position) per row of the typed export that dropout_analysis.py counts.
+    df = df[df["Version"].notna() & df["Dropout_status"].notna()]
+    out = []
+    for version, steps in STEPS.items():
+        rows = df[df["Version"] == version]
+        answered = rows[[STEP_COLUMNS[step] for step in steps[1:-1]]].notna().to_numpy()
+        # Index of the last answered column + 1, 0 if none.
+        furthest = np.where(answered.any(axis=1), answered.shape[1] - np.argmax(answered[:, ::-1], axis=1), 0)
+        position = np.where(rows["Dropout_status"].to_numpy(dtype=int) == 0, len(steps) - 1,
+                            np.minimum(furthest + 1, len(steps) - 2))
+        out.append(pd.DataFrame({"Version": version, "Position": position}))
+    return pd.concat(out, ignore_index=True)
+
+
+# --- Message log ---
+def read_message_log(path):
+    # Rows whose fourth column is a role; the study export's participant rows
+    # and header never are, so either export can be passed.
+    raw = pd.read_csv(path, header=None, usecols=list(MESSAGE_COLUMNS), dtype=str)
+    raw = raw.rename(columns=MESSAGE_COLUMNS)
+    events = raw[raw["Role"].isin(["user", "bot"])].reset_index(drop=True)
+    events["Session"] = events["Session"].str.strip().replace("", np.nan)
+    return events
+
+def prompt_positions(content, steps=STEPS["Elli"]):
+    # Position of the step each bot message asks, NaN for the others.
+    codes, texts = pd.factorize(content)
+    texts = pd.Series(texts, dtype=object)
+    step = texts.str.replace(ITEM_PREFIX, "", regex=True).map(ITEM_PROMPTS)
+    for name, pattern in PROMPTS:
+        step = step.mask(step.isna() & texts.str.contains(pattern, regex=True), name)
+    position = step.map({name: i for i, name in enumerate(steps)}).to_numpy(dtype=float)
+    return np.where(codes >= 0, position[codes], np.nan)
+
+def sessionize(events, gap=SESSION_GAP):
+    # Fills Session for rows logged without one, as "legacy-<n>", and adds Position.
+    events = events.copy()
+    bot = events["Role"].eq("bot").to_numpy()
+    events["Position"] = np.where(bot, prompt_positions(events["Content"].where(bot)), np.nan)
+    legacy = events["Session"].isna().to_numpy()
+    if legacy.any():
+        old = events.loc[legacy, ["Role", "Position", "Timestamp"]]
+        position = old["Position"]
+        # A prompt earlier than the last one asked, or a second mood prompt
+        # (asked once per session), is a new participant, who started with
+        # the user message just before it.
+        last = position.ffill().shift(1)
+        mood = STEPS["Elli"].index("mood")
+        restart = ((position < last) | ((position == mood) & (last == mood))).to_numpy()
+        user = old["Role"].eq("user").to_numpy()
+        starts = np.zeros(len(old), dtype=bool)
+        starts[0] = True
+        starts[:-1] |= restart[1:] & user[:-1]
+        starts[1:] |= restart[1:] & ~user[:-1]
+        time = pd.to_datetime(old["Timestamp"], format="mixed", errors="coerce")
+        starts |= (time.diff() > gap).to_numpy()
+        number = np.cumsum(starts)
+        labels = ("legacy-" + pd.Index(np.arange(number[-1] + 1)).astype(str)).to_numpy()
+        events.loc[legacy, "Session"] = labels[number]
+    return events
+
+def message_positions(events, version="Elli"):
+    # (Version, position) per session: its furthest prompt, 0 before any.
+    position = events.groupby("Session", sort=False)["Position"].max().fillna(0).astype(int)
+    return pd.DataFrame({"Version": version, "Position": position.to_numpy()})
+
+
+# --- Survival ---
+def step_survival(positions, source):
+    out = []
+    for version, steps in STEPS.items():
+        position = positions.loc[positions["Version"] == version, "Position"].to_numpy(dtype=int)
+        reached = np.bincount(position, minlength=len(steps))[::-1].cumsum()[::-1]
+        stopped = reached - np.append(reached[1:], 0)
+        stopped[-1] = 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out.append(pd.DataFrame({
+                "Version": version, "Source": source.get(version, "export"), "Position": np.arange(len(steps)),
+                "Step": steps, "Reached": reached, "Share": reached / reached[0], "Stopped": stopped,
+                "Hazard": stopped / reached,
+            }))
+    return pd.concat(out, ignore_index=True)
+
+def funnel(df, message_logs=()):
+    # Step survival for both conditions; Elli from its message logs when given.
+    positions = export_positions(df)
+    source = {}
+    if message_logs:
+        events = sessionize(pd.concat([read_message_log(path) for path in message_logs], ignore_index=True))
+        positions = pd.concat([positions[positions["Version"] != "Elli"], message_positions(events)], ignore_index=True)
+        source["Elli"] = "message log"
+    return step_survival(positions, source)
+
+
+def main(argv=None):
+    from render_figures import funnel_figures, render
+    parser = argparse.ArgumentParser(description="Step-by-step survival of participants in both conditions.")
+    parser.add_argument("export", nargs="?", default=DATA_PATH, help="Study sheet export (default: the study CSV)")
+    parser.add_argument("--messages", nargs="+", default=[], help="Message-log exports for the Elli funnel")
+    args = parser.parse_args(argv)
+
+    survival = funnel(load_typed(args.export), args.messages)
+    output_dir = os.path.join(OUTPUTS_DIR, "funnel")
+    os.makedirs(output_dir, exist_ok=True)
+    survival.to_csv(os.path.join(output_dir, "step_survival.csv"), index=False)
+    render(funnel_figures(survival))
+    for (version, source), table in survival.groupby(["Version", "Source"], sort=False):
+        print(f"\n📉 {version} ({source}):")
+        print(table[["Step", "Reached", "Share", "Stopped", "Hazard"]].round(3).to_string(index=False))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import sys
+
+# Shared helpers for the scripts in this folder. They are run from different
+# working directories, so every path is resolved from the project root.
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import pandas as pd
+from utils.instruments import INSTRUMENTS, ITEM_COLUMNS, score_frame, total_mismatches
+
+STUDY_CSV = os.path.join(PROJECT_ROOT, "data", "Chatbot_Study_Data_Cleaned.csv")
+# STUDY_DATA_PATH points every script at another export (e.g. a synthetic one
+# from synthetic_data.py); STUDY_RESULTS_DIR moves outputs/, figures/ and the
+# cache out of the project so such runs leave the paper's files alone.
+DATA_PATH = os.environ.get("STUDY_DATA_PATH", STUDY_CSV)
+_RESULTS_DIR = os.environ.get("STUDY_RESULTS_DIR")
+OUTPUTS_DIR = os.path.join(_RESULTS_DIR or PROJECT_ROOT, "outputs")
+FIGURES_DIR = os.path.join(_RESULTS_DIR or PROJECT_ROOT, "figures")
+CACHE_DIR = os.path.join(_RESULTS_DIR, ".cache") if _RESULTS_DIR else os.path.join(PROJECT_ROOT, "data", ".cache")
+
+# --- Schema ---
+# Applied once when the CSV is loaded; every script sees the same dtypes.
+# Free-text columns (Mood, Feedback, Reason) keep the dtype read_csv gives them.
+# Unparseable numeric cells ("(missing)", text pasted into an item column)
+# become NaN, Version is normalised to "Elli"/"Static" and Gender to lower case.
+VERSIONS = ["Elli", "Static"]
+GENDERS = ["female", "male", "other", "prefer not to say"]
+NUMERIC_COLUMNS = ["Age"] + ITEM_COLUMNS + ["Total_PHQ", "Total_GAD", "Trust", "Comfort", "Empathy"]
+STATUS_COLUMNS = ["Dropout_status", "Participant_status"]
+SCHEMA = {
+    "Version": pd.CategoricalDtype(VERSIONS),
+    "Gender": pd.CategoricalDtype(GENDERS),
+    **{column: "float64" for column in NUMERIC_COLUMNS},
+    **{column: "Int8" for column in STATUS_COLUMNS},
+}
+# Bump when the cleaning below changes so existing caches are rebuilt.
+SCHEMA_VERSION = 1
+
+_frames = {}
+
+
+def apply_schema(raw):
+    df = raw.copy()
+    for column, dtype in SCHEMA.items():
+        if column not in df.columns:
+            # e.g. a partial sheet export
+            continue
+        values = df[column]
+        if column == "Version":
+            values = values.str.strip().str.capitalize()
+        elif column == "Gender":
+            values = values.str.strip().str.lower()
+        elif column in NUMERIC_COLUMNS or column in STATUS_COLUMNS:
+            values = pd.to_numeric(values, errors="coerce")
+        df[column] = values.astype(dtype)
+    return df
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+def _cache_path(source_hash):
+    return os.path.join(CACHE_DIR, f"study_data-v{SCHEMA_VERSION}-{source_hash}.parquet")
+
+def _read_cache(path):
+    try:
+        return pd.read_parquet(path)
+    except ImportError:
+        # No parquet engine installed: the pickle written by _write_cache.
+        return pd.read_pickle(path + ".pkl")
+
+def _write_cache(df, path):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    try:
+        df.to_parquet(path)
+    except ImportError:
+        df.to_pickle(path + ".pkl")
+
+def load_typed(path=DATA_PATH):
+    # Every row of the export with the schema applied, memoised in-process and
+    # on disk under the source file's hash, so an edited CSV is re-read.
+    source_hash = file_hash(path)
+    if source_hash not in _frames:
+        cache_path = _cache_path(source_hash)
+        try:
+            df = _read_cache(cache_path)
+        except (OSError, ValueError):
+            df = apply_schema(pd.read_csv(path))
+            _write_cache(df, cache_path)
+        _frames[source_hash] = df
+    return _frames[source_hash].copy()
+
+def load_raw(path=DATA_PATH):
+    # The export as read_csv gives it, for tables written back out in the
+    # export's own format. Its index matches load_typed's.
+    return pd.read_csv(path)
+
+def load_study_data(analytic=True, path=DATA_PATH):
+    # analytic=True gives the final analytic sample every analysis reports on:
+    # participants who neither dropped out nor were excluded. The flow table
+    # and dropout analysis need all rows.
+    df = load_typed(path)
+    if analytic:
+        keep = df["Dropout_status"].eq(0).fillna(False) & df["Participant_status"].eq(0).fillna(False)
+        df = df[keep].copy()
+    return df
+
+def binary_gender(df):
+    # The Version x Gender models compare male and female participants only.
+    df = df[df["Gender"].isin(["male", "female"])].copy()
+    df["Gender"] = df["Gender"].cat.remove_unused_categories()
+    return df
+
+def categorize_age(age):
+    if age <= 25:
+        return "18–25"
+    elif age <= 35:
+        return "26–35"
+    else:
+        return "36+"
+
+def age_groups(df):
+    # The Version x Age group ANOVAs and their point plots.
+    df = df.dropna(subset=["Age", "Trust", "Empathy", "Version"]).copy()
+    df["Age_Group"] = df["Age"].apply(categorize_age).astype("category")
+    df["Interface_Condition"] = df["Version"]
+    return df
@@ -0,0 +1,180 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from study_data import load_study_data, STUDY_CSV
+from utils.instruments import INSTRUMENTS
+
+# Usage (from any directory):
+#   python "data/data analysis/synthetic_data.py" --rows 1e6 --out data/.cache/synthetic/study_1e6.csv
+#
+# Writes a synthetic export with the columns, value formats and quirks of
+# Chatbot_Study_Data_Cleaned.csv: "Elli"/"static" versions, gender in mixed
+# case, item answers stored as text with the odd stray message or timestamp,
+# "(missing)" cells, dropouts with empty ratings, exclusions with a Reason,
+# and multi-line "User: ... / Elli: ..." Mood transcripts for Elli rows.
+# Age and the (Trust, Comfort, Empathy) triples are resampled per Version
+# from the real analytic sample, so condition effects look like the study's.
+# Rows are generated and appended in chunks, so 10^7 rows never sit in
+# memory at once; the output depends on seed and rows only.
+CHUNK_ROWS = 200_000
+COLUMNS = (["Version", "Age", "Gender", "Mood"] + INSTRUMENTS["phq"]["columns"] + INSTRUMENTS["gad"]["columns"]
+           + ["Total_PHQ", "Total_GAD", "Trust", "Comfort", "Empathy", "Feedback", "Dropout_status",
+              "Participant_status", "Reason"])
+GENDERS = ["female", "Female", "male", "Male", "Other", "other", "Prefer not to say"]
+GENDER_P = [0.26, 0.25, 0.25, 0.16, 0.04, 0.02, 0.02]
+DROPOUT_RATE = 0.22
+EXCLUSION_REASONS = ["No trust, comfort, or empathy score", "Participation under 60 seconds", "Obvious spam",
+                     "Less than 60 seconds interaction", "No PHQ-9 completed", "Did not answer empathy questions",
+                     "Technical issue"]
+# Share of cells given the export's known defects.
+DIRTY_RATE = 0.005
+
+OPENINGS = [
+    "I am feeling good, but maybe a little tired. I have been working hard lately",
+    "Honestly not great, I have had a rough week at work",
+    "Pretty anxious about my exams coming up",
+    "I'm okay I guess. Just a bit stressed",
+    "Well", "Fine thanks", "Not sleeping well lately and it's getting to me",
+    "Feeling a bit lonely since I moved to a new city",
+    "Good! I went for a long walk this morning",
+    "Tired. Lots going on with family",
+]
+REPLIES = [
+    "[NAME], it's great to hear that you're feeling good despite the hard work. Sometimes, even when we're doing well, it's beneficial to take a moment and reflect on our mental wellbeing.",
+    "I'm sorry to hear that things have been difficult, [NAME]. It takes courage to share how you're feeling.",
+    "That sounds like a lot to carry, [NAME]. Stress before a big moment is very common.",
+    "Thank you for telling me, [NAME]. Small changes in sleep can affect how we feel during the day.",
+    "It's lovely that you found time for yourself, [NAME]. Moments like that can make a real difference.",
+]
+INVITATIONS = [
+    "Would you like to do a brief check-in to gain some insights about your current state?",
+    "Shall we go through a few short questions together?",
+    "If you're comfortable, I'd like to ask you some questions about the last two weeks.",
+]
+FOLLOW_UPS = ["Yes sure", "ok", "Sure, let's do it", "Yes", "I guess so", "Okay go ahead"]
+FEEDBACK = [
+    "No", "yes", "It was fine", "Elli felt quite supportive and friendly.",
+    "This is similar to the generic forms they give you before a psychiatrist appointment.",
+    "I think Elli could have recommended specific activities. Otherwise, I thought it was fine.",
+    "The chatbot responses felt a bit repetitive.", "Easy to use, I liked the quick replies.",
+    "Felt more personal than a normal questionnaire.", "Too long", "Nothing to add",
+]
+STRAY_ITEM_TEXT = ["Thanks so much for checking in today. Wishing you care and calm. 🌻", "6/23/25 7:18", "(missing)"]
+
+
+class SourceSample:
+    # Per-Version ages and (Trust, Comfort, Empathy) triples to resample from.
+    def __init__(self, data=None):
+        data = load_study_data(path=STUDY_CSV) if data is None else data
+        data = data.dropna(subset=["Version", "Age", "Trust", "Comfort", "Empathy"])
+        data = data[data["Age"].between(18, 90)]
+        self.ages = {v: data.loc[data["Version"] == v, "Age"].to_numpy() for v in ("Elli", "Static")}
+        self.ratings = {v: data.loc[data["Version"] == v, ["Trust", "Comfort", "Empathy"]].to_numpy()
+                        for v in ("Elli", "Static")}
+
+
+def transcripts(rng, size):
+    # Two to four exchanges, each line "Speaker: text", joined with newlines.
+    openings = rng.integers(len(OPENINGS), size=size)
+    replies = rng.integers(len(REPLIES), size=size)
+    invitations = rng.integers(len(INVITATIONS), size=size)
+    follow_ups = rng.integers(len(FOLLOW_UPS), size=size)
+    exchanges = rng.integers(2, 5, size=size)
+    out = []
+    for i in range(size):
+        lines = [f"User: {OPENINGS[openings[i]]}", f"Elli: {REPLIES[replies[i]]} {INVITATIONS[invitations[i]]}"]
+        if exchanges[i] > 2:
+            lines += [f"User: {FOLLOW_UPS[follow_ups[i]]}", "Elli: Great. Over the last 2 weeks, how often have you been bothered by the following problems?"]
+        if exchanges[i] > 3:
+            lines += [f"User: {OPENINGS[(openings[i] + 3) % len(OPENINGS)]}", f"Elli: {REPLIES[(replies[i] + 1) % len(REPLIES)]}"]
+        out.append("\n".join(lines))
+    return out
+
+def _items(rng, severity, n_items):
+    # 0-3 answers around each participant's latent severity.
+    noise = rng.normal(0, 0.8, size=(len(severity), n_items))
+    # + 0.0 turns the -0.0 that rint gives small negatives into 0.0.
+    return np.clip(np.rint(severity[:, None] + noise), 0, 3) + 0.0
+
+def generate_chunk(rng, size, source):
+    static = rng.random(size) < 0.46
+    version = np.where(static, "static", "Elli")
+    age = np.empty(size)
+    ratings = np.empty((size, 3))
+    for label, mask in (("Static", static), ("Elli", ~static)):
+        pick = rng.integers(len(source.ages[label]), size=mask.sum())
+        age[mask] = source.ages[label][pick]
+        ratings[mask] = source.ratings[label][rng.integers(len(source.ratings[label]), size=mask.sum())]
+
+    severity = rng.gamma(1.5, 0.5, size=size)
+    phq = _items(rng, severity, 9)
+    gad = _items(rng, severity * 1.1, 7)
+    dropped = rng.random(size) < DROPOUT_RATE
+    # Dropouts stop somewhere in the questionnaires and rate nothing.
+    stop = np.where(dropped, rng.integers(0, 17, size=size), 16)
+    phq[np.arange(9)[None, :] >= stop[:, None]] = np.nan
+    gad[np.arange(7)[None, :] + 9 >= stop[:, None]] = np.nan
+    ratings[dropped] = np.nan
+
+    status = np.where(rng.random(size) < 0.12, rng.integers(1, 3, size=size), 0)
+    status = np.where(dropped, np.maximum(status, 1), status)
+
+    df = pd.DataFrame({
+        "Version": version,
+        "Age": age,
+        "Gender": rng.choice(GENDERS, size=size, p=GENDER_P),
+        "Mood": pd.Series(np.nan, index=range(size), dtype=object),
+    })
+    elli_rows = np.flatnonzero(~static & (rng.random(size) < 0.88))
+    df.loc[elli_rows, "Mood"] = transcripts(rng, len(elli_rows))
+    for j, column in enumerate(INSTRUMENTS["phq"]["columns"]):
+        df[column] = phq[:, j]
+    for j, column in enumerate(INSTRUMENTS["gad"]["columns"]):
+        df[column] = gad[:, j]
+    df["Total_PHQ"] = np.where(np.isnan(phq).any(axis=1), np.nan, phq.sum(axis=1))
+    df["Total_GAD"] = np.where(np.isnan(gad).any(axis=1), np.nan, gad.sum(axis=1))
+    df["Trust"], df["Comfort"], df["Empathy"] = ratings.T
+    df["Feedback"] = np.where(~dropped & (rng.random(size) < 0.7), rng.choice(FEEDBACK, size=size), None)
+    df["Dropout_status"] = dropped.astype(float)
+    df["Participant_status"] = status.astype(float)
+    df["Reason"] = np.where((status > 0) & ~dropped, rng.choice(EXCLUSION_REASONS, size=size), None)
+
+    # The export's defects: unlabelled rows, text in item cells, "(missing)" ratings.
+    for column in ("Version", "Gender", "Age"):
+        df.loc[rng.random(size) < DIRTY_RATE, column] = np.nan
+    for column in ("PHQ1", "PHQ2", "Empathy"):
+        values = df[column].astype(object).where(df[column].isna(), df[column].map("{:.0f}".format, na_action="ignore"))
+        dirty = rng.random(size) < DIRTY_RATE
+        values[dirty] = rng.choice(STRAY_ITEM_TEXT, size=dirty.sum())
+        df[column] = values
+    return df[COLUMNS]
+
+
+def write_synthetic(path, rows, seed=42, chunk_rows=CHUNK_ROWS, source=None):
+    source = source or SourceSample()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    sizes = [min(chunk_rows, rows - start) for start in range(0, rows, chunk_rows)]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for i, (size, chunk_seed) in enumerate(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes)))):
+            generate_chunk(np.random.default_rng(chunk_seed), size, source).to_csv(f, header=i == 0, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic study export in the format of Chatbot_Study_Data_Cleaned.csv.")
+    parser.add_argument("--rows", type=float, required=True, help="Number of participants (e.g. 1e6)")
+    parser.add_argument("--out", required=True, help="CSV path to write")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    write_synthetic(args.out, int(args.rows), seed=args.seed)
+    print(f"{int(args.rows):,} rows written to {args.out} in {time.perf_counter() - start:.1f}s "
+          f"({os.path.getsize(args.out) / 1e6:.1f} MB)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+import argparse
+import os
+import re
+import sys
+from array import array
+import numpy as np
+
+# Offline text analytics for participant feedback and chat transcripts.
+#
+# Texts are streamed one at a time through tokenize(), which lowercases,
+# strips punctuation and drops stopwords from the bundled list
+# (stopwords_en.txt, so nothing is downloaded). Unigrams and bigrams are
+# counted into a sparse (documents x terms) CSR matrix whose buffers grow
+# incrementally, so memory follows the number of distinct terms and tokens
+# and never a joined copy of the corpus. Per-condition counts are one sparse
+# product with a (groups x documents) indicator matrix; frequency tables and
+# the word cloud are built from those counts.
+#
+# Usage (from the project root), e.g. over a message-log export:
+#   python "data/data analysis/text_analytics.py" --source messages.csv --by gender --out outputs/qualitative/transcripts
+STOPWORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stopwords_en.txt")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def load_stopwords(path=STOPWORDS_PATH, extra=()):
+    with open(path, encoding="utf-8") as f:
+        words = {line.strip() for line in f if line.strip() and not line.startswith("#")}
+    return frozenset(words | set(extra))
+
+STOPWORDS = load_stopwords()
+# Feedback is about the chatbot itself, so its name and the condition labels carry no content.
+FEEDBACK_STOPWORDS = STOPWORDS | {"elli", "chatbot", "static", "feel", "felt"}
+
+
+def clean_text(text):
+    return _PUNCTUATION.sub("", str(text).lower()).strip()
+
+def tokenize(text, stopwords=STOPWORDS):
+    return [token for token in clean_text(text).split() if token not in stopwords]
+
+def ngrams(tokens, max_n=2):
+    # Bigrams join neighbours in the stopword-filtered stream, as WordCloud's collocations do.
+    for n in range(1, max_n + 1):
+        for start in range(len(tokens) - n + 1):
+            yield " ".join(tokens[start:start + n])
+
+
+class TermCounts:
+    # A (documents x terms) count matrix with its vocabulary and per-document groups.
+    def __init__(self, matrix, vocabulary, groups):
+        self.matrix = matrix
+        self.vocabulary = vocabulary
+        self.labels, self.codes = np.unique(np.asarray(groups, dtype=object).astype(str), return_inverse=True)
+        # Entries are stored document by document in order of appearance, so an
+        # entry's position is its first-seen order; kept for tie-breaking.
+        self._indices = matrix.indices.copy()
+        self._entry_groups = np.repeat(self.codes, np.diff(matrix.indptr))
+
+    def group_totals(self):
+        # (groups x terms) CSR: every group's counts in one sparse product.
+        from scipy import sparse
+        indicator = sparse.csr_matrix((np.ones(len(self.codes)), (self.codes, np.arange(len(self.codes)))),
+                                      shape=(len(self.labels), len(self.codes)))
+        return (indicator @ self.matrix).tocsr()
+
+    def top_terms(self, group=None, n=20, ngram=1, exclude=()):
+        # Most frequent n-grams overall or in one group; ties keep first-seen
+        # order within that group, as Counter.most_common does.
+        entries = np.arange(len(self._indices))
+        if group is None:
+            counts = np.asarray(self.matrix.sum(axis=0)).ravel()
+        else:
+            code = list(self.labels).index(group)
+            counts = np.asarray(self.group_totals()[code].todense()).ravel()
+            entries = entries[self._entry_groups == code]
+        first_seen = np.full(len(self.vocabulary), len(self._indices))
+        np.minimum.at(first_seen, self._indices[entries], entries)
+        top = []
+        for index in np.lexsort((first_seen, -counts)):
+            term = self.vocabulary[index]
+            if counts[index] == 0 or len(top) == n:
+                break
+            if term.count(" ") == ngram - 1 and term not in exclude:
+                top.append((term, int(counts[index])))
+        return top
+
+
+def count_terms(records, max_n=2, stopwords=STOPWORDS):
+    # records: iterable of (text, group). Consumed once, so it can be a generator over any size of export.
+    from scipy import sparse
+    vocabulary = {}
+    indptr = array("q", [0])
+    indices = array("q")
+    data = array("q")
+    groups = []
+    for text, group in records:
+        row = {}
+        for term in ngrams(tokenize(text, stopwords), max_n):
+            index = vocabulary.setdefault(term, len(vocabulary))
+            row[index] = row.get(index, 0) + 1
+        indices.extend(row.keys())
+        data.extend(row.values())
+        indptr.append(len(indices))
+        groups.append(group)
+    matrix = sparse.csr_matrix(
+        (np.frombuffer(data, dtype=np.int64), np.frombuffer(indices, dtype=np.int64), np.frombuffer(indptr, dtype=np.int64)),
+        shape=(len(groups), len(vocabulary)),
+    )
+    return TermCounts(matrix, list(vocabulary), groups)
+
+
+def cloud_frequencies(counts, vocabulary, min_bigram_count=3):
+    # Word-cloud weights: frequent bigrams are shown as phrases and their
+    # occurrences taken off the single words, as WordCloud(collocations=True) does.
+    frequencies = {}
+    for term, count in zip(vocabulary, counts):
+        if count and " " not in term:
+            frequencies[term] = int(count)
+    for term, count in zip(vocabulary, counts):
+        if " " in term and count >= min_bigram_count:
+            frequencies[term] = int(count)
+            for word in term.split():
+                frequencies[word] -= int(count)
+    return {term: count for term, count in frequencies.items() if count > 0}
+
+def draw_word_cloud(frequencies, title, **kwargs):
+    # Onto the current figure; render_figures sizes and saves it.
+    import matplotlib.pyplot as plt
+    from wordcloud import WordCloud
+    cloud = WordCloud(width=1000, height=500, background_color="white", **kwargs).generate_from_frequencies(frequencies)
+    plt.imshow(cloud, interpolation="bilinear")
+    plt.axis("off")
+    plt.title(title, fontsize=16)
+
+
+def write_group_tables(term_counts, out_dir, n=20):
+    import pandas as pd
+    os.makedirs(out_dir, exist_ok=True)
+    for label in term_counts.labels:
+        slug = re.sub(r"\W+", "_", label.lower()).strip("_") or "none"
+        for ngram, name in [(1, "word_freq"), (2, "bigram_freq")]:
+            top = term_counts.top_terms(label, n=n, ngram=ngram)
+            pd.DataFrame(top, columns=["Term", "Frequency"]).to_csv(os.path.join(out_dir, f"{slug}_{name}.csv"), index=False)
+    return list(term_counts.labels)
+
+def main(argv=None):
+    # Streams a study CSV or message-log export through the same reader as utils.rescreen.
+    import study_data  # puts the project root on sys.path
+    from utils.rescreen import read_utterances
+    parser = argparse.ArgumentParser(description="Uni/bigram counts per group for feedback or transcript exports.")
+    parser.add_argument("--source", required=True, help="Study data CSV (Mood text) or message-log CSV export")
+    parser.add_argument("--by", default="Version", help="Context column to group by (e.g. Version, gender, session)")
+    parser.add_argument("--out", default=os.path.join("outputs", "qualitative", "transcripts"))
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    records = ((text, context.get(args.by, "")) for _, text, context in read_utterances(args.source))
+    term_counts = count_terms(records)
+    labels = write_group_tables(term_counts, args.out, n=args.top)
+    print(f"{term_counts.matrix.shape[0]:,} texts, {term_counts.matrix.shape[1]:,} terms, "
+          f"{term_counts.matrix.nnz:,} non-zero counts; tables for {', '.join(labels)} in {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from study_data import OUTPUTS_DIR
+from text_analytics import FEEDBACK_STOPWORDS, count_terms
+
+# Usage (from any directory):
+#   python "data/data analysis/theme_discovery.py"                        # outputs/qualitative/cleaned_feedback.csv
+#   python "data/data analysis/theme_discovery.py" --source messages.csv --themes 8
+#
+# Finds themes in open-ended text without coding it by hand, per condition,
+# and writes them in thematic_summary.csv's format (Theme, Condition, Sample
+# Words, Representative Quote) to outputs/qualitative/discovered_themes.csv,
+# with every text's theme alongside. save_thematic_table.py keeps the
+# paper's hand-coded themes.
+#
+# Texts go through text_analytics' counter (uni- and bigrams, feedback
+# stopwords) into a sparse TF-IDF matrix with unit-length rows: sublinear
+# term frequency, smoothed idf, and bare numbers and terms in fewer than
+# min_df texts dropped. Texts left with no terms belong to no theme. Each
+# condition's texts are clustered by spherical mini-batch k-means: k-means++
+# seeds, then updates from random batches of rows, so a pass costs a sparse
+# product of the batch with the k centres whatever the corpus size. A
+# theme's sample words are its centre's heaviest terms; its quote is the
+# text closest to it.
+THEMES = 3
+MIN_DF = 2
+BATCH_SIZE = 1024
+SAMPLE_WORDS = 4
+FEEDBACK_PATH = os.path.join(OUTPUTS_DIR, "qualitative", "cleaned_feedback.csv")
+
+
+# --- Features ---
+def tfidf(counts, min_df=MIN_DF, usable=None):
+    # (documents x kept terms) CSR with unit rows, and the kept terms' indices.
+    counts = counts.tocsc()
+    df = np.diff(counts.indptr)
+    keep = np.flatnonzero((df >= min_df) & (True if usable is None else usable))
+    counts = counts[:, keep].tocsr()
+    idf = np.log((1 + counts.shape[0]) / (1 + df[keep])) + 1
+    weights = counts.astype(float)
+    weights.data = (1 + np.log(weights.data)) * idf[weights.indices]
+    norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+    with np.errstate(divide="ignore"):
+        weights = sparse.diags(np.where(norms > 0, 1 / norms, 0.0)) @ weights
+    return weights.tocsr(), keep
+
+
+# --- Clustering ---
+def _seed_centres(rng, x, k):
+    # k-means++ on cosine distance.
+    centres = [x[rng.integers(x.shape[0])].toarray().ravel()]
+    closest = 1 - x @ centres[0]
+    for _ in range(1, k):
+        weights = np.clip(closest, 0, None) ** 2
+        pick = rng.choice(x.shape[0], p=weights / weights.sum()) if weights.sum() > 0 else rng.integers(x.shape[0])
+        centres.append(x[pick].toarray().ravel())
+        closest = np.minimum(closest, 1 - x @ centres[-1])
+    return np.vstack(centres)
+
+def minibatch_kmeans(x, k, batch_size=BATCH_SIZE, iterations=None, seed=42):
+    # Rows of x have unit length. Returns (labels, similarity to own centre, centres).
+    rng = np.random.default_rng(seed)
+    n = x.shape[0]
+    k = min(k, n)
+    sample = rng.choice(n, size=min(n, 20 * batch_size), replace=False)
+    centres = _seed_centres(rng, x[sample], k)
+    seen = np.zeros(k)
+    iterations = iterations or max(100, 3 * n // batch_size)
+    for _ in range(iterations):
+        batch = x[rng.integers(n, size=min(batch_size, n))]
+        labels = np.asarray((batch @ centres.T).argmax(axis=1)).ravel()
+        members = sparse.csr_matrix((np.ones(len(labels)), (labels, np.arange(len(labels)))), shape=(k, len(labels)))
+        sums = (members @ batch).toarray()
+        sizes = np.bincount(labels, minlength=k)
+        seen += sizes
+        moved = sizes > 0
+        # Each centre moves towards its new members with rate 1 / (texts it has seen).
+        centres[moved] += (sums[moved] - sizes[moved, None] * centres[moved]) / seen[moved, None]
+        centres[moved] /= np.linalg.norm(centres[moved], axis=1, keepdims=True)
+    similarity = np.asarray(x @ centres.T)
+    labels = similarity.argmax(axis=1)
+    return labels, similarity[np.arange(n), labels], centres
+
+
+# --- Themes ---
+def discover(texts, groups, k=THEMES, min_df=MIN_DF, seed=42, sample_words=SAMPLE_WORDS):
+    # Returns (themes table, per-text theme), themes numbered within each group.
+    term_counts = count_terms(zip(texts, groups), stopwords=FEEDBACK_STOPWORDS)
+    vocabulary = np.array(term_counts.vocabulary, dtype=object)
+    # Bare numbers ("1-5" scales, answers) say nothing about a theme.
+    usable = ~pd.Series(vocabulary).str.fullmatch(r"[\d ]+").to_numpy(dtype=bool)
+    texts = np.asarray(texts, dtype=object)
+    rows = []
+    assigned = pd.Series(pd.NA, index=range(len(texts)), dtype="Int64")
+    for code, group in enumerate(term_counts.labels):
+        members = np.flatnonzero(term_counts.codes == code)
+        weights, keep = tfidf(term_counts.matrix[members], min_df, usable)
+        has_terms = np.diff(weights.indptr) > 0
+        if has_terms.sum() == 0:
+            continue
+        labels, similarity, centres = minibatch_kmeans(weights[has_terms], k, seed=seed)
+        documents = members[has_terms]
+        assigned.iloc[documents] = labels + 1
+        for theme in range(centres.shape[0]):
+            inside = np.flatnonzero(labels == theme)
+            if len(inside) == 0:
+                continue
+            terms = vocabulary[keep[np.argsort(-centres[theme], kind="stable")[:sample_words]]]
+            rows.append({
+                "Theme": f"{group} {theme + 1}: " + " / ".join(terms[:2]),
+                "Condition": group,
+                "Sample Words": ", ".join(terms),
+                "Representative Quote": str(texts[documents[inside[np.argmax(similarity[inside])]]]).strip(),
+                "Texts": len(inside),
+            })
+    return pd.DataFrame(rows), assigned
+
+
+def read_texts(path):
+    # (texts, groups): Feedback by Version from cleaned_feedback.csv, or participant
+    # messages from a study or message-log export (grouped by Version where it has one).
+    header = pd.read_csv(path, nrows=0).columns
+    if "Feedback" in header:
+        df = pd.read_csv(path, usecols=["Feedback", "Version"])
+        df = df[df["Feedback"].notna() & df["Feedback"].astype(str).str.strip().ne("")]
+        return df["Feedback"].tolist(), df["Version"].astype(str).str.strip().str.capitalize().tolist()
+    import study_data  # puts the project root on sys.path
+    from utils.rescreen import read_utterances
+    texts, groups = [], []
+    for _, text, context in read_utterances(path):
+        texts.append(text)
+        groups.append(context.get("Version", "").strip().capitalize() or "All")
+    return texts, groups
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Unsupervised themes in open-ended feedback or transcripts.")
+    parser.add_argument("--source", default=FEEDBACK_PATH, help="cleaned_feedback.csv, or a study or message-log export")
+    parser.add_argument("--themes", type=int, default=THEMES, help="Themes per condition")
+    parser.add_argument("--min-df", type=int, default=MIN_DF, help="Drop terms used in fewer texts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=os.path.join(OUTPUTS_DIR, "qualitative"))
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    texts, groups = read_texts(args.source)
+    themes, assigned = discover(texts, groups, k=args.themes, min_df=args.min_df, seed=args.seed)
+    seconds = time.perf_counter() - start
+
+    os.makedirs(args.out, exist_ok=True)
+    themes.drop(columns="Texts").to_csv(os.path.join(args.out, "discovered_themes.csv"), index=False)
+    pd.DataFrame({"Condition": groups, "Theme": assigned, "Text": texts}).to_csv(
+        os.path.join(args.out, "discovered_theme_assignments.csv"), index=False)
+    with pd.option_context("display.max_colwidth", 80):
+        print(themes.to_string(index=False))
+    print(f"\n{len(texts):,} texts, {assigned.notna().sum():,} with a theme, in {seconds:.2f}s; "
+          f"themes in {os.path.join(args.out, 'discovered_themes.csv')}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+from gpt_prompts.gpt_prompts import (
+    SYSTEM_INSTRUCTION,
+    PHQ9_SUMMARY_PROMPT,
+    DEMOGRAPHIC_EXTRACTION_PROMPT,
+    GAD7_SUMMARY_PROMPT,
+    FINAL_SUMMARY_PROMPT,
+    SAFETY_CHECK_PROMPT,
+    MOOD_RESPONSE_PROMPT,
+    MOOD_FALLBACK,
+    SUMMARY_FALLBACKS
+)
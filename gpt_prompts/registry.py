@@ -0,0 +1,181 @@
+import functools
+import hashlib
+import math
+import os
+import re
+import string
+import sys
+from gpt_prompts.gpt_prompts import (
+    SYSTEM_INSTRUCTION,
+    PHQ9_SUMMARY_PROMPT,
+    GAD7_SUMMARY_PROMPT,
+    FINAL_SUMMARY_PROMPT,
+    RESULTS_SUMMARY_PROMPT,
+    SAFETY_CHECK_PROMPT,
+    MOOD_RESPONSE_PROMPT,
+    DEMOGRAPHIC_EXTRACTION_PROMPT,
+    NAME_EXTRACTION_PROMPT,
+    NAME_VALIDATION_PROMPT,
+    AGE_EXTRACTION_PROMPT,
+    GENDER_EXTRACTION_PROMPT
+)
+
+# Usage (from the project root): python -m gpt_prompts.registry
+#
+# Every prompt the apps send, with a version, the model settings it is sent
+# with, and a token budget. Running this module renders each prompt with
+# worst-case sample values, counts tokens offline and exits non-zero if any
+# prompt has outgrown its budget; tests/test_prompt_budgets.py asserts the
+# same under pytest. Bump the version whenever a template changes.
+MODEL = "gpt-4"
+# Chat format overhead per message and for priming the reply (gpt-4 / cl100k).
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+# Longest inputs the flow realistically sees: the mood step asks for 2-3 sentences.
+SAMPLE_VALUES = {
+    "user_input": (
+        "Honestly I have been feeling pretty overwhelmed lately. Work has been nonstop and I have not been "
+        "sleeping well, so I feel tired and a bit anxious most days. I am trying to take it one day at a time "
+        "but it is hard to switch off in the evenings, and I keep worrying about things I cannot control."
+    ),
+    "name": "Alexandra",
+    "mood_text": (
+        "Honestly I have been feeling pretty overwhelmed lately. Work has been nonstop and I have not been "
+        "sleeping well, so I feel tired and a bit anxious most days. I am trying to take it one day at a time "
+        "but it is hard to switch off in the evenings, and I keep worrying about things I cannot control."
+    ),
+    "phq_total": 27,
+    "phq_level": "Moderately severe depression",
+    "phq_interpretation": "Moderately severe depression",
+    "phq_scores": [3, 3, 3, 3, 3, 3, 3, 3, 3],
+    "gad_total": 21,
+    "gad_level": "Severe anxiety",
+    "gad_interpretation": "Severe anxiety",
+    "gad_scores": [3, 3, 3, 3, 3, 3, 3],
+}
+
+
+class Prompt:
+    def __init__(self, name, version, template, budget, system=False, temperature=0.7, model=MODEL):
+        self.name = name
+        self.version = version
+        self.template = template
+        self.budget = budget
+        self.system = system
+        self.temperature = temperature
+        self.model = model
+        self.fields = [field for _, field, _, _ in string.Formatter().parse(template) if field]
+        # Everything before the first placeholder is identical on every call,
+        # so only the rest is formatted. Participants' input is never cached.
+        self.static_prefix, brace, rest = template.partition("{")
+        self._variable = brace + rest
+
+    def render(self, **values):
+        return self.static_prefix + self._variable.format(**values)
+
+    def messages(self, **values):
+        messages = [{"role": "system", "content": SYSTEM_INSTRUCTION}] if self.system else []
+        messages.append({"role": "user", "content": self.render(**values)})
+        return messages
+
+    def tokens(self, **values):
+        return count_message_tokens(self.messages(**values))
+
+    def prefix_tokens(self):
+        system = count_tokens(SYSTEM_INSTRUCTION) + TOKENS_PER_MESSAGE if self.system else 0
+        return system + count_tokens(self.static_prefix)
+
+
+PROMPTS = {prompt.name: prompt for prompt in [
+    Prompt("safety_check", 2, SAFETY_CHECK_PROMPT, budget=200, temperature=0.7),
+    Prompt("mood_response", 2, MOOD_RESPONSE_PROMPT, budget=420, system=True),
+    Prompt("results_summary", 2, RESULTS_SUMMARY_PROMPT, budget=350, system=True),
+    Prompt("phq9_summary", 2, PHQ9_SUMMARY_PROMPT, budget=270, system=True),
+    Prompt("gad7_summary", 2, GAD7_SUMMARY_PROMPT, budget=260, system=True),
+    Prompt("final_summary", 2, FINAL_SUMMARY_PROMPT, budget=300, system=True),
+    Prompt("demographic_extraction", 2, DEMOGRAPHIC_EXTRACTION_PROMPT, budget=260, temperature=0.2),
+    Prompt("name_extraction", 1, NAME_EXTRACTION_PROMPT, budget=150, temperature=0.2),
+    Prompt("name_validation", 2, NAME_VALIDATION_PROMPT, budget=140, temperature=0.2),
+    Prompt("age_extraction", 1, AGE_EXTRACTION_PROMPT, budget=140, temperature=0.2),
+    Prompt("gender_extraction", 1, GENDER_EXTRACTION_PROMPT, budget=140, temperature=0.2),
+]}
+
+
+# --- Offline token counting ---
+# tiktoken gives exact counts when it is installed and TIKTOKEN_CACHE_DIR
+# holds its cl100k encoding; it is never downloaded. Otherwise a
+# word/punctuation approximation is used, which is within a few percent of
+# cl100k on English prose.
+ENCODING = "cl100k_base"
+ENCODING_URL = "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken"
+ENCODING_SHA256 = "223921b76ee99bde995b7ff738513eef100fb51d18c93597a113bcffe865b2a7"
+_APPROX_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    cache_dir = os.environ.get("TIKTOKEN_CACHE_DIR")
+    if not cache_dir:
+        return None
+    # tiktoken's cache file name for the encoding. It re-downloads a missing
+    # or corrupt file, so only a complete one is handed to it.
+    cached = os.path.join(cache_dir, hashlib.sha1(ENCODING_URL.encode()).hexdigest())
+    try:
+        with open(cached, "rb") as f:
+            if hashlib.sha256(f.read()).hexdigest() != ENCODING_SHA256:
+                return None
+    except OSError:
+        return None
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(ENCODING)
+    except Exception:
+        return None
+
+def tokenizer_name():
+    encoding = _encoding()
+    return encoding.name if encoding is not None else "approximate"
+
+def count_tokens(text):
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return sum(max(1, math.ceil(len(piece) / 6)) for piece in _APPROX_PATTERN.findall(text))
+
+def count_message_tokens(messages):
+    return TOKENS_PER_REPLY + sum(TOKENS_PER_MESSAGE + count_tokens(m["content"]) for m in messages)
+
+
+def budget_report():
+    rows = []
+    for prompt in PROMPTS.values():
+        values = {field: SAMPLE_VALUES[field] for field in prompt.fields}
+        tokens = prompt.tokens(**values)
+        rows.append({
+            "name": prompt.name,
+            "version": prompt.version,
+            "system": prompt.system,
+            "prefix_tokens": prompt.prefix_tokens(),
+            "tokens": tokens,
+            "budget": prompt.budget,
+            "ok": tokens <= prompt.budget,
+        })
+    return rows
+
+def main():
+    rows = budget_report()
+    print(f"Tokenizer: {tokenizer_name()}")
+    print(f"{'prompt':<24} {'v':>2} {'system':>6} {'prefix':>7} {'tokens':>7} {'budget':>7}")
+    for row in rows:
+        flag = "" if row["ok"] else "  ❌ over budget"
+        print(f"{row['name']:<24} {row['version']:>2} {str(row['system']):>6} {row['prefix_tokens']:>7} "
+              f"{row['tokens']:>7} {row['budget']:>7}{flag}")
+    over = [row["name"] for row in rows if not row["ok"]]
+    if over:
+        print(f"\n❌ {len(over)} prompt(s) over budget: {', '.join(over)}")
+        return 1
+    print("\n✅ All prompts within budget.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+import streamlit as st
+from utils.clients import prewarm
+from utils.session_store import sync_session
+from utils.profiling import profiled_rerun, show_report
+
+# Single deployment for the whole study: consent, assignment and both
+# conditions run in one process, so participants never leave this host.
+CONSENT_PAGE = st.Page("Consent_script/router_app.py", title="Study Consent", icon="🔗", url_path="consent", default=True)
+CONDITION_PAGES = {
+    "elli": st.Page("Elli_version/eli_app.py", title="Elli", icon="🌱", url_path="elli"),
+    "static": st.Page("Static_version/static_app.py", title="Mental Health Screening", icon="📝", url_path="static"),
+}
+
+# Warm the OpenAI and Sheets clients while the participant reads the consent page.
+prewarm()
+
+# With ELLI_SESSION_STORE set, a participant reconnecting to another worker
+# resumes from the shared store before routing.
+sync_session()
+
+condition = st.session_state.get("condition")
+page = CONDITION_PAGES[condition] if condition in CONDITION_PAGES else CONSENT_PAGE
+
+# Opt-in (ELLI_PROFILE=1 or ?profile=1): time each phase of the page's rerun.
+show_report()
+with profiled_rerun(condition if condition in CONDITION_PAGES else "consent"):
+    st.navigation([page], position="hidden").run()
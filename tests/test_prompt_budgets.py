@@ -0,0 +1,30 @@
+import pytest
+from gpt_prompts import registry
+from gpt_prompts.registry import PROMPTS, SAMPLE_VALUES
+
+# Usage (from the project root):
+#   python -m pytest -q tests
+#
+# Renders every registered prompt with the registry's worst-case sample
+# values and checks it stays within its token budget. Budgets are checked
+# with the approximate counter, so the result does not depend on whether
+# tiktoken and its encoding are on the machine.
+
+
+@pytest.fixture(autouse=True)
+def approximate_counter(monkeypatch):
+    monkeypatch.setattr(registry, "_encoding", lambda: None)
+
+
+def test_counter_is_pinned():
+    assert registry.tokenizer_name() == "approximate"
+
+
+@pytest.mark.parametrize("prompt", PROMPTS.values(), ids=PROMPTS.keys())
+def test_prompt_within_budget(prompt):
+    missing = [field for field in prompt.fields if field not in SAMPLE_VALUES]
+    assert not missing, f"no sample value for {missing}"
+    values = {field: SAMPLE_VALUES[field] for field in prompt.fields}
+    assert prompt.render(**values) == prompt.template.format(**values)
+    tokens = prompt.tokens(**values)
+    assert tokens <= prompt.budget, f"{prompt.name} v{prompt.version}: {tokens} tokens > budget {prompt.budget}"
@@ -0,0 +1,88 @@
+import csv
+import json
+from utils import rescreen
+
+# Usage (from the project root):
+#   python -m pytest -q tests/test_rescreen.py
+#
+# Drives the rescreen pipeline end to end against the offline stub client
+# on a small study-format CSV.
+MOODS = [
+    "User: I feel fine today, just a bit tired.\nElli: Thanks for sharing.",
+    "User: Honestly I want to end my life.\nElli: I'm sorry you feel this way.",
+    "User: Work is stressful but I'm coping.\nElli: That sounds like a lot.",
+    "User: Pretty good, had a nice weekend.\nElli: Glad to hear it.",
+    "User: I can't sleep and I worry all the time.\nElli: That sounds hard.",
+    "User: Okay I guess.\nElli: Thanks.",
+]
+
+
+def write_source(path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Version", "Age", "Gender", "Mood"])
+        for i, mood in enumerate(MOODS):
+            writer.writerow(["Elli", str(20 + i), "female", mood])
+    return path
+
+
+def rescreen_run(capsys, source, out, *extra):
+    code = rescreen.main(["--task", "safety", "--source", str(source), "--out", str(out),
+                          "--stub", "--stub-latency", "0", "--concurrency", "2", *extra])
+    printed = capsys.readouterr().out
+    return code, json.loads(printed[printed.index("{"):])
+
+
+def results(out):
+    rows = []
+    with open(out, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                continue
+    return rows
+
+
+def test_small_csv(tmp_path, capsys):
+    source, out = write_source(tmp_path / "study.csv"), tmp_path / "safety.jsonl"
+    code, stats = rescreen_run(capsys, source, out)
+    assert code == 0
+    assert (stats["done"], stats["failed"], stats["skipped"]) == (len(MOODS), 0, 0)
+    rows = results(out)
+    assert len({row["id"] for row in rows}) == len(MOODS)
+    assert [row["crisis"] for row in rows if "end my life" in row["text"]] == [True]
+    assert sum(row["crisis"] for row in rows) == 1
+
+
+def test_resume_skips_answered_rows(tmp_path, capsys):
+    source, out = write_source(tmp_path / "study.csv"), tmp_path / "safety.jsonl"
+    code, stats = rescreen_run(capsys, source, out, "--limit", "2")
+    assert stats["done"] == 2
+    first = {row["id"] for row in results(out)}
+    # A kill mid-write leaves the last line cut short; that row is redone.
+    with open(out, "a", encoding="utf-8") as f:
+        f.write('{"id": "row-cut')
+
+    code, stats = rescreen_run(capsys, source, out)
+    assert code == 0
+    assert (stats["done"], stats["skipped"]) == (len(MOODS) - 2, 2)
+    ids = [row["id"] for row in results(out)]
+    assert len(ids) == len(set(ids)) == len(MOODS)
+    assert first <= set(ids)
+
+    code, stats = rescreen_run(capsys, source, out)
+    assert (stats["done"], stats["skipped"]) == (0, len(MOODS))
+
+
+def test_new_prompt_reruns_every_row(tmp_path, capsys):
+    source, out = write_source(tmp_path / "study.csv"), tmp_path / "safety.jsonl"
+    rescreen_run(capsys, source, out)
+    prompt_file = tmp_path / "prompt.txt"
+    prompt_file.write_text(rescreen.PROMPTS["safety_check"].template + "\nAnswer carefully.", encoding="utf-8")
+
+    code, stats = rescreen_run(capsys, source, out, "--prompt-file", str(prompt_file))
+    assert code == 0
+    assert (stats["done"], stats["skipped"]) == (len(MOODS), 0)
+    prompts = {row["prompt"] for row in results(out)}
+    assert len(prompts) == 2 and "safety_check@2" in prompts
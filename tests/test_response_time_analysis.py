@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+import pandas as pd
+
+# Usage (from the project root):
+#   python -m pytest -q tests/test_response_time_analysis.py
+#
+# Runs the response-time analysis on the study export with a Timings column
+# added (what column AA holds), writing into a scratch STUDY_RESULTS_DIR.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(PROJECT_ROOT, "data", "data analysis", "response_time_analysis.py")
+STUDY_CSV = os.path.join(PROJECT_ROOT, "data", "Chatbot_Study_Data_Cleaned.csv")
+
+
+def timings(items, think_ms, fallbacks=()):
+    return json.dumps({
+        "items": items, "think_ms": think_ms, "llm_ms": [0] * len(items),
+        "sheets_ms": [10] * len(items), "fallbacks": list(fallbacks),
+    })
+
+
+def run_analysis(tmp_path, timings_by_row):
+    df = pd.read_csv(STUDY_CSV)
+    df["Timings"] = ""
+    for row, value in timings_by_row.items():
+        df.loc[row, "Timings"] = value
+    export = tmp_path / "export.csv"
+    df.to_csv(export, index=False)
+    env = dict(os.environ, STUDY_RESULTS_DIR=str(tmp_path), MPLBACKEND="Agg")
+    result = subprocess.run([sys.executable, SCRIPT, str(export)], env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return tmp_path / "outputs" / "response_times"
+
+
+def study_rows():
+    # Two Elli rows and one Static row, so the versions have different session counts.
+    versions = pd.read_csv(STUDY_CSV)["Version"].str.strip().str.capitalize()
+    return versions[versions == "Elli"].index[:2], versions[versions == "Static"].index[0]
+
+
+def test_fallback_shares(tmp_path):
+    elli, static = study_rows()
+    out = run_analysis(tmp_path, {
+        elli[0]: timings(["name", "mood"], [4000, 9000], fallbacks=["mood"]),
+        elli[1]: timings(["name", "mood"], [3000, 7000]),
+        static: timings(["phq1", "phq2"], [2000, 3000]),
+    })
+    fallbacks = pd.read_csv(out / "fallback_counts.csv")
+    assert fallbacks[["Version", "Step", "share_of_sessions"]].values.tolist() == [["Elli", "mood", 0.5]]
+
+
+def test_without_fallbacks(tmp_path):
+    elli, static = study_rows()
+    out = run_analysis(tmp_path, {
+        elli[0]: timings(["name"], [4000]), elli[1]: timings(["name"], [3000]), static: timings(["phq1"], [2000]),
+    })
+    assert pd.read_csv(out / "fallback_counts.csv").empty
+    assert len(pd.read_csv(out / "item_latency_distribution.csv")) == 2
+
+
+def test_unmeasured_think_time_stays_missing(tmp_path):
+    # Block paging records None for items the browser saw no input on.
+    elli, static = study_rows()
+    out = run_analysis(tmp_path, {
+        elli[0]: timings(["name"], [4000]),
+        static: timings(["phq1", "phq2"], [2000, None]),
+    })
+    distribution = pd.read_csv(out / "item_latency_distribution.csv").set_index("Item")
+    assert distribution.loc["phq1", "think_median_ms"] == 2000
+    assert pd.isna(distribution.loc["phq2", "think_median_ms"])
+    assert pd.isna(distribution.loc["phq2", "total_median_ms"])
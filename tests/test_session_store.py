@@ -0,0 +1,84 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+from utils import session_store
+
+# Usage (from the project root):
+#   python -m pytest -q tests/test_session_store.py
+#
+# Drives sync_session/persist_session the way the apps call them, with each
+# AppTest standing in for a worker process that has its own session state,
+# and consecutive turns of one participant landing on different workers.
+
+
+def page():
+    import streamlit as st
+    from utils.session_store import sync_session, persist_session, transient_keys
+    transient_keys("next_")
+    sync_session()
+    if "turns" not in st.session_state:
+        st.session_state.turns = 0
+    st.text_input("Name", key="name")
+    if st.button("Next", key="next_button"):
+        st.session_state.turns += 1
+    persist_session()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setenv(session_store.SESSION_STORE_ENV, f"sqlite:///{tmp_path / 'sessions.db'}")
+    session_store.get_session_store.clear()
+    yield session_store.get_session_store()
+    session_store.get_session_store.clear()
+
+
+def worker(sid):
+    at = AppTest.from_function(page)
+    at.query_params[session_store.SESSION_ID_PARAM] = sid
+    return at.run()
+
+
+def test_turns_on_different_workers(store):
+    first = worker("participant-1")
+    first.text_input(key="name").input("Sam")
+    first.button(key="next_button").click().run()
+    assert first.session_state["turns"] == 1
+
+    # The next turn reaches another worker: state and widget values follow.
+    second = worker("participant-1")
+    assert second.session_state["turns"] == 1
+    assert second.text_input(key="name").value == "Sam"
+    second.button(key="next_button").click().run()
+    assert second.session_state["turns"] == 2
+
+    # Back on the first worker, which is now behind the store.
+    first.run()
+    assert first.session_state["turns"] == 2
+    assert first.session_state[session_store.VERSION_KEY] == store.version("participant-1")
+
+
+def test_transient_keys_are_not_stored(store):
+    at = worker("participant-2")
+    at.button(key="next_button").click().run()
+    _, state = store.load("participant-2")
+    assert state["turns"] == 1
+    assert "next_button" not in state
+    assert session_store.SESSION_ID_KEY not in state and session_store.VERSION_KEY not in state
+
+
+def test_versions_only_move_forward(store):
+    at = worker("participant-3")
+    version = store.version("participant-3")
+    assert version == at.session_state[session_store.VERSION_KEY] > 0
+    at.run()
+    assert store.version("participant-3") == version + 1
+    # A worker that is up to date keeps its own state rather than reloading.
+    at.session_state["turns"] = 5
+    at.run()
+    assert at.session_state["turns"] == 5
+    assert store.load("participant-3")[1]["turns"] == 5
+
+
+def test_sessions_are_separate(store):
+    worker("participant-4").button(key="next_button").click().run()
+    other = worker("participant-5")
+    assert other.session_state["turns"] == 0
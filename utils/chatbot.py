@@ -1,56 +1,99 @@
-import sys
+import json
+import re
+import time
 from datetime import datetime
 import streamlit as st
-from openai import OpenAI
-
-client = OpenAI(api_key=st.secrets["openai"]["api_key"])
-
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from gpt_prompts import (
-    PHQ9_SUMMARY_PROMPT,
-    GAD7_SUMMARY_PROMPT,
-    FINAL_SUMMARY_PROMPT,
-    SAFETY_CHECK_PROMPT,
-    SYSTEM_INSTRUCTION,
-    MOOD_RESPONSE_PROMPT,
-    DEMOGRAPHIC_EXTRACTION_PROMPT
-)
+from utils.clients import get_openai_client
+from utils.rate_limit import admitted, AdmissionTimeout, CRITICAL, NORMAL, LOW
+from utils.latency_budget import count_fallback, run_within_budget, STEP_BUDGETS
+from utils.instruments import band_index
+from utils.session_store import SESSION_ID_KEY
+from utils.telemetry import record_fallback
+from gpt_prompts import SYSTEM_INSTRUCTION, MOOD_FALLBACK, SUMMARY_FALLBACKS
+from gpt_prompts.registry import PROMPTS
 
 
 
 
 LOG_FILE = "chat_log.txt"
-
-NAME_VALIDATION_PROMPT = """
-A user was asked for their name or nickname and replied with:
-"{user_input}"
-
-Is this likely a name/nickname? Respond only with "YES" or "NO".
-"""
-
-def extract_name_from_input(user_input):
-    prompt = f"""
-    You are a helpful assistant. Extract a human name from the following message.
-    If no name is clearly mentioned, reply only with "None".
-
-    Message: "{user_input}"
-    Name:
-    """
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.2
-    )
-    name = response.choices[0].message.content.strip()
-    return name if name.lower() != "none" else None
+LATE_RESULTS_FILE = "late_llm_results.jsonl"
 
 def log_to_file(content):
     timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
     with open(LOG_FILE, "a") as f:
         f.write(f"{timestamp} {content}\n")
 
-def get_chat_response(user_prompt, messages=None, model="gpt-4"):
+def request(prompt_name, **values):
+    # Sends a registered prompt (gpt_prompts/registry.py) with its own model,
+    # temperature and system-instruction setting. The caller has been admitted.
+    prompt = PROMPTS[prompt_name]
+    response = get_openai_client().chat.completions.create(
+        model=prompt.model,
+        messages=prompt.messages(**values),
+        temperature=prompt.temperature
+    )
+    reply = response.choices[0].message.content.strip()
+    log_to_file(f"{prompt_name} v{prompt.version} | Reply: {reply}")
+    return reply
+
+def complete(prompt_name, priority=NORMAL, **values):
+    with admitted("openai", priority):
+        return request(prompt_name, **values)
+
+def within_budget(step, call, fallback, priority=NORMAL):
+    # Runs call, which sends its request without admission, under the step's
+    # latency budget. Admission is waited for here on the script thread (so
+    # the wait notice shows) for at most the budget; the rest of the budget
+    # goes to the call. If either runs out the participant gets fallback()
+    # instead, and a call that was sent has its late answer written to
+    # LATE_RESULTS_FILE for analysis.
+    condition = st.session_state.get("condition") or "elli"
+    session_id = st.session_state.get(SESSION_ID_KEY, "")
+    budget = STEP_BUDGETS[step]
+    start = time.monotonic()
+    try:
+        with admitted("openai", priority, timeout=budget):
+            pass
+    except AdmissionTimeout:
+        count_fallback(condition, step)
+        record_fallback(step)
+        log_to_file(f"Fallback used for {step} ({condition}): no OpenAI capacity within {budget:.0f}s")
+        return fallback()
+
+    def record_late(future, elapsed):
+        error = future.exception()
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "condition": condition,
+            "session": session_id,
+            "step": step,
+            "elapsed_s": round(elapsed, 2),
+            "result": None if error else future.result(),
+            "error": str(error) if error else None,
+        }
+        with open(LATE_RESULTS_FILE, "a") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    remaining = budget - (time.monotonic() - start)
+    result, used_fallback = run_within_budget(step, call, fallback, condition, on_late=record_late, budget=remaining)
+    if used_fallback:
+        record_fallback(step)
+        log_to_file(f"Fallback used for {step} ({condition}): no reply within {budget:.0f}s")
+    return result
+
+def extract_name_from_input(user_input):
+    def call():
+        name = request("name_extraction", user_input=user_input)
+        return name if name.lower() != "none" else None
+
+    def fallback():
+        # A one- or two-word reply is almost always just the name.
+        words = re.findall(r"[^\W\d_]+", user_input)
+        return " ".join(words).title() if 0 < len(words) <= 2 else None
+
+    return within_budget("name", call, fallback)
+
+def get_chat_response(user_prompt, messages=None, model="gpt-4", priority=NORMAL):
     chat_messages = [{"role": "system", "content": SYSTEM_INSTRUCTION}]
     
     if messages:
@@ -58,83 +101,94 @@ def get_chat_response(user_prompt, messages=None, model="gpt-4"):
     else:
         chat_messages.append({"role": "user", "content": user_prompt})
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=chat_messages,
-        temperature=0.7
-    )
+    with admitted("openai", priority):
+        response = get_openai_client().chat.completions.create(
+            model=model,
+            messages=chat_messages,
+            temperature=0.7
+        )
     reply = response.choices[0].message.content.strip()
     log_to_file(f"User prompt: {user_prompt[:50]}... | Reply: {reply}")
     return reply
 
 def summarize_phq9(phq_scores):
     total = sum(phq_scores)
-    prompt = PHQ9_SUMMARY_PROMPT.format(phq_total=total, phq_scores=phq_scores)
-    response = get_chat_response(prompt)
+    response = complete("phq9_summary", phq_total=total, phq_scores=phq_scores)
     return total, response
 
 def summarize_gad7(gad_scores):
     total = sum(gad_scores)
-    prompt = GAD7_SUMMARY_PROMPT.format(gad_total=total, gad_scores=gad_scores)
-    response = get_chat_response(prompt)
+    response = complete("gad7_summary", gad_total=total, gad_scores=gad_scores)
     return total, response
 
+def summary_fallback(phq_total, phq_level, gad_total, gad_level):
+    severity = max(band_index(phq_total, "phq"), band_index(gad_total, "gad"))
+    tier = "low" if severity <= 1 else "moderate" if severity == 2 else "high"
+    return SUMMARY_FALLBACKS[tier].format(
+        phq_total=phq_total,
+        phq_level=phq_level.lower(),
+        gad_total=gad_total,
+        gad_level=gad_level.lower()
+    )
+
 def summarize_results(phq_total, phq_level, gad_total, gad_level, mood_text=""):
-    prompt = (
-        "The user completed a PHQ-9 and GAD-7 mental health screening.\n\n"
-        "Mood Reflection:\n"
-        f"{mood_text.strip()}\n\n"
-        "PHQ-9 score: {phq_total} ({phq_level})\n"
-        "GAD-7 score: {gad_total} ({gad_level})\n\n"
-        "Please write a warm, supportive, and human-sounding summary (2–3 sentences) that:\n"
-        "- Acknowledges their mood reflection\n"
-        "- Gently names the depression and anxiety levels\n"
-        "- Encourages care without sounding clinical or alarmist"
-    ).format(
+    call = lambda: request(
+        "results_summary",
         phq_total=phq_total,
         phq_level=phq_level,
         gad_total=gad_total,
-        gad_level=gad_level
+        gad_level=gad_level,
+        mood_text=mood_text.strip()
     )
-    return get_chat_response(prompt)
+    fallback = lambda: summary_fallback(phq_total, phq_level, gad_total, gad_level)
+    return within_budget("summary", call, fallback)
 
 
 def safety_check(user_input):
-    prompt = SAFETY_CHECK_PROMPT.format(user_input=user_input)
-    response = get_chat_response(prompt)
-    return response.strip().upper() == "CRISIS"
+    try:
+        response = complete("safety_check", priority=CRITICAL, user_input=user_input)
+    except AdmissionTimeout:
+        # Unchecked input is treated as a possible crisis, so the support
+        # lines are shown rather than nothing.
+        log_to_file("Safety check skipped: OpenAI capacity exhausted; showing crisis resources")
+        record_fallback("safety")
+        return True
+    return response.upper() == "CRISIS"
 
 def respond_to_feelings(user_input, name):
-    prompt = MOOD_RESPONSE_PROMPT.format(user_input=user_input, name=name)
-    return get_chat_response(prompt)
+    call = lambda: request("mood_response", user_input=user_input, name=name)
+    fallback = lambda: MOOD_FALLBACK.format(name=name)
+    return within_budget("mood", call, fallback, priority=LOW)
 
 def extract_age(user_input):
     if user_input.isdigit():
         return int(user_input)
 
-    prompt = f"""
-    Extract an age (as a number) from this message: "{user_input}"
-    If there's no age, respond with "none".
-    """
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.2
-    )
-    value = response.choices[0].message.content.strip().lower()
-    return int(value) if value.isdigit() else None
+    def call():
+        value = request("age_extraction", user_input=user_input).lower()
+        return int(value) if value.isdigit() else None
+
+    def fallback():
+        number = re.search(r"\b(\d{1,3})\b", user_input)
+        return int(number.group(1)) if number else None
+
+    return within_budget("age", call, fallback)
 
 def extract_gender(user_input):
-    prompt = f"""
-    Extract gender from this message: "{user_input}"
-    Reply with "male", "female", "other", or "none".
-    """
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.2
-    )
-    value = response.choices[0].message.content.strip().lower()
-    if value in ["male", "female", "other"]:
-        return value
-    return None
\ No newline at end of file
+    def call():
+        value = request("gender_extraction", user_input=user_input).lower()
+        if value in ["male", "female", "other"]:
+            return value
+        return None
+
+    def fallback():
+        words = set(re.findall(r"[a-z-]+", user_input.lower()))
+        if words & {"female", "woman", "girl", "f"}:
+            return "female"
+        if words & {"male", "man", "boy", "m"}:
+            return "male"
+        if words & {"non-binary", "nonbinary", "enby", "other", "genderqueer", "agender"}:
+            return "other"
+        return None
+
+    return within_budget("gender", call, fallback)
\ No newline at end of file
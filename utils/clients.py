@@ -0,0 +1,51 @@
+import threading
+import streamlit as st
+
+SHEETS_SCOPE = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive.file",
+    "https://www.googleapis.com/auth/drive"
+]
+
+_prewarm_lock = threading.Lock()
+_prewarm_thread = None
+
+# cache_resource is process-wide, so every page and session of the study app
+# shares one authorised client instead of re-authenticating per call.
+# Third-party SDKs are imported inside the factories so that importing this
+# module (and painting the first screen) never waits on them.
+@st.cache_resource
+def get_openai_client():
+    from openai import OpenAI
+    return OpenAI(api_key=st.secrets["openai"]["api_key"])
+
+@st.cache_resource
+def get_gsheet_client():
+    from google.oauth2.service_account import Credentials
+    import gspread
+    creds = Credentials.from_service_account_info(st.secrets["google_sheets"], scopes=SHEETS_SCOPE)
+    return gspread.authorize(creds)
+
+@st.cache_resource
+def get_study_sheet():
+    return get_gsheet_client().open_by_key(st.secrets["google_sheets"]["sheet_id"]).sheet1
+
+def _prewarm():
+    # Imported here: utils.health builds on the factories above.
+    from utils.health import warm_up
+    warm_up()
+
+def prewarm():
+    # Builds and probes every external client once per process on a background
+    # thread, then keeps them warm (see utils/health.py). Called at server
+    # start by utils/serve.py, and again harmlessly on every rerun.
+    global _prewarm_thread
+    with _prewarm_lock:
+        if _prewarm_thread is not None:
+            return _prewarm_thread
+        from streamlit.runtime.scriptrunner import add_script_run_ctx
+        _prewarm_thread = threading.Thread(target=_prewarm, name="client-prewarm", daemon=True)
+        add_script_run_ctx(_prewarm_thread)
+        _prewarm_thread.start()
+        return _prewarm_thread
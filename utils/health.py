@@ -0,0 +1,144 @@
+import importlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from utils.clients import get_openai_client, get_study_sheet
+from utils.rate_limit import admitted, limiter_stats, LOW
+from utils import message_log
+
+# Warm-up, keepalive and health reporting for the external dependencies.
+# warm_up() runs once per process, either at server start (python -m
+# utils.serve) or on the first rerun. It imports the heavy modules, builds
+# and probes every client, then re-probes every ELLI_KEEPALIVE_S seconds so
+# TLS connections and the service-account token stay warm. With
+# ELLI_HEALTH_PORT set, a small HTTP server answers:
+#   GET /health          last probe result per dependency (always 200)
+#   GET /health?probe=1  probes again before answering
+#   GET /ready           200 if every dependency is up, otherwise 503
+KEEPALIVE_ENV = "ELLI_KEEPALIVE_S"
+HEALTH_PORT_ENV = "ELLI_HEALTH_PORT"
+KEEPALIVE_SECONDS = float(os.environ.get(KEEPALIVE_ENV, 240))
+SLOW_MS = float(os.environ.get("ELLI_HEALTH_SLOW_MS", 2000))
+
+# Imported during warm-up so the first rerun of each page doesn't pay for them.
+WARM_IMPORTS = ["openai", "gspread", "google.oauth2.service_account", "utils.chatbot", "gpt_prompts.registry"]
+
+STARTED_AT = time.time()
+UP, SLOW, DOWN, UNKNOWN = "up", "slow", "down", "unknown"
+
+
+def _probe_openai():
+    with admitted("openai", LOW):
+        get_openai_client().models.retrieve("gpt-4")
+
+def _probe_sheets():
+    with admitted("sheets", LOW):
+        get_study_sheet().row_values(1)
+
+PROBES = {
+    "openai": _probe_openai,
+    "sheets": _probe_sheets,
+}
+
+_status = {name: {"status": UNKNOWN, "latency_ms": None, "checked_at": None, "error": None} for name in PROBES}
+_status_lock = threading.Lock()
+_warm_lock = threading.Lock()
+_warmed = False
+
+
+def probe(name):
+    start = time.monotonic()
+    try:
+        PROBES[name]()
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    latency_ms = round((time.monotonic() - start) * 1000, 1)
+    status = DOWN if error else SLOW if latency_ms > SLOW_MS else UP
+    with _status_lock:
+        _status[name] = {"status": status, "latency_ms": latency_ms, "checked_at": time.time(), "error": error}
+    return status
+
+def probe_all():
+    return {name: probe(name) for name in PROBES}
+
+def health_snapshot():
+    with _status_lock:
+        dependencies = {name: dict(status) for name, status in _status.items()}
+    statuses = {status["status"] for status in dependencies.values()}
+    overall = DOWN if DOWN in statuses else UNKNOWN if UNKNOWN in statuses else SLOW if SLOW in statuses else UP
+    return {
+        "status": overall,
+        "uptime_s": round(time.time() - STARTED_AT, 1),
+        "dependencies": dependencies,
+        "limiters": limiter_stats(),
+        "message_log": message_log.stats(),
+    }
+
+def is_ready():
+    return health_snapshot()["status"] in (UP, SLOW)
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            if parse_qs(url.query).get("probe") == ["1"]:
+                probe_all()
+            self._reply(200, health_snapshot())
+        elif url.path == "/ready":
+            snapshot = health_snapshot()
+            self._reply(200 if snapshot["status"] in (UP, SLOW) else 503, snapshot)
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def _reply(self, code, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_health_server(port):
+    try:
+        server = ThreadingHTTPServer(("0.0.0.0", port), _HealthHandler)
+    except OSError as e:
+        # Another worker on this host already serves health; this one still warms up.
+        print(f"❌ Health endpoint not started on port {port}:", e)
+        return None
+    threading.Thread(target=server.serve_forever, name="health-server", daemon=True).start()
+    print(f"✅ Health endpoint listening on port {port}")
+    return server
+
+
+def _keepalive():
+    while True:
+        time.sleep(KEEPALIVE_SECONDS)
+        probe_all()
+
+def warm_up():
+    global _warmed
+    with _warm_lock:
+        if _warmed:
+            return
+        _warmed = True
+    port = os.environ.get(HEALTH_PORT_ENV)
+    if port:
+        start_health_server(int(port))
+    for module in WARM_IMPORTS:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            print(f"❌ Warm-up import of {module} failed:", e)
+    for name, status in probe_all().items():
+        if status == DOWN:
+            print(f"❌ Prewarming {name} failed:", _status[name]["error"])
+    if KEEPALIVE_SECONDS > 0:
+        threading.Thread(target=_keepalive, name="dependency-keepalive", daemon=True).start()
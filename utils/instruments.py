@@ -0,0 +1,172 @@
+# Single source of truth for the PHQ-9 and GAD-7: item wording, response
+# scale, severity cutoffs and item flags, plus a vectorised scorer used by
+# both apps and the analysis scripts.
+
+RESPONSE_SCALE = [
+    (0, "Not at all"),
+    (1, "Several days"),
+    (2, "More than half the days"),
+    (3, "Nearly every day"),
+]
+
+INSTRUMENTS = {
+    "phq": {
+        "name": "PHQ-9",
+        "columns": [f"PHQ{i}" for i in range(1, 10)],
+        "total_column": "Total_PHQ",
+        # "text" is what Elli asks; "short_text" is the static form's label.
+        "items": [
+            {"text": "Little interest or pleasure in doing things?",
+             "short_text": "Little interest or pleasure in doing things"},
+            {"text": "Feeling down, depressed, or hopeless?",
+             "short_text": "Feeling down, depressed, or hopeless"},
+            {"text": "Trouble falling or staying asleep, or sleeping too much?",
+             "short_text": "Trouble falling or staying asleep, or sleeping too much"},
+            {"text": "Feeling tired or having little energy?",
+             "short_text": "Feeling tired or having little energy"},
+            {"text": "Poor appetite or overeating?",
+             "short_text": "Poor appetite or overeating"},
+            {"text": "Feeling bad about yourself — or that you are a failure or have let yourself or your family down?",
+             "short_text": "Feeling bad about yourself — or that you are a failure"},
+            {"text": "Trouble concentrating on things, such as reading or watching TV?",
+             "short_text": "Trouble concentrating on things"},
+            {"text": "Moving or speaking so slowly that other people could have noticed? Or the opposite — being so fidgety or restless that you’ve been moving around a lot more than usual?",
+             "short_text": "Moving or speaking slowly or being fidgety/restless"},
+            {"text": "Thoughts that you would be better off dead, or thoughts of hurting yourself in some way?",
+             "short_text": "Thoughts that you would be better off dead or hurting yourself"},
+        ],
+        # Upper bound (inclusive) of each severity band.
+        "bands": [
+            (4, "Minimal depression"),
+            (9, "Mild depression"),
+            (14, "Moderate depression"),
+            (19, "Moderately severe depression"),
+            (27, "Severe depression"),
+        ],
+        # Item index -> flag raised when that item is endorsed at all (> 0).
+        "flags": {8: "self_harm"},
+    },
+    "gad": {
+        "name": "GAD-7",
+        "columns": [f"GAD{i}" for i in range(1, 8)],
+        "total_column": "Total_GAD",
+        "items": [
+            {"text": "Feeling nervous, anxious, or on edge?",
+             "short_text": "Feeling nervous, anxious or on edge"},
+            {"text": "Not being able to stop or control worrying?",
+             "short_text": "Not being able to stop or control worrying"},
+            {"text": "Worrying too much about different things?",
+             "short_text": "Worrying too much about different things"},
+            {"text": "Trouble relaxing?",
+             "short_text": "Trouble relaxing"},
+            {"text": "Being so restless that it is hard to sit still?",
+             "short_text": "Being so restless that it's hard to sit still"},
+            {"text": "Becoming easily annoyed or irritable?",
+             "short_text": "Becoming easily annoyed or irritable"},
+            {"text": "Feeling afraid as if something awful might happen?",
+             "short_text": "Feeling afraid as if something awful might happen"},
+        ],
+        "bands": [
+            (4, "Minimal anxiety"),
+            (9, "Mild anxiety"),
+            (14, "Moderate anxiety"),
+            (21, "Severe anxiety"),
+        ],
+        "flags": {},
+    },
+}
+
+# Column order of a full response matrix: PHQ1..PHQ9, GAD1..GAD7.
+ITEM_COLUMNS = INSTRUMENTS["phq"]["columns"] + INSTRUMENTS["gad"]["columns"]
+
+
+def item_texts(scale, short=False):
+    key = "short_text" if short else "text"
+    return [item[key] for item in INSTRUMENTS[scale]["items"]]
+
+def response_labels():
+    return [f"{label} ({value})" for value, label in RESPONSE_SCALE]
+
+def parse_responses(text, max_count=1):
+    # Accepts up to max_count response values in one message, e.g. "2" or
+    # "1 0 2 3" / "1,0,2,3". Returns the list of values, or None if the text
+    # is anything else.
+    tokens = text.replace(",", " ").replace(";", " ").split()
+    if not 0 < len(tokens) <= max_count:
+        return None
+    valid = {str(value) for value, _ in RESPONSE_SCALE}
+    if not all(token in valid for token in tokens):
+        return None
+    return [int(token) for token in tokens]
+
+def band_index(score, scale):
+    bands = INSTRUMENTS[scale]["bands"]
+    for index, (upper, _) in enumerate(bands):
+        if score <= upper:
+            return index
+    return len(bands) - 1
+
+def interpret(score, scale):
+    return INSTRUMENTS[scale]["bands"][band_index(score, scale)][1]
+
+
+# --- Vectorised scoring ---
+# numpy is imported lazily so the apps' first paint never waits on it.
+def _slices():
+    n_phq = len(INSTRUMENTS["phq"]["columns"])
+    return {"phq": slice(0, n_phq), "gad": slice(n_phq, len(ITEM_COLUMNS))}
+
+def score_matrix(responses):
+    # responses: (N x 16) array in ITEM_COLUMNS order, NaN for missing items.
+    # Totals are NaN unless every item of the scale was answered; band codes
+    # index into INSTRUMENTS[scale]["bands"] and are -1 when the total is missing.
+    import numpy as np
+    x = np.asarray(responses, dtype=np.float64)
+    if x.ndim != 2 or x.shape[1] != len(ITEM_COLUMNS):
+        raise ValueError(f"Expected an (N x {len(ITEM_COLUMNS)}) response matrix, got {x.shape}")
+    out_of_range = (x < 0) | (x > RESPONSE_SCALE[-1][0])
+    x = np.where(out_of_range, np.nan, x)
+
+    scored = {"out_of_range": out_of_range.any(axis=1)}
+    for scale, cols in _slices().items():
+        block = x[:, cols]
+        total = block.sum(axis=1)
+        uppers = np.array([upper for upper, _ in INSTRUMENTS[scale]["bands"]])
+        band = np.searchsorted(uppers, np.nan_to_num(total, nan=0.0), side="left")
+        band = np.where(np.isnan(total), -1, np.minimum(band, len(uppers) - 1))
+        scored[f"{scale}_total"] = total
+        scored[f"{scale}_band"] = band.astype(np.int8)
+        for index, flag in INSTRUMENTS[scale]["flags"].items():
+            scored[flag] = np.nan_to_num(block[:, index], nan=0.0) > 0
+    return scored
+
+def band_labels(codes, scale):
+    import numpy as np
+    labels = np.array([label for _, label in INSTRUMENTS[scale]["bands"]] + [""], dtype=object)
+    return labels[np.asarray(codes)]
+
+def score_frame(df):
+    # Scores a DataFrame with PHQ1..GAD7 columns and returns the scored columns
+    # aligned to df's index. Recorded totals are left untouched.
+    import pandas as pd
+    responses = df[ITEM_COLUMNS].apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+    scored = score_matrix(responses)
+    return pd.DataFrame({
+        "PHQ_total_scored": scored["phq_total"],
+        "GAD_total_scored": scored["gad_total"],
+        "PHQ_band": band_labels(scored["phq_band"], "phq"),
+        "GAD_band": band_labels(scored["gad_band"], "gad"),
+        "PHQ9_self_harm": scored["self_harm"],
+        "Out_of_range": scored["out_of_range"],
+    }, index=df.index)
+
+def total_mismatches(df):
+    # Rows whose recorded Total_PHQ/Total_GAD disagree with the item sums.
+    import pandas as pd
+    scored = score_frame(df)
+    mismatch = pd.Series(False, index=df.index)
+    for scale, scored_col in [("phq", "PHQ_total_scored"), ("gad", "GAD_total_scored")]:
+        recorded = pd.to_numeric(df[INSTRUMENTS[scale]["total_column"]], errors="coerce")
+        computed = scored[scored_col]
+        mismatch |= computed.notna() & recorded.notna() & (computed != recorded)
+    return df[mismatch]
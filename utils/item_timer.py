@@ -0,0 +1,12 @@
+import os
+import streamlit.components.v1 as components
+
+_FRONTEND_DIR = os.path.join(os.path.dirname(__file__), "frontend", "item_timer")
+_item_timer = components.declare_component("item_timer", path=_FRONTEND_DIR)
+
+
+def item_timer(widget_keys, key):
+    # Place inside an st.form next to the widgets it should watch. Returns
+    # {widget_key: {"first_ms", "last_ms", "changes"}} as measured in the
+    # browser, or {} when nothing was reported.
+    return _item_timer(keys=list(widget_keys), key=key, default={}) or {}
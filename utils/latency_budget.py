@@ -0,0 +1,44 @@
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+# Seconds a participant may wait on each LLM step before the conversation
+# moves on with a pre-authored reply. Override per step with e.g.
+#   ELLI_BUDGET_SUMMARY=12
+STEP_BUDGETS = {
+    step: float(os.environ.get(f"ELLI_BUDGET_{step.upper()}", default))
+    for step, default in [("name", 5.0), ("mood", 3.0), ("age", 5.0), ("gender", 5.0), ("summary", 8.0)]
+}
+
+# API calls that miss their budget keep running here until the API answers,
+# so their results can still be recorded. Callers are admitted by the rate
+# limiter before submitting, so this pool only ever holds requests in flight.
+_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("ELLI_BUDGET_WORKERS", 32)), thread_name_prefix="llm-budget")
+_fallbacks = Counter()
+_fallbacks_lock = threading.Lock()
+
+
+def count_fallback(condition, step):
+    with _fallbacks_lock:
+        _fallbacks[(condition, step)] += 1
+
+def run_within_budget(step, call, fallback, condition, on_late=None, budget=None):
+    # Returns (result, used_fallback). budget defaults to the step's; pass
+    # what is left of it after waiting for admission. Exceptions raised by
+    # call within the budget propagate as before; on_late(future,
+    # elapsed_seconds) is called once a call that missed its budget finishes.
+    start = time.monotonic()
+    future = _executor.submit(call)
+    try:
+        return future.result(timeout=STEP_BUDGETS[step] if budget is None else max(0.0, budget)), False
+    except FutureTimeout:
+        count_fallback(condition, step)
+        if on_late is not None:
+            future.add_done_callback(lambda f: on_late(f, time.monotonic() - start))
+        return fallback(), True
+
+def fallback_stats():
+    with _fallbacks_lock:
+        return {f"{condition}/{step}": count for (condition, step), count in sorted(_fallbacks.items())}
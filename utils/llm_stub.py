@@ -0,0 +1,89 @@
+import asyncio
+import re
+import time
+
+# Offline stand-in for the OpenAI chat API, used by the batch tools and
+# benchmarks. Answers are deterministic keyword heuristics, good enough to
+# exercise every code path without network access or spend.
+CRISIS_PATTERN = re.compile(r"\b(suicid\w*|kill myself|end my life|better off dead|hurt myself|self[- ]harm|no reason to live)\b", re.I)
+GENDER_PATTERN = re.compile(r"\b(female|woman|girl|male|man|boy|non[- ]?binary|other)\b", re.I)
+# User input is wrapped in triple quotes in some prompts and plain quotes in others.
+QUOTED_PATTERNS = [re.compile(r'"""(.*?)"""', re.S), re.compile(r'"(.*?)"', re.S)]
+GENDER_WORDS = {"woman": "female", "girl": "female", "man": "male", "boy": "male"}
+
+
+def _quoted_input(prompt):
+    for pattern in QUOTED_PATTERNS:
+        match = pattern.search(prompt)
+        if match:
+            return match.group(1)
+    return prompt
+
+def _age(text):
+    number = re.search(r"\b(\d{1,3})\b", text)
+    return number.group(1) if number else None
+
+def _gender(text):
+    match = GENDER_PATTERN.search(text)
+    if not match:
+        return None
+    word = match.group(1).lower()
+    return GENDER_WORDS.get(word, word if word in ("female", "male") else "other")
+
+def stub_reply(messages):
+    prompt = messages[-1]["content"]
+    text = _quoted_input(prompt)
+    if '"CRISIS"' in prompt:
+        return "CRISIS" if CRISIS_PATTERN.search(text) else "OK"
+    if "Extract an age" in prompt:
+        return _age(text) or "none"
+    if "Extract gender" in prompt:
+        return _gender(text) or "none"
+    if "gathering demographic information" in prompt:
+        return _age(text) or _gender(text) or "prefer not to say"
+    if "Extract a human name" in prompt:
+        words = [w for w in re.findall(r"[A-Za-z]+", text) if w[0].isupper()]
+        return words[-1] if words else "None"
+    if '"YES" or "NO"' in prompt:
+        return "YES"
+    return "Thank you for sharing that. It sounds like a lot is going on, and checking in with yourself is a good step."
+
+
+class _Message:
+    def __init__(self, content):
+        self.content = content
+
+class _Choice:
+    def __init__(self, content):
+        self.message = _Message(content)
+
+class _Completion:
+    def __init__(self, content):
+        self.choices = [_Choice(content)]
+
+
+class _Completions:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def create(self, model=None, messages=None, **kwargs):
+        time.sleep(self.latency)
+        return _Completion(stub_reply(messages))
+
+class _AsyncCompletions(_Completions):
+    async def create(self, model=None, messages=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return _Completion(stub_reply(messages))
+
+
+class _Chat:
+    def __init__(self, completions):
+        self.completions = completions
+
+class StubOpenAI:
+    def __init__(self, latency=0.0):
+        self.chat = _Chat(_Completions(latency))
+
+class StubAsyncOpenAI:
+    def __init__(self, latency=0.0):
+        self.chat = _Chat(_AsyncCompletions(latency))
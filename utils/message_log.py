@@ -0,0 +1,62 @@
+import threading
+import time
+from utils.clients import get_study_sheet
+from utils.rate_limit import get_limiter, LOW
+
+# Per-message log rows (Elli's log_message_to_sheet) are written by one
+# background thread per process, so a participant's rerun never waits on
+# Sheets for them. Rows queued while the writer waits for a Sheets token go
+# out together in one append_rows call, at low priority so data rows are
+# served first. A batch that fails (e.g. a 429) is kept and retried with
+# backoff rather than dropped. Rows still queued when the process exits are
+# lost.
+BATCH_SIZE = 500
+RETRY_DELAYS = [2, 5, 15, 30, 60]
+
+_rows = []
+_cond = threading.Condition()
+_thread = None
+_stats = {"written": 0, "batches": 0, "failed_attempts": 0, "last_error": None}
+
+
+def enqueue(row):
+    global _thread
+    with _cond:
+        _rows.append(row)
+        if _thread is None:
+            _thread = threading.Thread(target=_run, name="message-log", daemon=True)
+            _thread.start()
+        _cond.notify()
+
+def stats():
+    with _cond:
+        return {"queued": len(_rows), **_stats}
+
+
+def _run():
+    failures = 0
+    while True:
+        with _cond:
+            while not _rows:
+                _cond.wait()
+        # One token covers one append_rows call, however many rows it carries.
+        get_limiter("sheets").acquire(LOW, timeout=float("inf"))
+        with _cond:
+            batch = _rows[:BATCH_SIZE]
+        try:
+            get_study_sheet().append_rows(batch, value_input_option="USER_ENTERED")
+        except Exception as e:
+            delay = RETRY_DELAYS[min(failures, len(RETRY_DELAYS) - 1)]
+            failures += 1
+            with _cond:
+                _stats["failed_attempts"] += 1
+                _stats["last_error"] = f"{type(e).__name__}: {e}"
+            print(f"❌ Google Sheets message log failed ({len(batch)} rows kept, retrying in {delay}s):", e)
+            time.sleep(delay)
+            continue
+        failures = 0
+        with _cond:
+            # Only this thread removes rows, so the batch is still at the front.
+            del _rows[:len(batch)]
+            _stats["written"] += len(batch)
+            _stats["batches"] += 1
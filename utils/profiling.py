@@ -0,0 +1,169 @@
+import bisect
+import cProfile
+import io
+import os
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager
+import streamlit as st
+
+# Opt-in rerun profiling for the study app. Enable for every session with
+#   ELLI_PROFILE=1                (ELLI_PROFILE_SAMPLE=0.1 sets the cProfile share)
+# or for one browser session with ?profile=1, which also shows the report in
+# the sidebar. Each rerun served through streamlit_app.py is split into named
+# phases whose durations are aggregated per page into histograms.
+PROFILE_ENV = "ELLI_PROFILE"
+SAMPLE_ENV = "ELLI_PROFILE_SAMPLE"
+PROFILE_PARAM = "profile"
+PROFILE_KEY = "_profile"
+SAMPLE_RATE = float(os.environ.get(SAMPLE_ENV, 0.1))
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended.
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000]
+TOP_FUNCTIONS = 30
+
+_local = threading.local()
+_lock = threading.Lock()
+_histograms = {}
+_profile_stats = None
+_sampled_reruns = 0
+
+
+class PhaseHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.n = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.n += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation.
+        target = q * self.n
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return min(BUCKETS_MS[index], self.max_ms) if index < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+
+def _query_flag():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return False
+    # Page switches drop query params, so the flag is remembered per session.
+    if st.query_params.get(PROFILE_PARAM) == "1":
+        st.session_state[PROFILE_KEY] = True
+    return st.session_state.get(PROFILE_KEY, False)
+
+def enabled():
+    return os.environ.get(PROFILE_ENV) == "1" or _query_flag()
+
+def _record(page, name, ms):
+    with _lock:
+        histogram = _histograms.get((page, name))
+        if histogram is None:
+            histogram = _histograms[(page, name)] = PhaseHistogram()
+        histogram.add(ms)
+
+
+# --- Instrumentation ---
+@contextmanager
+def profiled_rerun(page):
+    # Wraps one full script run. st.rerun()/st.stop() end a run by raising,
+    # so everything is recorded on the way out.
+    if not enabled():
+        yield
+        return
+    global _profile_stats, _sampled_reruns
+    profiler = cProfile.Profile() if random.random() < SAMPLE_RATE else None
+    start = time.perf_counter()
+    _local.page = page
+    _local.open_phase = ("setup", start)
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        end = time.perf_counter()
+        name, phase_start = _local.open_phase
+        _record(page, name, (end - phase_start) * 1000)
+        _record(page, "rerun", (end - start) * 1000)
+        _local.page = None
+        _local.open_phase = None
+        if profiler is not None:
+            with _lock:
+                if _profile_stats is None:
+                    _profile_stats = pstats.Stats(profiler)
+                else:
+                    _profile_stats.add(profiler)
+                _sampled_reruns += 1
+
+def begin_phase(name):
+    # Ends the current top-level phase of this rerun and starts the next one.
+    open_phase = getattr(_local, "open_phase", None)
+    if open_phase is None:
+        return
+    now = time.perf_counter()
+    _record(_local.page, open_phase[0], (now - open_phase[1]) * 1000)
+    _local.open_phase = (name, now)
+
+@contextmanager
+def phase(name):
+    # Times a nested section (an LLM call, a Sheets write) without closing
+    # the surrounding top-level phase.
+    page = getattr(_local, "page", None)
+    if page is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(page, name, (time.perf_counter() - start) * 1000)
+
+
+# --- Reporting ---
+def profile_report():
+    with _lock:
+        rows = sorted(_histograms.items())
+        stats = _profile_stats
+        sampled = _sampled_reruns
+        lines = [f"{'page':<10} {'phase':<22} {'n':>6} {'mean_ms':>9} {'p50_ms':>8} {'p90_ms':>8} {'p99_ms':>8} {'max_ms':>9}"]
+        for (page, name), h in rows:
+            lines.append(
+                f"{page:<10} {name:<22} {h.n:>6} {h.total_ms / h.n:>9.1f} {h.quantile(0.5):>8.0f} "
+                f"{h.quantile(0.9):>8.0f} {h.quantile(0.99):>8.0f} {h.max_ms:>9.1f}"
+            )
+        lines.append("")
+        lines.append("Histogram bucket upper bounds (ms): " + ", ".join(str(b) for b in BUCKETS_MS) + ", inf")
+        for (page, name), h in rows:
+            lines.append(f"{page}/{name}: {h.counts}")
+        if stats is not None:
+            buffer = io.StringIO()
+            stats.stream = buffer
+            stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+            lines.append("")
+            lines.append(f"cProfile over {sampled} sampled reruns (top {TOP_FUNCTIONS} by cumulative time):")
+            lines.append(buffer.getvalue())
+    return "\n".join(lines)
+
+def show_report():
+    # Sidebar report for sessions opened with ?profile=1 only; participants
+    # never see it, even when ELLI_PROFILE is on for the whole process.
+    if not _query_flag():
+        return
+    with st.sidebar.expander("⏱️ Rerun profile", expanded=False):
+        report = profile_report()
+        st.code(report, language=None)
+        st.download_button("Download report", report, file_name="rerun_profile.txt")
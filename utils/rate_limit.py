@@ -0,0 +1,197 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# --- Priority classes (lower value is served first) ---
+CRITICAL = 0  # final data writes, safety checks
+NORMAL = 1    # LLM calls the conversation cannot continue without
+LOW = 2       # per-message logs, cosmetic replies
+
+PRIORITY_NAMES = {CRITICAL: "critical", NORMAL: "normal", LOW: "low"}
+DEFAULT_TIMEOUTS = {CRITICAL: 120.0, NORMAL: 30.0, LOW: 10.0}
+
+# Per-minute quotas for the whole deployment. Google Sheets allows 60
+# requests per minute per user, and the app writes as one service account.
+# Each process enforces its own bucket, so with ELLI_WORKERS processes behind
+# a load balancer each gets an equal share of the quota.
+WORKERS = max(1, int(os.environ.get("ELLI_WORKERS", 1)))
+DEFAULT_RATES = {
+    "openai": int(os.environ.get("ELLI_OPENAI_RPM", 500)) / WORKERS,
+    "sheets": int(os.environ.get("ELLI_SHEETS_RPM", 60)) / WORKERS,
+}
+
+PENDING, GRANTED, EXPIRED = "pending", "granted", "expired"
+
+
+class AdmissionTimeout(Exception):
+    pass
+
+
+class Ticket:
+    __slots__ = ("priority", "cost", "deadline", "enqueued_at", "state", "waited")
+
+    def __init__(self, priority, cost, deadline, enqueued_at):
+        self.priority = priority
+        self.cost = cost
+        self.deadline = deadline
+        self.enqueued_at = enqueued_at
+        self.state = PENDING
+        self.waited = 0.0
+
+
+class AdmissionController:
+    # Token bucket refilled at the backend's per-minute quota. Waiting callers
+    # are served strictly by priority, first come first served within a class,
+    # and give up once their deadline passes.
+    def __init__(self, name, rate_per_minute, burst=None, clock=time.monotonic):
+        self.name = name
+        self.rate_per_minute = rate_per_minute
+        self.capacity = burst if burst is not None else max(1.0, rate_per_minute / 6)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.granted = {p: 0 for p in PRIORITY_NAMES}
+        self.expired = {p: 0 for p in PRIORITY_NAMES}
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_queue_depth = 0
+
+    def _refill(self, now):
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate_per_minute / 60)
+        self.updated = now
+
+    def submit(self, priority=NORMAL, cost=1, timeout=None):
+        with self._cond:
+            now = self.clock()
+            if timeout is None:
+                timeout = DEFAULT_TIMEOUTS[priority]
+            # A request dearer than a full bucket could never be granted; it
+            # waits for a full bucket instead.
+            ticket = Ticket(priority, min(cost, self.capacity), now + timeout, now)
+            heapq.heappush(self._queue, (priority, next(self._seq), ticket))
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+            self.dispatch()
+            return ticket
+
+    def dispatch(self):
+        with self._cond:
+            now = self.clock()
+            self._refill(now)
+            if any(t.deadline <= now for _, _, t in self._queue):
+                for _, _, ticket in self._queue:
+                    if ticket.deadline <= now:
+                        ticket.state = EXPIRED
+                        self.expired[ticket.priority] += 1
+                self._queue = [entry for entry in self._queue if entry[2].state == PENDING]
+                heapq.heapify(self._queue)
+            while self._queue and self.tokens >= self._queue[0][2].cost:
+                _, _, ticket = heapq.heappop(self._queue)
+                self.tokens -= ticket.cost
+                ticket.state = GRANTED
+                ticket.waited = now - ticket.enqueued_at
+                self.granted[ticket.priority] += 1
+                if ticket.waited > 0:
+                    self.waited += 1
+                    self.total_wait += ticket.waited
+                    self.max_wait = max(self.max_wait, ticket.waited)
+            self._cond.notify_all()
+
+    def next_grant_in(self):
+        with self._cond:
+            if not self._queue:
+                return 0.0
+            missing = self._queue[0][2].cost - self.tokens
+            return max(0.0, missing * 60 / self.rate_per_minute)
+
+    def acquire(self, priority=NORMAL, cost=1, timeout=None, on_wait=None):
+        ticket = self.submit(priority, cost, timeout)
+        # Called outside the lock: it may render UI.
+        if ticket.state == PENDING and on_wait is not None:
+            on_wait()
+        with self._cond:
+            while ticket.state == PENDING:
+                now = self.clock()
+                self._cond.wait(max(0.001, min(ticket.deadline - now, self.next_grant_in())))
+                self.dispatch()
+        if ticket.state == EXPIRED:
+            raise AdmissionTimeout(f"{self.name}: no capacity within {ticket.deadline - ticket.enqueued_at:.0f}s")
+        return ticket
+
+    def snapshot(self):
+        with self._cond:
+            self._refill(self.clock())
+            granted = sum(self.granted.values())
+            return {
+                "backend": self.name,
+                "rate_per_minute": self.rate_per_minute,
+                "tokens_available": round(self.tokens, 2),
+                "capacity": self.capacity,
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self.max_queue_depth,
+                "granted": {PRIORITY_NAMES[p]: n for p, n in self.granted.items()},
+                "expired": {PRIORITY_NAMES[p]: n for p, n in self.expired.items()},
+                "saturation": round(self.waited / granted, 3) if granted else 0.0,
+                "mean_wait_s": round(self.total_wait / self.waited, 3) if self.waited else 0.0,
+                "max_wait_s": round(self.max_wait, 3),
+            }
+
+
+class SimulatedClock:
+    # Deterministic clock for driving an AdmissionController via submit/dispatch.
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(backend):
+    with _limiters_lock:
+        if backend not in _limiters:
+            _limiters[backend] = AdmissionController(backend, DEFAULT_RATES[backend])
+        return _limiters[backend]
+
+def limiter_stats():
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return [limiter.snapshot() for limiter in limiters]
+
+
+class _WaitNotice:
+    def __init__(self):
+        self.placeholder = None
+
+    def show(self):
+        import streamlit as st
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        if get_script_run_ctx(suppress_warning=True) is None:
+            return
+        self.placeholder = st.empty()
+        self.placeholder.info("⏳ Lots of people are taking part right now. Please wait a moment…")
+
+    def clear(self):
+        if self.placeholder is not None:
+            self.placeholder.empty()
+
+@contextmanager
+def admitted(backend, priority=NORMAL, cost=1, timeout=None):
+    notice = _WaitNotice()
+    try:
+        get_limiter(backend).acquire(priority, cost, timeout, on_wait=notice.show)
+    finally:
+        notice.clear()
+    yield
@@ -0,0 +1,229 @@
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from utils.rate_limit import AdmissionController, NORMAL, PENDING, EXPIRED
+from gpt_prompts.registry import PROMPTS, Prompt
+
+# Usage (from the project root):
+#   python -m utils.rescreen --task safety --source data/Chatbot_Study_Data_Cleaned.csv
+#   python -m utils.rescreen --task demographics --source messages.csv --prompt-file new_prompt.txt
+#   python -m utils.rescreen --task safety --source data/Chatbot_Study_Data_Cleaned.csv --stub
+#
+# Re-runs one of the app's LLM decisions over every stored participant
+# utterance: either the study data export (the "User:" part of Mood) or a CSV
+# export of the per-message log written by log_message_to_sheet. Requests are
+# fanned out over a fixed number of asyncio workers and paced by the same
+# token bucket the apps use. Each result is appended to the output JSONL as
+# soon as it arrives, and that file doubles as the checkpoint: on restart,
+# rows already answered with the same prompt version are skipped, so a new
+# prompt reruns everything. Row ids are hashes of the row's content, so they
+# survive rows being inserted or deleted in a re-export. Failed rows are not
+# written, so a rerun retries them.
+TASKS = {
+    "safety": "safety_check",
+    "demographics": "demographic_extraction",
+}
+MESSAGE_LOG_COLUMNS = ["session", "gender", "age", "role", "content", "timestamp"]
+
+
+# --- Sources ---
+def _mood_user_text(mood):
+    # Mood is stored as "User: ...\nElli: ..."; only the participant's part is screened.
+    text = mood.split("\nElli:", 1)[0]
+    return text[len("User:"):].strip() if text.startswith("User:") else text.strip()
+
+def _stable_id(prefix, *fields):
+    digest = hashlib.sha256("\x1f".join(fields).encode("utf-8")).hexdigest()[:16]
+    return f"{prefix}-{digest}"
+
+def read_utterances(path):
+    # Streams (id, text, context) one row at a time, so exports of any size
+    # never have to fit in memory.
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        if "Mood" in header:
+            columns = header
+            for row in reader:
+                record = dict(zip(columns, row))
+                text = _mood_user_text(record.get("Mood", ""))
+                if text:
+                    context = {key: record.get(key, "") for key in ("Version", "Age", "Gender")}
+                    yield _stable_id("row", *context.values(), record.get("Mood", "")), text, context
+            return
+        # The message log has no header row of its own.
+        rows = reader if header[:len(MESSAGE_LOG_COLUMNS)] == MESSAGE_LOG_COLUMNS else _chain([header], reader)
+        for row in rows:
+            record = dict(zip(MESSAGE_LOG_COLUMNS, row))
+            if record.get("role", "").strip().lower() == "user" and record.get("content", "").strip():
+                context = {key: record.get(key, "") for key in ("session", "gender", "age", "timestamp")}
+                text = record["content"].strip()
+                yield _stable_id("msg", record.get("session", ""), record.get("timestamp", ""), text), text, context
+
+def _chain(first, rest):
+    yield from first
+    yield from rest
+
+def completed_ids(out_path, prompt_id):
+    # Ids already answered with this prompt version.
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+                if result["prompt"] == prompt_id:
+                    done.add(result["id"])
+            except (ValueError, KeyError):
+                # A line cut short by an interruption; that row is redone.
+                continue
+    return done
+
+
+# --- Requests ---
+def parse_result(task, reply):
+    value = reply.strip()
+    if task == "safety":
+        return {"crisis": value.upper() == "CRISIS"}
+    return {"value": value}
+
+async def admit(limiter):
+    # Async counterpart of AdmissionController.acquire: the event loop keeps
+    # running other workers while this one waits for a token.
+    ticket = limiter.submit(NORMAL, timeout=float("inf"))
+    while ticket.state == PENDING:
+        await asyncio.sleep(max(0.001, limiter.next_grant_in()))
+        limiter.dispatch()
+    if ticket.state == EXPIRED:
+        raise RuntimeError(f"{limiter.name}: admission expired")
+
+async def call_with_retries(client, limiter, prompt, model, text, retries):
+    messages = prompt.messages(user_input=text)
+    for attempt in range(retries + 1):
+        await admit(limiter)
+        try:
+            response = await client.chat.completions.create(model=model, messages=messages, temperature=prompt.temperature)
+            return response.choices[0].message.content
+        except Exception:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(min(30.0, 2 ** attempt) + random.random())
+
+
+async def run(args, client):
+    prompt = PROMPTS[TASKS[args.task]]
+    if args.prompt_file:
+        with open(args.prompt_file, encoding="utf-8") as f:
+            template = f.read()
+        version = hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+        prompt = Prompt(f"{prompt.name}-custom", version, template, budget=None,
+                        system=prompt.system, temperature=prompt.temperature)
+    prompt_id = f"{prompt.name}@{prompt.version}"
+
+    done = completed_ids(args.out, prompt_id)
+    limiter = AdmissionController("openai-batch", args.rpm)
+    queue = asyncio.Queue(maxsize=args.concurrency * 2)
+    stats = {"done": 0, "failed": 0, "skipped": 0}
+    start = time.monotonic()
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    out = open(args.out, "a", encoding="utf-8")
+    # An interrupted run can leave its last line unterminated; new results
+    # start on a line of their own.
+    if out.tell() > 0:
+        with open(args.out, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                out.write("\n")
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                queue.task_done()
+                return
+            row_id, text, context = item
+            try:
+                reply = await call_with_retries(client, limiter, prompt, args.model, text, args.retries)
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"❌ {row_id} failed:", e, file=sys.stderr)
+            else:
+                result = {"id": row_id, "task": args.task, "model": args.model, "prompt": prompt_id,
+                          "text": text, "context": context, "reply": reply.strip(), **parse_result(args.task, reply)}
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                stats["done"] += 1
+                if stats["done"] % args.progress_every == 0:
+                    elapsed = time.monotonic() - start
+                    print(f"{stats['done']} done, {stats['failed']} failed, {stats['done'] / elapsed:.1f}/s")
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(args.concurrency)]
+    queued = 0
+    try:
+        for row_id, text, context in read_utterances(args.source):
+            if row_id in done:
+                stats["skipped"] += 1
+                continue
+            if args.limit and queued >= args.limit:
+                break
+            # Identical rows share an id; one answer covers them.
+            done.add(row_id)
+            await queue.put((row_id, text, context))
+            queued += 1
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        out.close()
+
+    stats["seconds"] = round(time.monotonic() - start, 2)
+    stats["limiter"] = limiter.snapshot()
+    return stats
+
+def make_client(args):
+    if args.stub:
+        from utils.llm_stub import StubAsyncOpenAI
+        return StubAsyncOpenAI(latency=args.stub_latency)
+    from openai import AsyncOpenAI
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        import streamlit as st
+        api_key = st.secrets["openai"]["api_key"]
+    return AsyncOpenAI(api_key=api_key)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-run safety or demographic extraction over stored transcripts.")
+    parser.add_argument("--task", choices=sorted(TASKS), required=True)
+    parser.add_argument("--source", required=True, help="Study data CSV or message-log CSV export")
+    parser.add_argument("--out", help="Results JSONL (also the resume checkpoint); default outputs/rescreen/<task>.jsonl")
+    parser.add_argument("--prompt-file", help="Prompt template with a {user_input} placeholder")
+    parser.add_argument("--model", default="gpt-4")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=int(os.environ.get("ELLI_OPENAI_RPM", 500)),
+                        help="Request budget per minute for this run")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many new rows (0 = all)")
+    parser.add_argument("--progress-every", type=int, default=50)
+    parser.add_argument("--stub", action="store_true", help="Use the offline stub instead of the OpenAI API")
+    parser.add_argument("--stub-latency", type=float, default=0.05)
+    args = parser.parse_args(argv)
+    args.out = args.out or os.path.join("outputs", "rescreen", f"{args.task}.jsonl")
+
+    stats = asyncio.run(run(args, make_client(args)))
+    print(json.dumps(stats, indent=2))
+    return 0 if stats["failed"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+import os
+import sys
+
+# Usage (from the project root): python -m utils.serve [streamlit run options]
+#
+# Starts the study app like `streamlit run streamlit_app.py`, but warms the
+# external clients as the server starts instead of on the first participant's
+# rerun, and serves the health endpoint on ELLI_HEALTH_PORT (default 8502).
+APP = "streamlit_app.py"
+
+def main():
+    os.environ.setdefault("ELLI_HEALTH_PORT", "8502")
+    from utils.clients import prewarm
+    prewarm()
+    from streamlit.web import cli as stcli
+    sys.argv = ["streamlit", "run", APP, *sys.argv[1:]]
+    return stcli.main()
+
+if __name__ == "__main__":
+    sys.exit(main())
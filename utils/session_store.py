@@ -0,0 +1,197 @@
+import abc
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+# Optional external session state, so several Streamlit worker processes can
+# serve the same participant. Enable with e.g.
+#   ELLI_SESSION_STORE=sqlite:///var/lib/elli/sessions.db
+#   ELLI_SESSION_STORE=file:///var/lib/elli/sessions
+# Without it, everything lives in st.session_state as before.
+SESSION_STORE_ENV = "ELLI_SESSION_STORE"
+SESSION_ID_PARAM = "sid"
+SESSION_ID_KEY = "_session_id"
+VERSION_KEY = "_store_version"
+
+# Buttons and form submitters cannot be set through session state, so their
+# keys must never be restored on another worker.
+_transient_prefixes = set()
+
+
+class SessionStore(abc.ABC):
+    # Anything that can load and save a pickled state dict with a version
+    # counter per session id can back the apps, e.g. a Redis hash.
+    @abc.abstractmethod
+    def load(self, session_id):
+        # (version, state), or (0, None) for an unknown session.
+        ...
+
+    @abc.abstractmethod
+    def version(self, session_id):
+        ...
+
+    @abc.abstractmethod
+    def save(self, session_id, version, state):
+        ...
+
+    @abc.abstractmethod
+    def delete(self, session_id):
+        ...
+
+
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, version INTEGER NOT NULL, updated REAL NOT NULL, state BLOB NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id):
+        row = self._connect().execute("SELECT version, state FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return (row[0], pickle.loads(row[1])) if row else (0, None)
+
+    def version(self, session_id):
+        row = self._connect().execute("SELECT version FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return row[0] if row else 0
+
+    def save(self, session_id, version, state):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, version, updated, state) VALUES (?, ?, ?, ?)",
+                (session_id, version, time.time(), pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+            )
+
+    def delete(self, session_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+
+class FileSessionStore(SessionStore):
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id):
+        return os.path.join(self.directory, f"{session_id}.pkl")
+
+    def load(self, session_id):
+        try:
+            with open(self._path(session_id), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return 0, None
+
+    def version(self, session_id):
+        return self.load(session_id)[0]
+
+    def save(self, session_id, version, state):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((version, state), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(session_id))
+
+    def delete(self, session_id):
+        try:
+            os.remove(self._path(session_id))
+        except FileNotFoundError:
+            pass
+
+
+def open_store(url):
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+    if url.startswith("file:///"):
+        return FileSessionStore(url[len("file://"):])
+    raise ValueError(f"Unsupported {SESSION_STORE_ENV}: {url}")
+
+@st.cache_resource
+def get_session_store():
+    url = os.environ.get(SESSION_STORE_ENV)
+    return open_store(url) if url else None
+
+
+# --- Streamlit glue ---
+def transient_keys(*prefixes):
+    _transient_prefixes.update(prefixes)
+
+def session_id():
+    sid = st.query_params.get(SESSION_ID_PARAM) or st.session_state.get(SESSION_ID_KEY) or uuid.uuid4().hex
+    st.session_state[SESSION_ID_KEY] = sid
+    # Page switches drop query params; keep the id in the URL so a reconnect
+    # to another worker finds the same session.
+    if st.query_params.get(SESSION_ID_PARAM) != sid:
+        st.query_params[SESSION_ID_PARAM] = sid
+    return sid
+
+def event_session_id():
+    # Id for rows logged during this session (e.g. the Elli message log). It is
+    # the store's id when one is configured; otherwise one made for this session.
+    if SESSION_ID_KEY not in st.session_state:
+        st.session_state[SESSION_ID_KEY] = uuid.uuid4().hex
+    return st.session_state[SESSION_ID_KEY]
+
+def sync_session():
+    # Call at the top of every rerun: pulls the stored state if another worker
+    # has advanced this session since this process last saw it.
+    store = get_session_store()
+    if store is None:
+        return
+    sid = session_id()
+    if store.version(sid) <= st.session_state.get(VERSION_KEY, 0):
+        return
+    version, state = store.load(sid)
+    for key, value in state.items():
+        try:
+            st.session_state[key] = value
+        except StreamlitAPIException:
+            pass
+    st.session_state[VERSION_KEY] = version
+
+def persist_session():
+    store = get_session_store()
+    if store is None:
+        return
+    sid = session_id()
+    state = {
+        key: st.session_state[key] for key in st.session_state.keys()
+        if key not in (SESSION_ID_KEY, VERSION_KEY) and not key.startswith(tuple(_transient_prefixes))
+    }
+    try:
+        pickle.dumps(state)
+    except Exception:
+        state = {key: value for key, value in state.items() if _picklable(value)}
+    version = max(store.version(sid), st.session_state.get(VERSION_KEY, 0)) + 1
+    store.save(sid, version, state)
+    st.session_state[VERSION_KEY] = version
+
+def _picklable(value):
+    try:
+        pickle.dumps(value)
+        return True
+    except Exception:
+        return False
+
+def rerun():
+    persist_session()
+    st.rerun()
+
+def stop():
+    persist_session()
+    st.stop()
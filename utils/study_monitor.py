@@ -0,0 +1,249 @@
+import math
+import os
+import sqlite3
+import sys
+import threading
+import uuid
+
+# Running recruitment statistics for the admin dashboard, kept up to date as
+# participants start and finish instead of recomputed from a sheet export.
+# Enable with e.g.
+#   ELLI_MONITOR_DB=sqlite:///var/lib/elli/monitor.db
+# Without it, recording is a no-op.
+#
+# Every event is one SQLite transaction touching a fixed number of rows, so
+# its cost does not grow with the number of participants: per-condition
+# started/completed counts, and per condition x measure a Welford (n, mean,
+# M2) triple updated inside the UPDATE statement itself, so concurrent
+# Streamlit workers never overwrite each other. The dashboard derives means,
+# SDs, Welch t and the completion x condition chi-square from these few rows.
+#
+# Sheet exports can be fed in too; only rows appended since the last run are read:
+#   python -m utils.study_monitor follow data/Chatbot_Study_Data_Cleaned.csv
+MONITOR_DB_ENV = "ELLI_MONITOR_DB"
+MONITOR_ID_KEY = "_monitor_id"
+MEASURES = ["Trust", "Comfort", "Empathy", "Total_PHQ", "Total_GAD"]
+CONDITIONS = ["Elli", "Static"]
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS participants (id TEXT PRIMARY KEY, condition TEXT NOT NULL, completed INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS conditions (condition TEXT PRIMARY KEY, started INTEGER NOT NULL, completed INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS moments (condition TEXT NOT NULL, measure TEXT NOT NULL, n INTEGER NOT NULL, "
+    "mean REAL NOT NULL, m2 REAL NOT NULL, PRIMARY KEY (condition, measure))",
+    "CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, rows INTEGER NOT NULL, offset INTEGER NOT NULL)",
+]
+# Welford's update with the old n and mean: SQLite evaluates every right-hand side before assigning.
+_WELFORD = (
+    "UPDATE moments SET n = n + 1, mean = mean + (:x - mean) / (n + 1), "
+    "m2 = m2 + (:x - mean) * (:x - (mean + (:x - mean) / (n + 1))) "
+    "WHERE condition = :condition AND measure = :measure"
+)
+
+
+def normalize_condition(value):
+    # As study_data: "static", " Elli " -> "Static", "Elli".
+    value = str(value).strip().capitalize()
+    return value if value in CONDITIONS else None
+
+def _number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+class StudyMonitor:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.executemany("INSERT OR IGNORE INTO conditions VALUES (?, 0, 0)", [(c,) for c in CONDITIONS])
+            conn.executemany("INSERT OR IGNORE INTO moments VALUES (?, ?, 0, 0.0, 0.0)",
+                             [(c, m) for c in CONDITIONS for m in MEASURES])
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    # --- Events ---
+    def start(self, participant_id, condition):
+        condition = normalize_condition(condition)
+        if condition is None:
+            return False
+        with self._connect() as conn:
+            inserted = conn.execute("INSERT OR IGNORE INTO participants VALUES (?, ?, 0)",
+                                    (participant_id, condition)).rowcount
+            if inserted:
+                conn.execute("UPDATE conditions SET started = started + 1 WHERE condition = ?", (condition,))
+        return bool(inserted)
+
+    def complete(self, participant_id, condition, measures):
+        # Counted once per participant, however often the final write is retried.
+        condition = normalize_condition(condition)
+        if condition is None:
+            return False
+        with self._connect() as conn:
+            if conn.execute("INSERT OR IGNORE INTO participants VALUES (?, ?, 0)", (participant_id, condition)).rowcount:
+                conn.execute("UPDATE conditions SET started = started + 1 WHERE condition = ?", (condition,))
+            if not conn.execute("UPDATE participants SET completed = 1 WHERE id = ? AND completed = 0",
+                                (participant_id,)).rowcount:
+                return False
+            conn.execute("UPDATE conditions SET completed = completed + 1 WHERE condition = ?", (condition,))
+            for measure in MEASURES:
+                x = _number(measures.get(measure))
+                if x is not None:
+                    conn.execute(_WELFORD, {"x": x, "condition": condition, "measure": measure})
+        return True
+
+    # --- Sheet exports ---
+    def follow(self, path):
+        # Reads the rows appended to an export since the last call, from the
+        # byte offset where that call stopped. Each row with a Version and a
+        # Dropout_status (the rows dropout_analysis.py counts) is one
+        # participant: started, and completed unless Dropout_status is 1.
+        # Outcome moments only take rows in the analytic sample. Rows edited
+        # after they were read are not revisited; rebuild() starts over.
+        import csv
+        import io
+        key = os.path.abspath(path)
+        conn = self._connect()
+        row = conn.execute("SELECT rows, offset FROM sources WHERE path = ?", (key,)).fetchone()
+        done, offset = row if row else (0, 0)
+        if os.path.getsize(path) < offset:
+            raise ValueError(f"{path} is shorter than when it was last read; run rebuild")
+        consumed = 0
+        with open(path, "rb") as raw:
+            header = next(csv.reader([raw.readline().decode("utf-8-sig")]))
+            if offset:
+                raw.seek(offset)
+            text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+            for index, values in enumerate(csv.reader(text), start=done):
+                record = dict(zip(header, values))
+                consumed += 1
+                status = _number(record.get("Dropout_status"))
+                if normalize_condition(record.get("Version")) is None or status is None:
+                    continue
+                participant_id = f"{key}#{index}"
+                self.start(participant_id, record["Version"])
+                if status != 1:
+                    analytic = _number(record.get("Participant_status")) == 0
+                    self.complete(participant_id, record["Version"], record if analytic else {})
+            offset = raw.tell()
+        with conn:
+            conn.execute("INSERT INTO sources VALUES (?, ?, ?) ON CONFLICT(path) DO UPDATE SET "
+                         "rows = excluded.rows, offset = excluded.offset", (key, done + consumed, offset))
+        return consumed
+
+    def rebuild(self):
+        with self._connect() as conn:
+            for table in ("participants", "sources"):
+                conn.execute(f"DELETE FROM {table}")
+            conn.execute("UPDATE conditions SET started = 0, completed = 0")
+            conn.execute("UPDATE moments SET n = 0, mean = 0.0, m2 = 0.0")
+
+    # --- Reads ---
+    def snapshot(self):
+        conn = self._connect()
+        counts = {c: {"started": s, "completed": d} for c, s, d in conn.execute("SELECT * FROM conditions")}
+        moments = {(c, m): (n, mean, m2) for c, m, n, mean, m2 in conn.execute("SELECT * FROM moments")}
+        return counts, moments
+
+
+# --- Statistics from the aggregates ---
+def describe(moments):
+    # Rows of condition, measure, n, mean, SD.
+    rows = []
+    for (condition, measure), (n, mean, m2) in sorted(moments.items()):
+        rows.append({"Condition": condition, "Measure": measure, "n": n,
+                     "Mean": mean if n else math.nan, "SD": math.sqrt(m2 / (n - 1)) if n > 1 else math.nan})
+    return rows
+
+def welch_test(first, second):
+    # (t, df, p) from two (n, mean, M2) triples.
+    from scipy.stats import t as t_dist
+    (n1, mean1, m2_1), (n2, mean2, m2_2) = first, second
+    if n1 < 2 or n2 < 2:
+        return math.nan, math.nan, math.nan
+    v1, v2 = m2_1 / (n1 - 1) / n1, m2_2 / (n2 - 1) / n2
+    if v1 + v2 == 0:
+        return math.nan, math.nan, math.nan
+    t = (mean1 - mean2) / math.sqrt(v1 + v2)
+    df = (v1 + v2) ** 2 / (v1 ** 2 / (n1 - 1) + v2 ** 2 / (n2 - 1))
+    return t, df, 2 * t_dist.sf(abs(t), df)
+
+def completion_table(counts):
+    # Condition x (Completed, Not completed). Not completed includes sessions still in progress.
+    return {c: (counts[c]["completed"], counts[c]["started"] - counts[c]["completed"]) for c in CONDITIONS}
+
+def completion_chi2(counts):
+    # (chi2, dof, p) as dropout_analysis.py's chi2_contingency (Yates-corrected for 2x2).
+    from scipy.stats import chi2_contingency
+    table = [list(cells) for cells in completion_table(counts).values()]
+    if any(sum(row) == 0 for row in table) or any(sum(col) == 0 for col in zip(*table)):
+        return math.nan, 0, math.nan
+    chi2, p, dof, _ = chi2_contingency(table)
+    return chi2, dof, p
+
+
+# --- App hooks ---
+def get_monitor():
+    url = os.environ.get(MONITOR_DB_ENV)
+    if not url:
+        return None
+    if not url.startswith("sqlite:///"):
+        raise ValueError(f"Unsupported {MONITOR_DB_ENV}: {url}")
+    return _open_monitor(url[len("sqlite:///"):])
+
+def _open_monitor(path):
+    import streamlit as st
+    # One monitor (and connection per thread) for the whole process.
+    return st.cache_resource(StudyMonitor)(path)
+
+def _participant_id():
+    import streamlit as st
+    if MONITOR_ID_KEY not in st.session_state:
+        st.session_state[MONITOR_ID_KEY] = str(uuid.uuid4())
+    return st.session_state[MONITOR_ID_KEY]
+
+def record_start(condition):
+    # Called on every rerun of a condition page; only the first one counts.
+    monitor = get_monitor()
+    if monitor is not None:
+        try:
+            monitor.start(_participant_id(), condition)
+        except sqlite3.Error as e:
+            print(f"⚠️ Monitor update failed: {e}")
+
+def record_completion(condition, measures):
+    monitor = get_monitor()
+    if monitor is not None:
+        try:
+            monitor.complete(_participant_id(), condition, measures)
+        except sqlite3.Error as e:
+            print(f"⚠️ Monitor update failed: {e}")
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Feed sheet exports into the study monitor database.")
+    parser.add_argument("command", choices=["follow", "rebuild"])
+    parser.add_argument("paths", nargs="*", help="Export CSVs to read (follow)")
+    parser.add_argument("--db", default=os.environ.get(MONITOR_DB_ENV, "sqlite:///monitor.db"),
+                        help=f"Monitor database (default: ${MONITOR_DB_ENV} or sqlite:///monitor.db)")
+    args = parser.parse_args(argv)
+    monitor = StudyMonitor(args.db[len("sqlite:///"):] if args.db.startswith("sqlite:///") else args.db)
+    if args.command == "rebuild":
+        monitor.rebuild()
+    for path in args.paths:
+        print(f"{path}: {monitor.follow(path):,} new rows")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
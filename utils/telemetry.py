@@ -0,0 +1,101 @@
+import json
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+from utils.profiling import phase
+
+TIMINGS_KEY = "timings"
+BACKENDS = ("llm", "sheets")
+
+
+def _timings():
+    if TIMINGS_KEY not in st.session_state:
+        st.session_state[TIMINGS_KEY] = {
+            "items": [],
+            "think_ms": [],
+            "llm_ms": [],
+            "sheets_ms": [],
+            "fallbacks": [],
+            "ready_at": time.monotonic(),
+            "showing": None,
+        }
+    return st.session_state[TIMINGS_KEY]
+
+
+def mark_ready(item):
+    # Call where the item is displayed. The participant's clock starts the
+    # first time it is shown; reruns showing the same item leave it running.
+    timings = _timings()
+    if timings.get("showing") != item:
+        timings["showing"] = item
+        timings["ready_at"] = time.monotonic()
+
+
+def record_answer(item):
+    timings = _timings()
+    now = time.monotonic()
+    think = now - timings["ready_at"]
+    timings["items"].append(item)
+    timings["think_ms"].append(int(think * 1000))
+    for backend in BACKENDS:
+        timings[f"{backend}_ms"].append(0)
+    timings["ready_at"] = now
+    timings["showing"] = None
+    return think
+
+
+def record_block(items, last_change_ms):
+    # One submit covering several items. The server only sees the block's
+    # total; the per-item split comes from when the browser saw each item last
+    # change (None where it saw no input, e.g. a default left as is).
+    timings = _timings()
+    now = time.monotonic()
+    think = {item: None for item in items}
+    previous = 0
+    for ms, item in sorted((ms, item) for item, ms in last_change_ms.items() if ms is not None):
+        think[item] = (ms - previous) / 1000
+        previous = ms
+    for item in items:
+        timings["items"].append(item)
+        timings["think_ms"].append(None if think[item] is None else int(think[item] * 1000))
+        for backend in BACKENDS:
+            timings[f"{backend}_ms"].append(0)
+    timings["ready_at"] = now
+    timings["showing"] = None
+    return think
+
+
+@contextmanager
+def backend_wait(backend):
+    timings = _timings()
+    start = time.monotonic()
+    try:
+        with phase(backend):
+            yield
+    finally:
+        end = time.monotonic()
+        waits = timings[f"{backend}_ms"]
+        if waits:
+            waits[-1] += int((end - start) * 1000)
+        timings["ready_at"] = end
+
+
+def llm_wait():
+    return backend_wait("llm")
+
+
+def sheets_wait():
+    return backend_wait("sheets")
+
+
+def record_fallback(step):
+    # Steps where the participant was shown a canned reply instead of the model's.
+    _timings().setdefault("fallbacks", []).append(step)
+
+
+def timings_json():
+    timings = _timings()
+    payload = {key: timings[key] for key in ("items", "think_ms", "llm_ms", "sheets_ms")}
+    payload["fallbacks"] = timings.get("fallbacks", [])
+    return json.dumps(payload, separators=(",", ":"))